@@ -1,12 +1,17 @@
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton, 
                             QLabel, QListWidget, QListWidgetItem, QProgressBar,
-                            QComboBox, QMessageBox, QFileDialog)
+                            QComboBox, QMessageBox, QFileDialog, QSpinBox)
 from PyQt6.QtCore import Qt, QThread, pyqtSignal
 from PyQt6.QtGui import QFont
 from config import ConfigManager
+from utils import SecurityValidator, SecurityLogger
+from src.domain.cancellation import CancellationToken, OperationCancelled
+from src.application.extraction_usecase import ExtractBatchUseCase
+from src.infrastructure.ingestion import read_image_bytes
 import os
 import subprocess
 import sys
+import time
 from pathlib import Path
 
 class BatchProcessThread(QThread):
@@ -16,70 +21,291 @@ class BatchProcessThread(QThread):
     finished = pyqtSignal(list)
     error = pyqtSignal(str)
     
-    def __init__(self, image_paths, app_logic, export_format):
+    def __init__(self, image_paths, app_logic, export_format, workers=1):
         super().__init__()
         self.image_paths = image_paths
         self.app_logic = app_logic
         self.export_format = export_format
+        self.workers = workers
         self.results = []
+        # Estado por imagen (las vencidas quedan "failed", las no procesadas "cancelled")
+        self.job = ExtractBatchUseCase.create_job(image_paths)
+        # Cancelación y pausa cooperativas; plazo por imagen desde los ajustes
+        self.cancel_token = CancellationToken()
+        self.image_timeout = app_logic.performance.image_timeout_seconds or None
+        # Imágenes descartadas por el pre-filtro y tiempos para estimar el ahorro
+        self.skipped = []
+        self.filter_seconds = 0.0
+        self.ocr_seconds = 0.0
+        self.ocr_count = 0
+        from src.infrastructure.text_presence import TextPresenceFilter
+        self.presence_filter = TextPresenceFilter(app_logic.performance.text_presence_threshold)
+        # Imágenes resueltas desde la caché de resultados (sin decodificar ni OCR)
+        self.cache_hits = 0
+        self.cache_lookups = 0
+    
+    def _unhashed_bytes(self, image_path):
+        """
+        Bytes de un archivo válido cuyo digest la caché no conoce; así el hash,
+        el pre-filtro y la decodificación comparten una sola lectura
+        """
+        if self.app_logic.result_cache is None:
+            return None
+        is_valid, _ = SecurityValidator.validate_image_path(image_path)
+        if not is_valid:
+            return None
+        return self.app_logic.result_cache.read_unless_known(image_path)
+    
+    def _cached_text(self, image_path, data=None):
+        """Texto guardado para el contenido de la imagen, o None si hay que extraerlo"""
+        if self.app_logic.result_cache is None:
+            return None
+        is_valid, _ = SecurityValidator.validate_image_path(image_path)
+        if not is_valid:
+            return None
+        self.cache_lookups += 1
+        _, cached = self.app_logic.cached_result(image_path, data=data)
+        if cached is None:
+            return None
+        self.cache_hits += 1
+        return cached['texts'] or [""]
+    
+    def _has_text(self, image_path, data=None):
+        """
+        Pre-filtro rápido: registra y descarta las imágenes sin texto
+
+        Args:
+            image_path: Ruta de la imagen
+            data: Bytes del archivo ya leídos (None = leer la ruta)
+        """
+        start = time.perf_counter()
+        try:
+            has_text, score, reason = self.presence_filter.analyze(image_path if data is None else data)
+        except Exception:
+            # Ante la duda se ejecuta el OCR
+            return True
+        finally:
+            self.filter_seconds += time.perf_counter() - start
+        
+        if not has_text:
+            self.skipped.append({'image': image_path, 'reason': reason, 'score': score})
+            self.status.emit(f"Omitida (sin texto): {os.path.basename(image_path)} - {reason}")
+        return has_text
+    
+    def _read_image(self, image_path):
+        """
+        Valida la ruta y lee el archivo una sola vez
+
+        Raises:
+            ValueError: Si la ruta no es válida
+        """
+        is_valid, error = SecurityValidator.validate_image_path(image_path)
+        if not is_valid:
+            SecurityLogger.log_invalid_input('image_path', error)
+            raise ValueError(f"Ruta de imagen inválida: {error}")
+        return read_image_bytes(image_path)
+    
+    def cancel(self):
+        """Cancela el lote; la imagen en curso se abandona en el próximo punto de control"""
+        self.cancel_token.cancel()
+    
+    def pause(self):
+        """Retiene la cola al terminar la imagen en curso (el motor sigue cargado)"""
+        self.cancel_token.pause()
+        self.status.emit("En pausa")
+    
+    def resume(self):
+        """Reanuda la cola"""
+        self.cancel_token.resume()
+    
+    @property
+    def seconds_saved(self):
+        """Tiempo de OCR evitado (según la media del lote) menos el costo del pre-filtro"""
+        if not self.skipped or not self.ocr_count:
+            return 0.0
+        return len(self.skipped) * self.ocr_seconds / self.ocr_count - self.filter_seconds
     
     def run(self):
         """Procesa las imágenes"""
-        total = len(self.image_paths)
+        try:
+            if self.workers > 1:
+                self._run_process_pool()
+            else:
+                self._run_sequential()
+        except OperationCancelled:
+            pass
+        
+        for task in self.job.tasks:
+            if task.status in ("pending", "processing"):
+                task.status = "cancelled"
+        self.finished.emit(self.results)
+    
+    def _run_sequential(self):
+        """Procesa las imágenes una a una con el lector compartido"""
+        total = len(self.job.tasks)
         
-        for idx, image_path in enumerate(self.image_paths):
-            result_path = None
+        for idx, task in enumerate(self.job.tasks):
+            image_path = task.image_path
+            # La pausa retiene la cola entre imágenes sin descargar el lector
+            self.cancel_token.wait_if_paused()
+            task.status = "processing"
             try:
                 self.status.emit(f"Procesando {idx + 1}/{total}: {os.path.basename(image_path)}")
                 
-                # Establecer la ruta de la imagen
-                self.app_logic.set_image_path(image_path)
+                # Resultado guardado: se exporta sin decodificar la imagen
+                data = self._unhashed_bytes(image_path)
+                cached = self._cached_text(image_path, data)
+                if cached is not None:
+                    self._export_result(image_path, cached)
+                    task.status = "completed"
+                    continue
                 
-                # Extraer texto
-                text = self.app_logic.extract_text()
+                # El archivo se lee una vez: el pre-filtro trabaja sobre esos bytes
+                # (los JPEG reducidos) y solo se decodifica completo si hay texto
+                if data is None:
+                    data = self._read_image(image_path)
+                if not self._has_text(image_path, data):
+                    task.status = "skipped"
+                    continue
+                self.app_logic.set_image_path(image_path, data=data)
                 
-                # Guardar en el formato especificado
-                base_name = Path(image_path).stem
+                # Extraer texto con el plazo de esta imagen
+                start = time.perf_counter()
+                text = self.app_logic.extract_text(
+                    cancel_token=self.cancel_token.with_timeout(self.image_timeout))
+                self.ocr_seconds += time.perf_counter() - start
+                self.ocr_count += 1
                 
-                # Obtener la carpeta de Documentos de forma robusta
-                documents_path = Path.home() / "Documents"
-                output_dir = str(documents_path)
-                
-                # Crear directorio si no existe
-                os.makedirs(output_dir, exist_ok=True)
-                
-                if self.export_format == "docx":
-                    output_path = os.path.join(output_dir, f"{base_name}.docx")
-                    result_path = self.app_logic.save_text_to_docx(text, output_path)
-                elif self.export_format == "txt":
-                    output_path = os.path.join(output_dir, f"{base_name}.txt")
-                    result_path = self.app_logic.save_text_to_txt(text, output_path)
-                elif self.export_format == "pdf":
-                    output_path = os.path.join(output_dir, f"{base_name}.pdf")
-                    result_path = self.app_logic.save_text_to_pdf(text, output_path)
-                elif self.export_format == "rtf":
-                    output_path = os.path.join(output_dir, f"{base_name}.rtf")
-                    result_path = self.app_logic.save_text_to_rtf(text, output_path)
-                else:
-                    raise ValueError(f"Formato no soportado: {self.export_format}")
-                
-                if result_path:
-                    self.results.append({
-                        'image': image_path,
-                        'output': result_path,
-                        'characters': len(''.join(text) if isinstance(text, list) else text)
-                    })
-                else:
-                    self.error.emit(f"No se pudo guardar: {os.path.basename(image_path)}")
+                self._export_result(image_path, text)
+                task.status = "completed"
                 
+            except OperationCancelled:
+                raise
             except Exception as e:
+                # Incluye DeadlineExceeded: la imagen vencida no detiene el lote
+                task.status = "failed"
+                task.error = str(e)
                 self.error.emit(f"Error procesando {os.path.basename(image_path)}: {str(e)}")
             finally:
                 # Siempre actualizar progreso, incluso si hay error
                 progress_value = int((idx + 1) / total * 100)
                 self.progress.emit(progress_value)
+    
+    def _run_process_pool(self):
+        """Procesa las imágenes en paralelo con un pool de procesos"""
+        from src.infrastructure.process_pool_engine import ProcessPoolOCREngine
         
-        self.finished.emit(self.results)
+        total = len(self.job.tasks)
+        valid_tasks = []
+        for task in self.job.tasks:
+            image_path = task.image_path
+            is_valid, error = SecurityValidator.validate_image_path(image_path)
+            if is_valid:
+                data = self._unhashed_bytes(image_path)
+                cached = self._cached_text(image_path, data)
+                if cached is not None:
+                    try:
+                        self._export_result(image_path, cached)
+                        task.status = "completed"
+                    except Exception as e:
+                        task.status = "failed"
+                        task.error = str(e)
+                        self.error.emit(f"Error procesando {os.path.basename(image_path)}: {str(e)}")
+                elif self._has_text(image_path, data):
+                    valid_tasks.append(task)
+                else:
+                    task.status = "skipped"
+            else:
+                SecurityLogger.log_invalid_input('image_path', error)
+                task.status = "failed"
+                task.error = f"Ruta de imagen inválida: {error}"
+                self.error.emit(f"Error procesando {os.path.basename(image_path)}: Ruta de imagen inválida: {error}")
+        
+        done = total - len(valid_tasks)
+        self.status.emit(f"Iniciando {self.workers} procesos OCR...")
+        
+        performance = self.app_logic.performance
+        torch_threads = performance.torch_threads if performance.process_workers == self.workers else None
+        # Los workers corren la misma cadena que la extracción en este proceso
+        # (incluido el enrutamiento por escritura con 'auto')
+        with ProcessPoolOCREngine(self.app_logic.languages, gpu=False, workers=self.workers,
+                                  torch_threads=torch_threads or None, performance=performance) as engine:
+            # Los resultados llegan en orden de finalización; la pausa deja de
+            # enviar imágenes y la cancelación termina los procesos
+            start = time.perf_counter()
+            for task in valid_tasks:
+                task.status = "processing"
+            results = engine.imap([task.image_path for task in valid_tasks],
+                                  cancel_token=self.cancel_token, image_timeout=self.image_timeout)
+            for result in results:
+                task = valid_tasks[result.index]
+                image_path, text, error = result.path, result.lines, result.error
+                done += 1
+                # Tiempo de pared medio por imagen con todos los procesos en marcha
+                self.ocr_seconds = time.perf_counter() - start
+                self.ocr_count += 1
+                try:
+                    self.status.emit(f"Procesado {done}/{total}: {os.path.basename(image_path)}")
+                    if error is not None:
+                        SecurityLogger.log_extraction(image_path, False, 0)
+                        raise Exception(f"Error al procesar la imagen: {error}")
+                    
+                    text = text or [""]
+                    full_text = '\n'.join(text)
+                    is_valid, validation_error = SecurityValidator.validate_text_input(full_text)
+                    if not is_valid:
+                        SecurityLogger.log_invalid_input('extracted_text', validation_error)
+                        raise ValueError(f"Texto extraído inválido: {validation_error}")
+                    SecurityLogger.log_extraction(image_path, True, len(full_text))
+                    
+                    cache_key = self.app_logic.cache_key(image_path)
+                    if cache_key is not None:
+                        self.app_logic.result_cache.put(cache_key, {'texts': [line for line in text if line],
+                                                                    'orientation': result.orientation,
+                                                                    'confidence': result.confidence})
+                    self._export_result(image_path, text)
+                    task.status = "completed"
+                except Exception as e:
+                    task.status = "failed"
+                    task.error = str(e)
+                    self.error.emit(f"Error procesando {os.path.basename(image_path)}: {str(e)}")
+                finally:
+                    self.progress.emit(int(done / total * 100))
+    
+    def _export_result(self, image_path, text):
+        """Guarda el texto de una imagen en el formato especificado"""
+        base_name = Path(image_path).stem
+        
+        # Obtener la carpeta de Documentos de forma robusta
+        documents_path = Path.home() / "Documents"
+        output_dir = str(documents_path)
+        
+        # Crear directorio si no existe
+        os.makedirs(output_dir, exist_ok=True)
+        
+        if self.export_format == "docx":
+            output_path = os.path.join(output_dir, f"{base_name}.docx")
+            result_path = self.app_logic.save_text_to_docx(text, output_path)
+        elif self.export_format == "txt":
+            output_path = os.path.join(output_dir, f"{base_name}.txt")
+            result_path = self.app_logic.save_text_to_txt(text, output_path)
+        elif self.export_format == "pdf":
+            output_path = os.path.join(output_dir, f"{base_name}.pdf")
+            result_path = self.app_logic.save_text_to_pdf(text, output_path)
+        elif self.export_format == "rtf":
+            output_path = os.path.join(output_dir, f"{base_name}.rtf")
+            result_path = self.app_logic.save_text_to_rtf(text, output_path)
+        else:
+            raise ValueError(f"Formato no soportado: {self.export_format}")
+        
+        if result_path:
+            self.results.append({
+                'image': image_path,
+                'output': result_path,
+                'characters': len(''.join(text) if isinstance(text, list) else text)
+            })
+        else:
+            self.error.emit(f"No se pudo guardar: {os.path.basename(image_path)}")
 
 
 class BatchProcessDialog(QDialog):
@@ -220,6 +446,15 @@ class BatchProcessDialog(QDialog):
         self.format_combo.addItems(["DOCX", "TXT", "PDF", "RTF"])
         format_layout.addWidget(format_label)
         format_layout.addWidget(self.format_combo)
+        
+        # Procesos paralelos (1 = lector compartido de la aplicación)
+        workers_label = QLabel("Procesos:")
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, max(1, os.cpu_count() or 1))
+        self.workers_spin.setValue(min(self.app_logic.performance.process_workers, self.workers_spin.maximum()))
+        self.workers_spin.setToolTip("Cada proceso adicional carga su propio modelo OCR")
+        format_layout.addWidget(workers_label)
+        format_layout.addWidget(self.workers_spin)
         format_layout.addStretch()
         layout.addLayout(format_layout)
         
@@ -247,9 +482,15 @@ class BatchProcessDialog(QDialog):
         clear_btn.setMinimumWidth(110)
         clear_btn.clicked.connect(self.clear_list)
         
-        cancel_btn = QPushButton("Cancelar")
-        cancel_btn.setMinimumWidth(100)
-        cancel_btn.clicked.connect(self.close)
+        # Cancelar detiene el lote en curso; sin lote, cierra el diálogo
+        self.cancel_btn = QPushButton("Cancelar")
+        self.cancel_btn.setMinimumWidth(100)
+        self.cancel_btn.clicked.connect(self.cancel_or_close)
+        
+        self.pause_btn = QPushButton("⏸ Pausar")
+        self.pause_btn.setMinimumWidth(100)
+        self.pause_btn.setEnabled(False)
+        self.pause_btn.clicked.connect(self.toggle_pause)
         
         self.process_btn = QPushButton("▶ Procesar")
         self.process_btn.setMinimumWidth(100)
@@ -259,7 +500,8 @@ class BatchProcessDialog(QDialog):
         buttons_layout.addWidget(remove_btn)
         buttons_layout.addWidget(clear_btn)
         buttons_layout.addStretch()
-        buttons_layout.addWidget(cancel_btn)
+        buttons_layout.addWidget(self.cancel_btn)
+        buttons_layout.addWidget(self.pause_btn)
         buttons_layout.addWidget(self.process_btn)
         
         layout.addLayout(buttons_layout)
@@ -305,6 +547,9 @@ class BatchProcessDialog(QDialog):
         
         self.processing = True
         self.process_btn.setEnabled(False)
+        self.pause_btn.setEnabled(True)
+        self.pause_btn.setText("⏸ Pausar")
+        self.cancel_btn.setEnabled(True)
         self.progress_bar.show()
         self.progress_bar.setValue(0)
         
@@ -313,7 +558,8 @@ class BatchProcessDialog(QDialog):
         self.batch_thread = BatchProcessThread(
             self.image_paths,
             self.app_logic,
-            export_format
+            export_format,
+            workers=self.workers_spin.value()
         )
         self.batch_thread.progress.connect(self.update_progress)
         self.batch_thread.status.connect(self.update_status)
@@ -321,6 +567,35 @@ class BatchProcessDialog(QDialog):
         self.batch_thread.error.connect(self.batch_error)
         self.batch_thread.start()
     
+    def toggle_pause(self):
+        """Pausa o reanuda la cola del lote"""
+        if not self.processing:
+            return
+        if self.batch_thread.cancel_token.paused:
+            self.batch_thread.resume()
+            self.pause_btn.setText("⏸ Pausar")
+            self.status_label.setText("Reanudando...")
+        else:
+            self.batch_thread.pause()
+            self.pause_btn.setText("▶ Reanudar")
+    
+    def cancel_or_close(self):
+        """Cancela el lote en curso (libera los workers) o cierra el diálogo"""
+        if self.processing:
+            self.batch_thread.cancel()
+            self.cancel_btn.setEnabled(False)
+            self.pause_btn.setEnabled(False)
+            self.status_label.setText("Cancelando...")
+        else:
+            self.close()
+    
+    def closeEvent(self, event):
+        """Cerrar la ventana también detiene el lote"""
+        if self.processing:
+            self.batch_thread.cancel()
+            self.batch_thread.wait()
+        super().closeEvent(event)
+    
     def update_progress(self, value):
         """Actualiza la barra de progreso"""
         self.progress_bar.setValue(value)
@@ -333,16 +608,39 @@ class BatchProcessDialog(QDialog):
         """Se ejecuta cuando el procesamiento termina"""
         self.processing = False
         self.process_btn.setEnabled(True)
+        self.pause_btn.setEnabled(False)
+        self.pause_btn.setText("⏸ Pausar")
+        self.cancel_btn.setEnabled(True)
         
-        if results:
+        skipped = self.batch_thread.skipped
+        job = self.batch_thread.job
+        if results or skipped:
             # Obtener la ruta de Documentos para mostrar en el mensaje
             documents_path = str(Path.home() / "Documents")
             
             message = f"Procesamiento completado:\n\n"
             message += f"Archivos procesados: {len(results)}\n"
             total_chars = sum(r['characters'] for r in results)
-            message += f"Total de caracteres: {total_chars:,}\n\n"
-            message += f"Ubicación: {documents_path}"
+            message += f"Total de caracteres: {total_chars:,}\n"
+            if skipped:
+                message += f"Omitidas sin texto: {len(skipped)}"
+                saved = self.batch_thread.seconds_saved
+                if saved > 0:
+                    message += f" (~{saved:.1f} s ahorrados)"
+                message += "\n"
+                for entry in skipped[:5]:
+                    message += f"  • {os.path.basename(entry['image'])}: {entry['reason']}\n"
+                if len(skipped) > 5:
+                    message += f"  • ... y {len(skipped) - 5} más\n"
+            if self.batch_thread.cache_hits:
+                thread = self.batch_thread
+                message += (f"Desde la caché: {thread.cache_hits} de {thread.cache_lookups} "
+                            f"({thread.cache_hits / thread.cache_lookups:.0%})\n")
+            if job.failed_tasks:
+                message += f"Con error o tiempo agotado: {job.failed_tasks}\n"
+            if job.cancelled_tasks:
+                message += f"Canceladas: {job.cancelled_tasks}\n"
+            message += f"\nUbicación: {documents_path}"
             
             reply = QMessageBox.information(self, "Éxito", message, 
                                            QMessageBox.StandardButton.Ok | QMessageBox.StandardButton.Open)
@@ -350,6 +648,9 @@ class BatchProcessDialog(QDialog):
             # Si el usuario hace clic en Abrir, abre la carpeta de Documentos
             if reply == QMessageBox.StandardButton.Open:
                 self.open_documents_folder(documents_path)
+        elif job.cancelled_tasks:
+            QMessageBox.information(self, "Cancelado",
+                                    f"Procesamiento cancelado ({job.cancelled_tasks} sin procesar)")
         else:
             QMessageBox.warning(self, "Error", "No se procesó ningún archivo")
         
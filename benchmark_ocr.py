@@ -0,0 +1,871 @@
+"""
+Benchmarks del motor OCR
+Genera imágenes sintéticas con texto y mide el rendimiento de las distintas
+estrategias de extracción.
+
+Uso:
+    python benchmark_ocr.py lotes --imagenes 40 --batch-size 32
+    python benchmark_ocr.py procesos --imagenes 64 --max-workers 8
+    python benchmark_ocr.py cuantizacion --imagenes 40
+    python benchmark_ocr.py onnx --imagenes 20
+    python benchmark_ocr.py normalizacion --imagenes 10
+    python benchmark_ocr.py regiones --repeticiones 5
+    python benchmark_ocr.py refinamiento --imagenes 20
+    python benchmark_ocr.py presencia --imagenes 30
+    python benchmark_ocr.py orientacion --imagenes 12
+    python benchmark_ocr.py idiomas --trabajos 12 --presupuesto-mb 400
+    python benchmark_ocr.py escritura --imagenes 8
+    python benchmark_ocr.py ingesta --imagenes 6
+    python benchmark_ocr.py cancelacion --repeticiones 5
+    python benchmark_ocr.py streaming --imagenes 4
+    python benchmark_ocr.py demonio --imagenes 32 --clientes 8
+    python benchmark_ocr.py cli --imagenes 32 --workers 4
+    python benchmark_ocr.py cache --imagenes 20
+    python benchmark_ocr.py duplicados --firmas 300000 --radio 4
+    python benchmark_ocr.py vigilancia --imagenes 2000
+"""
+import argparse
+import random
+import os
+import string
+import tempfile
+import time
+
+
+def generar_capturas(cantidad, lineas=3, ancho=640, alto=160, semilla=0):
+    """Genera capturas sintéticas cortas (ndarray RGB) con su texto real"""
+    import numpy as np
+    from PIL import Image, ImageDraw, ImageFont
+
+    rng = random.Random(semilla)
+    try:
+        fuente = ImageFont.truetype("DejaVuSans.ttf", 22)
+    except OSError:
+        fuente = ImageFont.load_default()
+
+    imagenes = []
+    for _ in range(cantidad):
+        imagen = Image.new("RGB", (ancho, alto), "white")
+        dibujo = ImageDraw.Draw(imagen)
+        textos = []
+        for i in range(lineas):
+            palabras = [
+                ''.join(rng.choice(string.ascii_letters) for _ in range(rng.randint(3, 8)))
+                for _ in range(rng.randint(2, 5))
+            ]
+            texto = ' '.join(palabras)
+            dibujo.text((16, 16 + i * 44), texto, fill="black", font=fuente)
+            textos.append(texto)
+        imagenes.append((np.array(imagen), textos))
+    return imagenes
+
+
+def cargar_lector(idiomas):
+    """Obtiene el lector compartido del registro"""
+    from src.infrastructure.reader_registry import get_reader_registry
+    inicio = time.perf_counter()
+    lector = get_reader_registry().get_reader(idiomas, gpu=False)
+    print(f"Modelo cargado en {time.perf_counter() - inicio:.2f}s")
+    return lector
+
+
+def benchmark_lotes(args):
+    """Compara el bucle imagen por imagen contra el reconocimiento agrupado"""
+    from src.infrastructure.batch_engine import PooledRecognitionEngine
+
+    lector = cargar_lector(args.idiomas)
+    imagenes = [img for img, _ in generar_capturas(args.imagenes)]
+
+    # Calentamiento para no medir la primera inferencia
+    lector.readtext(imagenes[0], detail=0, paragraph=True)
+
+    inicio = time.perf_counter()
+    for imagen in imagenes:
+        lector.readtext(imagen, detail=0, paragraph=True)
+    bucle = time.perf_counter() - inicio
+
+    motor = PooledRecognitionEngine(lector, batch_size=args.batch_size, paragraph=True)
+    inicio = time.perf_counter()
+    motor.readtext_batch(imagenes)
+    agrupado = time.perf_counter() - inicio
+
+    total = len(imagenes)
+    print(f"Imágenes: {total}, batch_size: {args.batch_size}")
+    print(f"  Bucle actual:   {total / bucle:6.2f} img/s ({bucle:.2f}s)")
+    print(f"  Agrupado:       {total / agrupado:6.2f} img/s ({agrupado:.2f}s)")
+    print(f"  Aceleración:    {bucle / agrupado:.2f}x")
+
+
+def guardar_capturas(imagenes, directorio, prefijo="captura"):
+    """Guarda las capturas sintéticas como PNG y retorna sus rutas"""
+    from PIL import Image
+
+    rutas = []
+    for i, (arreglo, _) in enumerate(imagenes):
+        ruta = os.path.join(directorio, f"{prefijo}_{i:04d}.png")
+        Image.fromarray(arreglo).save(ruta)
+        rutas.append(ruta)
+    return rutas
+
+
+def benchmark_procesos(args):
+    """Mide el escalado del motor multiproceso de 1 a N workers"""
+    from src.infrastructure.process_pool_engine import ProcessPoolOCREngine, available_cpus
+
+    maximo = args.max_workers or available_cpus()
+    print(f"CPUs disponibles: {available_cpus()}")
+
+    with tempfile.TemporaryDirectory() as directorio:
+        rutas = guardar_capturas(generar_capturas(args.imagenes), directorio)
+        base = None
+        for workers in range(1, maximo + 1):
+            with ProcessPoolOCREngine(args.idiomas, workers=workers) as motor:
+                # Calentar todos los workers antes de medir
+                list(motor.imap(rutas[:workers]))
+                inicio = time.perf_counter()
+                for _ in motor.imap(rutas):
+                    pass
+                duracion = time.perf_counter() - inicio
+            rendimiento = len(rutas) / duracion
+            base = base or rendimiento
+            print(f"  workers={workers:2d} hilos={motor.torch_threads:2d}: "
+                  f"{rendimiento:6.2f} img/s (escalado {rendimiento / base:.2f}x)")
+
+
+def distancia_edicion(a, b):
+    """Distancia de Levenshtein entre dos cadenas"""
+    anterior = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        actual = [i]
+        for j, cb in enumerate(b, 1):
+            actual.append(min(anterior[j] + 1, actual[j - 1] + 1, anterior[j - 1] + (ca != cb)))
+        anterior = actual
+    return anterior[-1]
+
+
+def tasa_error_caracteres(lector, corpus):
+    """Ejecuta el lector sobre el corpus y retorna (CER, segundos)"""
+    errores = 0
+    caracteres = 0
+    inicio = time.perf_counter()
+    for imagen, textos in corpus:
+        leido = ' '.join(lector.readtext(imagen, detail=0, paragraph=True))
+        esperado = ' '.join(textos)
+        errores += distancia_edicion(leido, esperado)
+        caracteres += len(esperado)
+    return errores / max(1, caracteres), time.perf_counter() - inicio
+
+
+def benchmark_cuantizacion(args):
+    """Compara el reconocedor float contra el int8 dinámico (velocidad, memoria, CER)"""
+    import easyocr
+    from src.infrastructure.quantization import module_size_bytes
+
+    corpus = generar_capturas(args.imagenes, semilla=1)
+
+    flotante = easyocr.Reader(args.idiomas, gpu=False, quantize=False)
+    memoria_float = module_size_bytes(flotante.recognizer)
+    flotante.readtext(corpus[0][0], detail=0)
+    cer_float, tiempo_float = tasa_error_caracteres(flotante, corpus)
+
+    inicio = time.perf_counter()
+    cuantizado = easyocr.Reader(args.idiomas, gpu=False, quantize=True)
+    print(f"Lector int8 listo en {time.perf_counter() - inicio:.2f}s")
+    memoria_int8 = module_size_bytes(cuantizado.recognizer)
+    cuantizado.readtext(corpus[0][0], detail=0)
+    cer_int8, tiempo_int8 = tasa_error_caracteres(cuantizado, corpus)
+
+    print(f"Imágenes: {len(corpus)}")
+    print(f"  Float: {len(corpus) / tiempo_float:6.2f} img/s, reconocedor {memoria_float / 2**20:.1f} MB, CER {cer_float:.2%}")
+    print(f"  Int8:  {len(corpus) / tiempo_int8:6.2f} img/s, reconocedor {memoria_int8 / 2**20:.1f} MB, CER {cer_int8:.2%}")
+    print(f"  Aceleración: {tiempo_float / tiempo_int8:.2f}x, memoria ahorrada: "
+          f"{(memoria_float - memoria_int8) / 2**20:.1f} MB, delta CER: {cer_int8 - cer_float:+.2%}")
+
+
+def benchmark_onnx(args):
+    """Compara arranque y latencia por imagen de ONNX Runtime contra torch"""
+    from src.infrastructure.onnx_ocr_adapter import OnnxOCRAdapter, export_onnx_models
+
+    corpus = generar_capturas(args.imagenes, semilla=2)
+
+    inicio = time.perf_counter()
+    export_onnx_models(args.idiomas)
+    print(f"Exportación ONNX (solo la primera vez): {time.perf_counter() - inicio:.2f}s")
+
+    inicio = time.perf_counter()
+    import easyocr
+    lector_torch = easyocr.Reader(args.idiomas, gpu=False)
+    arranque_torch = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    lector_onnx = OnnxOCRAdapter(args.idiomas)
+    arranque_onnx = time.perf_counter() - inicio
+
+    latencias = {}
+    for nombre, lector in (("torch", lector_torch), ("onnx", lector_onnx)):
+        lector.readtext(corpus[0][0], detail=0)
+        tiempos = []
+        for imagen, _ in corpus:
+            inicio = time.perf_counter()
+            lector.readtext(imagen, detail=0, paragraph=True)
+            tiempos.append(time.perf_counter() - inicio)
+        tiempos.sort()
+        latencias[nombre] = (sum(tiempos) / len(tiempos), tiempos[int(len(tiempos) * 0.95) - 1])
+
+    print(f"Imágenes: {len(corpus)}")
+    print(f"  Torch: arranque {arranque_torch:.2f}s, latencia media {latencias['torch'][0] * 1000:.0f} ms "
+          f"(p95 {latencias['torch'][1] * 1000:.0f} ms)")
+    print(f"  ONNX:  arranque {arranque_onnx:.2f}s, latencia media {latencias['onnx'][0] * 1000:.0f} ms "
+          f"(p95 {latencias['onnx'][1] * 1000:.0f} ms)")
+
+
+def generar_fotos(cantidad, directorio, ancho=4000, alto=3000, tamano_fuente=110, semilla=3):
+    """Genera 'fotos' JPEG de 12 MP con texto grande y retorna (ruta, textos)"""
+    from PIL import Image, ImageDraw, ImageFont
+
+    rng = random.Random(semilla)
+    try:
+        fuente = ImageFont.truetype("DejaVuSans.ttf", tamano_fuente)
+    except OSError:
+        fuente = ImageFont.load_default()
+
+    fotos = []
+    for i in range(cantidad):
+        imagen = Image.new("RGB", (ancho, alto), (235, 232, 225))
+        dibujo = ImageDraw.Draw(imagen)
+        textos = []
+        for linea in range(6):
+            texto = ' '.join(
+                ''.join(rng.choice(string.ascii_letters) for _ in range(rng.randint(3, 8)))
+                for _ in range(rng.randint(2, 4))
+            )
+            dibujo.text((200, 250 + linea * tamano_fuente * 3), texto, fill=(30, 30, 30), font=fuente)
+            textos.append(texto)
+        ruta = os.path.join(directorio, f"foto_{i:03d}.jpg")
+        imagen.save(ruta, quality=90)
+        fotos.append((ruta, textos))
+    return fotos
+
+
+def benchmark_normalizacion(args):
+    """Compara decodificación+OCR nativa contra la normalizada por altura de texto"""
+    from src.domain.entities import PerformanceSettings
+    from src.infrastructure.ocr_adapter import run_readtext
+
+    lector = cargar_lector(args.idiomas)
+    with tempfile.TemporaryDirectory() as directorio:
+        fotos = generar_fotos(args.imagenes, directorio)
+        run_readtext(lector, fotos[0][0], PerformanceSettings(normalize_input=True))
+
+        for nombre, normalizar in (("Nativa", False), ("Normalizada", True)):
+            ajustes = PerformanceSettings(normalize_input=normalizar)
+            errores = caracteres = 0
+            inicio = time.perf_counter()
+            for ruta, textos in fotos:
+                leido = ' '.join(run_readtext(lector, ruta, ajustes, detail=0, paragraph=True))
+                esperado = ' '.join(textos)
+                errores += distancia_edicion(leido, esperado)
+                caracteres += len(esperado)
+            duracion = time.perf_counter() - inicio
+            print(f"  {nombre:12s} {duracion / len(fotos) * 1000:7.0f} ms/img, CER {errores / max(1, caracteres):.2%}")
+
+
+def benchmark_regiones(args):
+    """Latencia de la lectura por regiones frente al área seleccionada"""
+    from src.domain.entities import PerformanceSettings
+    from src.infrastructure.ocr_adapter import run_readtext, read_regions
+
+    lector = cargar_lector(args.idiomas)
+    ajustes = PerformanceSettings()
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = guardar_capturas(generar_capturas(1, lineas=22, ancho=1920, alto=1000), directorio)[0]
+        run_readtext(lector, ruta, ajustes)
+
+        inicio = time.perf_counter()
+        for _ in range(args.repeticiones):
+            run_readtext(lector, ruta, ajustes)
+        completa = (time.perf_counter() - inicio) / args.repeticiones
+        print(f"  Imagen completa:  {completa * 1000:7.0f} ms")
+
+        for fraccion in (0.5, 0.25, 0.0625):
+            lado = fraccion ** 0.5
+            region = (0, 0, int(1920 * lado), int(1000 * lado))
+            inicio = time.perf_counter()
+            for _ in range(args.repeticiones):
+                read_regions(lector, ruta, [region], readtext_options=ajustes.readtext_options)
+            duracion = (time.perf_counter() - inicio) / args.repeticiones
+            print(f"  Región {fraccion:6.2%} área: {duracion * 1000:7.0f} ms ({duracion / completa:.0%} del tiempo)")
+
+
+def degradar(arreglo, semilla=0):
+    """Reduce la resolución y el contraste de una captura y agrega ruido"""
+    import numpy as np
+    from PIL import Image
+
+    rng = np.random.default_rng(semilla)
+    imagen = Image.fromarray(arreglo)
+    imagen = imagen.resize((imagen.width // 2, imagen.height // 2), Image.Resampling.BILINEAR)
+    valores = np.asarray(imagen).astype(np.float32) * 0.35 + 120
+    valores += rng.normal(0, 8, valores.shape)
+    return np.clip(valores, 0, 255).astype(np.uint8)
+
+
+def benchmark_refinamiento(args):
+    """Segunda pasada selectiva frente a una sola pasada y a una pasada ampliada completa"""
+    from dataclasses import replace
+    from src.domain.entities import PerformanceSettings
+    from src.infrastructure.ocr_adapter import ocr_lines, format_lines
+
+    lector = cargar_lector(args.idiomas)
+    capturas = [(degradar(img, i), textos) for i, (img, textos) in enumerate(generar_capturas(args.imagenes))]
+    ajustes = PerformanceSettings(normalize_input=False, detect_orientation=False)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        rutas = guardar_capturas(capturas, directorio)
+
+        def medir(nombre, leer):
+            errores = caracteres = 0
+            inicio = time.perf_counter()
+            for ruta, (_, textos) in zip(rutas, capturas):
+                leido = ' '.join(leer(ruta))
+                esperado = ' '.join(textos)
+                errores += distancia_edicion(leido, esperado)
+                caracteres += len(esperado)
+            duracion = time.perf_counter() - inicio
+            print(f"  {nombre:22s} {duracion / len(rutas) * 1000:7.0f} ms/img, CER {errores / max(1, caracteres):.2%}")
+
+        medir("Una pasada", lambda ruta: format_lines(ocr_lines(lector, ruta, replace(ajustes, refine_threshold=0.0))[0]))
+        medir("Segunda pasada (<0.5)", lambda ruta: format_lines(ocr_lines(lector, ruta, ajustes)[0]))
+        medir("Pasada completa x2", lambda ruta: lector.readtext(ruta, detail=0, paragraph=True, mag_ratio=2.0))
+
+
+def generar_sin_texto(cantidad, ancho=1700, alto=2200, semilla=5):
+    """Genera páginas en blanco con ruido de escáner y 'fotos' suaves sin texto"""
+    import numpy as np
+
+    rng = np.random.default_rng(semilla)
+    imagenes = []
+    for i in range(cantidad):
+        if i % 2 == 0:
+            pagina = np.full((alto, ancho), 245, dtype=np.float32) + rng.normal(0, 2, (alto, ancho))
+        else:
+            y, x = np.mgrid[0:alto, 0:ancho].astype(np.float32)
+            pagina = 128 + 60 * np.sin(x / rng.uniform(80, 300)) * np.cos(y / rng.uniform(80, 300))
+            pagina += rng.normal(0, 4, (alto, ancho))
+        imagenes.append((np.clip(pagina, 0, 255).astype(np.uint8), []))
+    return imagenes
+
+
+def benchmark_presencia(args):
+    """Precisión y costo del pre-filtro de texto frente al OCR completo"""
+    from src.infrastructure.text_presence import TextPresenceFilter
+
+    lector = cargar_lector(args.idiomas)
+    con_texto = generar_capturas(args.imagenes // 2, lineas=3)
+    sin_texto = generar_sin_texto(args.imagenes - len(con_texto))
+    filtro = TextPresenceFilter()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        rutas_texto = guardar_capturas(con_texto, directorio)
+        rutas_vacias = guardar_capturas(sin_texto, directorio, prefijo="vacia")
+        lector.readtext(rutas_texto[0], detail=0)
+
+        inicio = time.perf_counter()
+        falsos_negativos = sum(not filtro.analyze(ruta)[0] for ruta in rutas_texto)
+        descartadas = sum(not filtro.analyze(ruta)[0] for ruta in rutas_vacias)
+        duracion_filtro = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        for ruta in rutas_vacias:
+            lector.readtext(ruta, detail=0)
+        duracion_ocr = time.perf_counter() - inicio
+
+    total = len(rutas_texto) + len(rutas_vacias)
+    print(f"  Pre-filtro:        {duracion_filtro / total * 1000:7.1f} ms/img")
+    print(f"  OCR sin texto:     {duracion_ocr / len(rutas_vacias) * 1000:7.1f} ms/img")
+    print(f"  Sin texto omitidas {descartadas}/{len(rutas_vacias)}, con texto perdidas {falsos_negativos}/{len(rutas_texto)}")
+    print(f"  Ahorro estimado:   {duracion_ocr * descartadas / len(rutas_vacias) - duracion_filtro:.2f}s")
+
+
+def benchmark_orientacion(args):
+    """Aciertos y costo del detector de orientación frente a una pasada de OCR"""
+    from PIL import Image
+    from src.infrastructure.orientation import estimate_orientation
+
+    lector = cargar_lector(args.idiomas)
+    capturas = generar_capturas(args.imagenes, lineas=6, ancho=1200, alto=320)
+    with tempfile.TemporaryDirectory() as directorio:
+        casos = []
+        for i, (arreglo, _) in enumerate(capturas):
+            giro = (0, 90, 180, 270)[i % 4]
+            ruta = os.path.join(directorio, f"girada_{i:03d}.png")
+            # Se gira en sentido horario; el ángulo esperado lo endereza
+            Image.fromarray(arreglo).rotate(-giro, expand=True).save(ruta)
+            casos.append((ruta, giro))
+
+        lector.readtext(casos[0][0], detail=0)
+        aciertos = 0
+        inicio = time.perf_counter()
+        for ruta, giro in casos:
+            aciertos += estimate_orientation(lector, ruta) == giro
+        deteccion = (time.perf_counter() - inicio) / len(casos)
+
+        inicio = time.perf_counter()
+        for ruta, _ in casos:
+            lector.readtext(ruta, detail=0)
+        ocr = (time.perf_counter() - inicio) / len(casos)
+
+    print(f"  Aciertos:      {aciertos}/{len(casos)}")
+    print(f"  Detección:     {deteccion * 1000:7.1f} ms/img")
+    print(f"  Pasada de OCR: {ocr * 1000:7.1f} ms/img ({deteccion / ocr:.1%} de una pasada)")
+
+
+def benchmark_idiomas(args):
+    """Trabajos con idiomas alternados: caché LRU de lectores con presupuesto de memoria"""
+    from src.infrastructure.reader_registry import ReaderRegistry
+
+    conjuntos = [['en'], ['en', 'es'], ['en', 'fr'], ['en', 'de']]
+    imagen = generar_capturas(1)[0][0]
+    presupuestos = (("Sin caché", 1), ("Presupuesto", args.presupuesto_mb * 1024 * 1024), ("Sin límite", None))
+    for nombre, presupuesto in presupuestos:
+        registro = ReaderRegistry(memory_budget=presupuesto)
+        inicio = time.perf_counter()
+        for trabajo in range(args.trabajos):
+            registro.get_reader(conjuntos[trabajo % len(conjuntos)]).readtext(imagen, detail=0)
+        duracion = time.perf_counter() - inicio
+        estado = registro.stats()
+        print(f"  {nombre:12s} {duracion:7.2f}s  aciertos={estado['hits']} fallos={estado['misses']} "
+              f"desalojos={estado['evictions']} residente={estado['resident_bytes'] / 2**20:.0f} MB")
+        registro.clear()
+
+
+MUESTRAS_ESCRITURA = {
+    'latin': ("DejaVuSans.ttf", "Factura número 4821 pagada el martes"),
+    'cyrillic': ("DejaVuSans.ttf", "Счёт номер 4821 оплачен во вторник"),
+    'arabic': ("DejaVuSans.ttf", "تم دفع الفاتورة رقم يوم الثلاثاء"),
+    'cjk': ("NotoSansCJK-Regular.ttc", "发票编号已于星期二支付完毕"),
+}
+
+
+def benchmark_escritura(args):
+    """Enrutamiento por escritura frente a un lector multilingüe fijo"""
+    from PIL import Image, ImageDraw, ImageFont
+    from src.infrastructure.reader_registry import get_reader_registry, reader_memory
+    from src.infrastructure.script_detection import ScriptRouter
+
+    router = ScriptRouter(args.idiomas)
+    lector_latino = cargar_lector(router.latin_languages)
+    with tempfile.TemporaryDirectory() as directorio:
+        casos = []
+        for escritura, (fuente, texto) in MUESTRAS_ESCRITURA.items():
+            try:
+                tipografia = ImageFont.truetype(fuente, 28)
+            except OSError:
+                print(f"  (sin fuente para {escritura}, se omite)")
+                continue
+            for i in range(args.imagenes // len(MUESTRAS_ESCRITURA) or 1):
+                imagen = Image.new("RGB", (900, 200), "white")
+                dibujo = ImageDraw.Draw(imagen)
+                for linea in range(3):
+                    dibujo.text((20, 20 + linea * 56), texto, fill="black", font=tipografia)
+                ruta = os.path.join(directorio, f"{escritura}_{i}.png")
+                imagen.save(ruta)
+                casos.append((ruta, escritura))
+
+        aciertos = 0
+        inicio = time.perf_counter()
+        for ruta, escritura in casos:
+            aciertos += router.detect_script(lector_latino, ruta, cargar_lector) == escritura
+        duracion = (time.perf_counter() - inicio) / max(1, len(casos))
+
+    print(f"  Aciertos:        {aciertos}/{len(casos)}")
+    print(f"  Detección:       {duracion * 1000:7.1f} ms/img")
+    print(f"  Lector latino:   {reader_memory(lector_latino) / 2**20:7.1f} MB")
+    registro = get_reader_registry()
+    inicio = time.perf_counter()
+    multilingue = registro.get_reader(['en', 'ru', 'uk', 'be'])
+    print(f"  Lector cirílico+latino: {reader_memory(multilingue) / 2**20:7.1f} MB "
+          f"(carga {time.perf_counter() - inicio:.2f}s)")
+
+
+def benchmark_ingesta(args):
+    """Lecturas de archivo y tiempo por imagen: ruta en cada etapa frente a ingesta única"""
+    from src.domain.entities import PerformanceSettings
+    from src.infrastructure.ingestion import file_reads, ingest_image, reset_file_reads
+    from src.infrastructure.ocr_adapter import ocr_lines
+
+    lector = cargar_lector(args.idiomas)
+    ajustes = PerformanceSettings()
+    with tempfile.TemporaryDirectory() as directorio:
+        fotos = generar_fotos(args.imagenes, directorio, ancho=2000, alto=1500, tamano_fuente=55)
+        ocr_lines(lector, fotos[0][0], ajustes)
+
+        for nombre, cargar in (("Ruta", lambda ruta: ruta),
+                               ("Ingesta", lambda ruta: ingest_image(ruta).pixels)):
+            reset_file_reads()
+            inicio = time.perf_counter()
+            for ruta, _ in fotos:
+                ocr_lines(lector, cargar(ruta), ajustes)
+            duracion = (time.perf_counter() - inicio) / len(fotos)
+            lecturas = sum(file_reads.values()) / len(fotos)
+            print(f"  {nombre:8s} {duracion * 1000:7.0f} ms/img, {lecturas:.1f} lecturas de archivo/img")
+
+
+def benchmark_cancelacion(args):
+    """Latencia entre cancelar y que la extracción en curso devuelva el control"""
+    import threading
+    from src.domain.cancellation import CancellationToken, OperationCancelled
+    from src.domain.entities import PerformanceSettings
+    from src.infrastructure.ocr_adapter import ocr_lines
+
+    lector = cargar_lector(args.idiomas)
+    ajustes = PerformanceSettings()
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = generar_fotos(1, directorio, ancho=6000, alto=4500, tamano_fuente=90)[0][0]
+        inicio = time.perf_counter()
+        ocr_lines(lector, ruta, ajustes)
+        completa = time.perf_counter() - inicio
+
+        latencias = []
+        for i in range(args.repeticiones):
+            token = CancellationToken()
+            demora = completa * (i + 1) / (args.repeticiones + 1)
+            cancelado = []
+
+            def cancelar(token=token, cancelado=cancelado):
+                cancelado.append(time.perf_counter())
+                token.cancel()
+
+            threading.Timer(demora, cancelar).start()
+            try:
+                ocr_lines(lector, ruta, ajustes, cancel_token=token)
+            except OperationCancelled:
+                latencias.append(time.perf_counter() - cancelado[0])
+
+    print(f"  Extracción completa: {completa:.2f}s")
+    if latencias:
+        print(f"  Latencia de cancelación: media {sum(latencias) / len(latencias) * 1000:.0f} ms, "
+              f"máx {max(latencias) * 1000:.0f} ms ({len(latencias)} cancelaciones)")
+
+
+def benchmark_streaming(args):
+    """Tiempo hasta el primer texto visible frente al tiempo total de la extracción"""
+    from src.domain.entities import PerformanceSettings
+    from src.infrastructure.ingestion import ingest_image
+    from src.infrastructure.ocr_adapter import iter_ocr_lines, ocr_lines
+
+    lector = cargar_lector(args.idiomas)
+    ajustes = PerformanceSettings()
+    with tempfile.TemporaryDirectory() as directorio:
+        fotos = [ingest_image(ruta).pixels
+                 for ruta, _ in generar_fotos(args.imagenes, directorio, ancho=2480, alto=3508, tamano_fuente=45)]
+        ocr_lines(lector, fotos[0], ajustes)
+
+        primeros, totales, completas = [], [], []
+        for pixeles in fotos:
+            inicio = time.perf_counter()
+            ocr_lines(lector, pixeles, ajustes)
+            completas.append(time.perf_counter() - inicio)
+
+            inicio = time.perf_counter()
+            primero = None
+            for lineas, _, _, _ in iter_ocr_lines(lector, pixeles, ajustes):
+                if lineas and primero is None:
+                    primero = time.perf_counter() - inicio
+            totales.append(time.perf_counter() - inicio)
+            primeros.append(primero if primero is not None else totales[-1])
+
+    def media(valores):
+        return sum(valores) / len(valores)
+
+    print(f"  De una vez:  {media(completas):.2f}s hasta el texto")
+    print(f"  Progresiva:  primer texto {media(primeros):.2f}s, total {media(totales):.2f}s")
+
+
+def benchmark_demonio(args):
+    """Latencia y rendimiento de clientes concurrentes contra un demonio OCR en marcha"""
+    from concurrent.futures import ThreadPoolExecutor
+    from src.infrastructure.daemon_client import DaemonClient, DaemonOverloaded
+
+    cliente = DaemonClient(args.socket, args.port)
+    if not cliente.is_ready():
+        print("  No hay un demonio listo (python -m src.infrastructure.ocr_daemon)")
+        return
+
+    with tempfile.TemporaryDirectory() as directorio:
+        rutas = guardar_capturas(generar_capturas(args.imagenes), directorio)
+        cliente.extract(rutas[0])
+        antes = cliente.stats()
+        latencias, rechazos = [], []
+
+        def extraer(ruta):
+            inicio = time.perf_counter()
+            try:
+                cliente.extract(ruta)
+                latencias.append(time.perf_counter() - inicio)
+            except DaemonOverloaded:
+                rechazos.append(ruta)
+
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.clientes) as clientes:
+            list(clientes.map(extraer, rutas))
+        duracion = time.perf_counter() - inicio
+        despues = cliente.stats()
+
+    lotes = despues['batches'] - antes['batches']
+    agrupadas = despues['batched_images'] - antes['batched_images']
+    latencias.sort()
+    if latencias:
+        print(f"  {len(latencias) / duracion:.2f} img/s con {args.clientes} clientes; "
+              f"latencia p50 {latencias[len(latencias) // 2] * 1000:.0f} ms, "
+              f"p95 {latencias[int(len(latencias) * 0.95) - 1] * 1000:.0f} ms")
+    print(f"  {lotes} lotes agrupados ({agrupadas / max(1, lotes):.1f} img/lote), {len(rechazos)} rechazos")
+
+
+def benchmark_cli(args):
+    """Tiempo de importación y rendimiento estable de la línea de comandos por lotes"""
+    import subprocess
+    import sys
+
+    sonda = ("import sys, time; inicio = time.perf_counter(); import {modulo}; "
+             "print(time.perf_counter() - inicio, any(m.split('.')[0] in ('PyQt6', 'cv2') for m in sys.modules))")
+    for modulo in ("src.cli", "imagen_texto"):
+        salida = subprocess.run([sys.executable, "-c", sonda.format(modulo=modulo)],
+                                capture_output=True, text=True)
+        if salida.returncode != 0:
+            print(f"  import {modulo}: no disponible ({salida.stderr.strip().splitlines()[-1]})")
+            continue
+        segundos, qt_o_cv2 = salida.stdout.split()
+        print(f"  import {modulo}: {float(segundos) * 1000:.0f} ms, PyQt6/cv2 importados: {qt_o_cv2}")
+
+    with tempfile.TemporaryDirectory() as directorio:
+        entrada = os.path.join(directorio, "entrada")
+        os.makedirs(entrada)
+        guardar_capturas(generar_capturas(args.imagenes), entrada)
+        for workers in sorted({1, args.workers}):
+            inicio = time.perf_counter()
+            codigo = subprocess.call([sys.executable, "-m", "src.cli", entrada, "--workers", str(workers),
+                                      "--salida", os.path.join(directorio, f"salida_{workers}")],
+                                     stderr=subprocess.DEVNULL)
+            duracion = time.perf_counter() - inicio
+            print(f"  workers={workers}: {args.imagenes / duracion:.2f} img/s "
+                  f"(incluye arranque, código de salida {codigo})")
+
+
+def benchmark_cache(args):
+    """Extracción completa frente a acierto de la caché de resultados por contenido"""
+    from src.domain.entities import PerformanceSettings
+    from src.infrastructure.ingestion import ingest_image
+    from src.infrastructure.ocr_adapter import format_lines, ocr_lines
+    from src.infrastructure.result_cache import ResultCache, engine_params
+
+    lector = cargar_lector(args.idiomas)
+    ajustes = PerformanceSettings()
+    parametros = engine_params(ajustes, args.idiomas)
+    with tempfile.TemporaryDirectory() as directorio:
+        cache = ResultCache(os.path.join(directorio, "cache.sqlite3"))
+        rutas = guardar_capturas(generar_capturas(args.imagenes), directorio)
+        ocr_lines(lector, rutas[0], ajustes)
+
+        tiempos = {}
+        for pasada in ("Sin caché", "Con caché"):
+            inicio = time.perf_counter()
+            for ruta in rutas:
+                clave, guardado = cache.lookup(ruta, parametros)
+                if guardado is None:
+                    lineas, angulo = ocr_lines(lector, ingest_image(ruta).pixels, ajustes)
+                    cache.put(clave, {'texts': format_lines(lineas), 'orientation': angulo, 'confidence': None})
+            tiempos[pasada] = (time.perf_counter() - inicio) / len(rutas)
+
+        # Reinicio: los digests memorizados evitan releer los archivos
+        reabierta = ResultCache(cache.path)
+        inicio = time.perf_counter()
+        for ruta in rutas:
+            reabierta.lookup(ruta, parametros)
+        tiempos["Tras reiniciar"] = (time.perf_counter() - inicio) / len(rutas)
+        estadisticas = reabierta.stats()
+
+    for nombre, segundos in tiempos.items():
+        print(f"  {nombre:14s} {segundos * 1000:8.2f} ms/img")
+    print(f"  Tras reiniciar: {estadisticas['hit_rate']:.0%} aciertos, "
+          f"{estadisticas['files_hashed']} archivos releídos para hashear")
+
+
+def benchmark_duplicados(args):
+    """Búsqueda por radio de Hamming (multi-índice vs recorrido lineal) y dHash de capturas"""
+    from src.infrastructure.perceptual_index import MultiIndexHash, hamming, image_signature, same_content
+
+    rng = random.Random(7)
+    firmas = [rng.getrandbits(64) for _ in range(args.firmas)]
+    indice = MultiIndexHash(args.radio)
+    inicio = time.perf_counter()
+    for posicion, firma in enumerate(firmas):
+        indice.add(firma, posicion)
+    print(f"  Índice de {len(indice)} firmas construido en {time.perf_counter() - inicio:.2f}s")
+
+    # Consultas a distancia 1..radio de firmas existentes (siempre hay un casi duplicado)
+    consultas = []
+    for _ in range(args.consultas):
+        firma = rng.choice(firmas)
+        for bit in rng.sample(range(64), rng.randint(1, max(1, args.radio))):
+            firma ^= 1 << bit
+        consultas.append(firma)
+
+    inicio = time.perf_counter()
+    multi = [indice.search(consulta) for consulta in consultas]
+    tiempo_multi = (time.perf_counter() - inicio) / len(consultas)
+    muestra = consultas[:max(1, len(consultas) // 20)]
+    inicio = time.perf_counter()
+    lineal = [[posicion for posicion, firma in enumerate(firmas) if hamming(consulta, firma) <= args.radio]
+              for consulta in muestra]
+    tiempo_lineal = (time.perf_counter() - inicio) / len(muestra)
+    coinciden = all(sorted(valor for _, valor in multi[i]) == sorted(lineal[i]) for i in range(len(muestra)))
+    print(f"  Multi-índice   {tiempo_multi * 1e6:10.1f} µs/consulta")
+    print(f"  Lineal         {tiempo_lineal * 1e6:10.1f} µs/consulta "
+          f"({tiempo_lineal / tiempo_multi if tiempo_multi else 0:.0f}x); resultados iguales: {coinciden}")
+
+    # Misma captura con cursor y recompresión JPEG frente a otra captura
+    import io
+    from PIL import Image, ImageDraw
+
+    (original, _), (otra, _) = generar_capturas(2, lineas=4, ancho=1280, alto=720)
+    imagen = Image.fromarray(original)
+    con_cursor = imagen.copy()
+    ImageDraw.Draw(con_cursor).polygon([(600, 300), (600, 322), (606, 317), (611, 327), (614, 325), (609, 315), (616, 315)],
+                                       fill="black", outline="white")
+    buffer = io.BytesIO()
+    con_cursor.save(buffer, format="JPEG", quality=80)
+    base = image_signature(imagen)
+    for nombre, fuente in (("Con cursor + JPEG", buffer.getvalue()), ("Otra captura", otra)):
+        firma = image_signature(fuente)
+        celdas = max(hamming(a, b) for a, b in zip(base[1], firma[1]))
+        print(f"  {nombre:18s} distancia global {hamming(base[0], firma[0]):2d}, peor celda {celdas:2d}, "
+              f"miniatura igual: {same_content(base[2], firma[2])}")
+
+
+def benchmark_vigilancia(args):
+    """Arranque de la carpeta vigilada: manifiesto frente a releer y hashear cada archivo"""
+    from src.infrastructure.folder_watcher import WatchManifest, file_signature, scan_folder
+    from src.infrastructure.ingestion import read_image_bytes
+    from src.infrastructure.result_cache import digest_bytes
+
+    rng = random.Random(11)
+    with tempfile.TemporaryDirectory() as directorio:
+        for i in range(args.imagenes):
+            with open(os.path.join(directorio, f"escaneo_{i:05d}.jpg"), "wb") as f:
+                f.write(rng.randbytes(args.kb * 1024))
+        manifiesto = WatchManifest(os.path.join(directorio, "salida", ".manifiesto.sqlite3"))
+        for ruta in scan_folder(directorio):
+            manifiesto.record(ruta, file_signature(ruta), 'completed', digest_bytes(read_image_bytes(ruta)))
+
+        inicio = time.perf_counter()
+        pendientes = [ruta for ruta in scan_folder(directorio) if not manifiesto.is_current(ruta)]
+        con_manifiesto = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        for ruta in scan_folder(directorio):
+            digest_bytes(read_image_bytes(ruta))
+        releyendo = time.perf_counter() - inicio
+        manifiesto.close()
+
+    print(f"  {args.imagenes} imágenes de {args.kb} KB ya procesadas; pendientes tras reiniciar: {len(pendientes)}")
+    print(f"  Con manifiesto     {con_manifiesto * 1000:8.1f} ms")
+    print(f"  Releyendo todo     {releyendo * 1000:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks del motor OCR")
+    parser.add_argument("--idiomas", nargs="+", default=["en", "es"])
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    lotes = subparsers.add_parser("lotes", help="Reconocimiento agrupado entre imágenes")
+    lotes.add_argument("--imagenes", type=int, default=40)
+    lotes.add_argument("--batch-size", type=int, default=32)
+    lotes.set_defaults(func=benchmark_lotes)
+
+    procesos = subparsers.add_parser("procesos", help="Escalado del motor multiproceso")
+    procesos.add_argument("--imagenes", type=int, default=64)
+    procesos.add_argument("--max-workers", type=int, default=None)
+    procesos.set_defaults(func=benchmark_procesos)
+
+    cuantizacion = subparsers.add_parser("cuantizacion", help="Reconocedor float vs int8 dinámico")
+    cuantizacion.add_argument("--imagenes", type=int, default=40)
+    cuantizacion.set_defaults(func=benchmark_cuantizacion)
+
+    onnx = subparsers.add_parser("onnx", help="Backend ONNX Runtime vs torch")
+    onnx.add_argument("--imagenes", type=int, default=20)
+    onnx.set_defaults(func=benchmark_onnx)
+
+    normalizacion = subparsers.add_parser("normalizacion", help="Normalización por altura de texto y draft() JPEG")
+    normalizacion.add_argument("--imagenes", type=int, default=10)
+    normalizacion.set_defaults(func=benchmark_normalizacion)
+
+    regiones = subparsers.add_parser("regiones", help="Lectura por regiones vs imagen completa")
+    regiones.add_argument("--repeticiones", type=int, default=5)
+    regiones.set_defaults(func=benchmark_regiones)
+
+    refinamiento = subparsers.add_parser("refinamiento", help="Segunda pasada de líneas dudosas")
+    refinamiento.add_argument("--imagenes", type=int, default=20)
+    refinamiento.set_defaults(func=benchmark_refinamiento)
+
+    presencia = subparsers.add_parser("presencia", help="Pre-filtro de imágenes sin texto")
+    presencia.add_argument("--imagenes", type=int, default=30)
+    presencia.set_defaults(func=benchmark_presencia)
+
+    orientacion = subparsers.add_parser("orientacion", help="Detección de orientación 0/90/180/270")
+    orientacion.add_argument("--imagenes", type=int, default=12)
+    orientacion.set_defaults(func=benchmark_orientacion)
+
+    idiomas = subparsers.add_parser("idiomas", help="Caché LRU de lectores por idiomas")
+    idiomas.add_argument("--trabajos", type=int, default=12)
+    idiomas.add_argument("--presupuesto-mb", type=int, default=400)
+    idiomas.set_defaults(func=benchmark_idiomas)
+
+    escritura = subparsers.add_parser("escritura", help="Detección de escritura y enrutamiento de lectores")
+    escritura.add_argument("--imagenes", type=int, default=8)
+    escritura.set_defaults(func=benchmark_escritura)
+
+    ingesta = subparsers.add_parser("ingesta", help="Lecturas de archivo con decodificación única")
+    ingesta.add_argument("--imagenes", type=int, default=6)
+    ingesta.set_defaults(func=benchmark_ingesta)
+
+    cancelacion = subparsers.add_parser("cancelacion", help="Latencia de cancelación durante el OCR")
+    cancelacion.add_argument("--repeticiones", type=int, default=5)
+    cancelacion.set_defaults(func=benchmark_cancelacion)
+
+    streaming = subparsers.add_parser("streaming", help="Tiempo hasta el primer texto con lectura progresiva")
+    streaming.add_argument("--imagenes", type=int, default=4)
+    streaming.set_defaults(func=benchmark_streaming)
+
+    demonio = subparsers.add_parser("demonio", help="Clientes concurrentes contra el demonio OCR")
+    demonio.add_argument("--imagenes", type=int, default=32)
+    demonio.add_argument("--clientes", type=int, default=8)
+    demonio.add_argument("--socket", default=None)
+    demonio.add_argument("--port", type=int, default=None)
+    demonio.set_defaults(func=benchmark_demonio)
+
+    cli = subparsers.add_parser("cli", help="Importación y rendimiento de python -m src.cli")
+    cli.add_argument("--imagenes", type=int, default=32)
+    cli.add_argument("--workers", type=int, default=4)
+    cli.set_defaults(func=benchmark_cli)
+
+    cache = subparsers.add_parser("cache", help="Caché persistente de resultados por contenido")
+    cache.add_argument("--imagenes", type=int, default=20)
+    cache.set_defaults(func=benchmark_cache)
+
+    duplicados = subparsers.add_parser("duplicados", help="Índice de casi duplicados por hash perceptual")
+    duplicados.add_argument("--firmas", type=int, default=300000)
+    duplicados.add_argument("--consultas", type=int, default=1000)
+    duplicados.add_argument("--radio", type=int, default=4)
+    duplicados.set_defaults(func=benchmark_duplicados)
+
+    vigilancia = subparsers.add_parser("vigilancia", help="Reinicio de la carpeta vigilada con manifiesto")
+    vigilancia.add_argument("--imagenes", type=int, default=2000)
+    vigilancia.add_argument("--kb", type=int, default=300)
+    vigilancia.set_defaults(func=benchmark_vigilancia)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
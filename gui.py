@@ -3,11 +3,13 @@ import os
 import time
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QLabel, QPushButton, 
                             QVBoxLayout, QHBoxLayout, QWidget, QFileDialog, 
-                            QMessageBox, QProgressBar, QMenuBar, QMenu, QScrollArea, QDialog, QSizePolicy, QSpacerItem)
-from PyQt6.QtCore import Qt, QThread, pyqtSignal, QPropertyAnimation, QEasingCurve
-from PyQt6.QtGui import QPixmap, QDragEnterEvent, QDropEvent, QIcon, QKeySequence
-from PIL import Image
+                            QMessageBox, QProgressBar, QMenuBar, QMenu, QScrollArea, QDialog, QSizePolicy, QSpacerItem,
+                            QRubberBand, QPlainTextEdit)
+from PyQt6.QtCore import Qt, QThread, QTimer, pyqtSignal, QPropertyAnimation, QEasingCurve, QRect, QSize
+from PyQt6.QtGui import QPixmap, QImage, QDragEnterEvent, QDropEvent, QIcon, QKeySequence
 from imagen_texto import TextExtractorApp
+from src.infrastructure.ingestion import preview_image
+from src.domain.cancellation import CancellationToken
 from config import ConfigManager
 from utils import ClipboardManager, ImageProcessor, SecurityValidator, SecurityLogger
 from text_editor_dialog import TextEditorDialog
@@ -20,18 +22,38 @@ from search_text_dialog import SearchTextDialog
 class ExtractionWorker(QThread):
     finished = pyqtSignal(list)
     progress = pyqtSignal(int)
+    # Párrafos provisorios a medida que el motor los reconoce
+    partial = pyqtSignal(list)
     error = pyqtSignal(str)
     processing_time = pyqtSignal(float)
 
-    def __init__(self, app_logic):
+    def __init__(self, app_logic, regions=None):
         super().__init__()
         self.app_logic = app_logic
+        self.regions = regions
+        # Segundos hasta el primer texto visible (None = aún no llegó)
+        self.first_text_seconds = None
+        self.cancel_token = CancellationToken()
+
+    def cancel(self):
+        """Pide detener la extracción en el próximo punto de control"""
+        self.cancel_token.cancel()
 
     def run(self):
         try:
             start_time = time.time()
-            self.progress.emit(20)
-            result = self.app_logic.extract_text()
+
+            def on_progress(paragraphs, done, total):
+                texts = [str(text) for text in paragraphs if text]
+                if texts:
+                    if self.first_text_seconds is None:
+                        self.first_text_seconds = time.time() - start_time
+                    self.partial.emit(texts)
+                if total:
+                    self.progress.emit(int(done * 100 / total))
+
+            result = self.app_logic.extract_text(regions=self.regions, cancel_token=self.cancel_token,
+                                                 on_progress=on_progress)
             self.progress.emit(100)
             elapsed_time = time.time() - start_time
             self.processing_time.emit(elapsed_time)
@@ -39,6 +61,66 @@ class ExtractionWorker(QThread):
         except Exception as e:
             self.error.emit(str(e))
 
+class ModelWarmupWorker(QThread):
+    """Carga y prepara el motor OCR en segundo plano tras mostrar la ventana"""
+    progress = pyqtSignal(int, str)
+    ready = pyqtSignal()
+    error = pyqtSignal(str)
+
+    def __init__(self, app_logic):
+        super().__init__()
+        self.app_logic = app_logic
+
+    def run(self):
+        try:
+            self.app_logic.warm_up(lambda value, message: self.progress.emit(value, message))
+            self.ready.emit()
+        except Exception as e:
+            self.error.emit(str(e))
+
+class SelectableImageLabel(QLabel):
+    """Vista previa que permite seleccionar una región arrastrando el ratón"""
+    region_selected = pyqtSignal(QRect)
+
+    # Selecciones más pequeñas se consideran un clic
+    MIN_SELECTION = 8
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rubber_band = QRubberBand(QRubberBand.Shape.Rectangle, self)
+        self.origin = None
+
+    def pixmap_rect(self):
+        """Rectángulo que ocupa la imagen dentro del label (centrada)"""
+        pixmap = self.pixmap()
+        if pixmap is None or pixmap.isNull():
+            return QRect()
+        x = (self.width() - pixmap.width()) // 2
+        y = (self.height() - pixmap.height()) // 2
+        return QRect(x, y, pixmap.width(), pixmap.height())
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton and not self.pixmap_rect().isEmpty():
+            self.origin = event.position().toPoint()
+            self.rubber_band.setGeometry(QRect(self.origin, QSize()))
+            self.rubber_band.show()
+        super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        if self.origin is not None:
+            self.rubber_band.setGeometry(QRect(self.origin, event.position().toPoint()).normalized())
+        super().mouseMoveEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        if self.origin is not None:
+            selection = QRect(self.origin, event.position().toPoint()).normalized()
+            self.origin = None
+            self.rubber_band.hide()
+            selection = selection.intersected(self.pixmap_rect())
+            if selection.width() >= self.MIN_SELECTION and selection.height() >= self.MIN_SELECTION:
+                self.region_selected.emit(selection)
+        super().mouseReleaseEvent(event)
+
 class AnimatedButton(QPushButton):
     def __init__(self, text, parent=None):
         super().__init__(text, parent)
@@ -69,6 +151,9 @@ class MainWindow(QMainWindow):
         self.app_logic = TextExtractorApp()
         self.extracted_text = None
         self.current_processing_time = 0
+        self.warmup_worker = None
+        self.worker = None
+        self.engine_ready = False
         self.setWindowTitle("Extractor de imagen a texto")
         self.setWindowIcon(QIcon('icon.png'))
         self.apply_styles()  # Aplicar estilos primero
@@ -98,8 +183,10 @@ class MainWindow(QMainWindow):
         image_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
 
         # Área de imagen
-        self.image_preview = QLabel()
+        self.image_preview = SelectableImageLabel()
         self.image_preview.setFixedSize(880, 460)
+        self.image_preview.setToolTip("Arrastra sobre la imagen para extraer solo esa región")
+        self.image_preview.region_selected.connect(self.extract_text_from_region)
         self.image_preview.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.image_preview.setObjectName("imagePreview")
 
@@ -108,7 +195,16 @@ class MainWindow(QMainWindow):
         self.instruction_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.instruction_label.setObjectName("instructionLabel")
 
+        # Texto provisorio mientras el motor reconoce (se reemplaza al terminar)
+        self.live_text = QPlainTextEdit()
+        self.live_text.setReadOnly(True)
+        self.live_text.setFixedSize(880, 100)
+        self.live_text.setPlaceholderText("Reconociendo texto...")
+        self.live_text.setObjectName("liveText")
+        self.live_text.hide()
+
         image_layout.addWidget(self.image_preview, alignment=Qt.AlignmentFlag.AlignCenter)
+        image_layout.addWidget(self.live_text, alignment=Qt.AlignmentFlag.AlignCenter)
         image_layout.addStretch()
         image_layout.addWidget(self.instruction_label)
 
@@ -261,7 +357,7 @@ class MainWindow(QMainWindow):
         self.load_button.clicked.connect(self.load_image)
         self.camera_button.clicked.connect(self.capture_from_camera)
         self.paste_button.clicked.connect(self.paste_image_from_clipboard)
-        self.extract_button.clicked.connect(self.extract_text_from_image)
+        self.extract_button.clicked.connect(lambda: self.extract_text_from_image())
         self.edit_button.clicked.connect(self.edit_text)
         self.copy_button.clicked.connect(self.copy_to_clipboard)
         self.open_button.clicked.connect(self.open_document)
@@ -321,17 +417,13 @@ class MainWindow(QMainWindow):
         files = [u.toLocalFile() for u in event.mimeData().urls()]
         if files:
             try:
-                # Validar archivo arrastrado
-                is_valid, error = SecurityValidator.validate_image_path(files[0])
-                if not is_valid:
-                    SecurityLogger.log_invalid_input('dropEvent', error)
-                    QMessageBox.critical(self, "Archivo inválido", f"Validación de seguridad rechazada: {error}")
-                    return
-                
+                # Valida y decodifica una sola vez; la vista previa usa el mismo buffer
                 self.app_logic.set_image_path(files[0])
                 self.show_image_preview()
                 self.enable_extract_button()
                 SecurityLogger.log_file_access(files[0], 'drag_drop')
+            except ValueError as e:
+                QMessageBox.critical(self, "Archivo inválido", f"Validación de seguridad rechazada: {e}")
             except Exception as e:
                 SecurityLogger.log_invalid_input('dropEvent', str(e))
                 QMessageBox.critical(self, "Error", f"Error al procesar archivo: {e}")
@@ -345,45 +437,94 @@ class MainWindow(QMainWindow):
         )
         if file_name:
             try:
-                # Validar ruta de imagen antes de procesarla
-                is_valid, error = SecurityValidator.validate_image_path(file_name)
-                if not is_valid:
-                    SecurityLogger.log_invalid_input('load_image', error)
-                    QMessageBox.critical(self, "Archivo inválido", f"Validación de seguridad rechazada: {error}")
-                    return
-                
+                # Valida y decodifica una sola vez; la vista previa usa el mismo buffer
                 self.app_logic.set_image_path(file_name)
                 self.show_image_preview()
                 self.enable_extract_button()
                 SecurityLogger.log_file_access(file_name, 'image_loaded')
+            except ValueError as e:
+                QMessageBox.critical(self, "Archivo inválido", f"Validación de seguridad rechazada: {e}")
             except Exception as e:
                 SecurityLogger.log_invalid_input('load_image', str(e))
                 QMessageBox.critical(self, "Error", f"Error al cargar la imagen: {e}")
 
     def show_image_preview(self):
         try:
-            image = Image.open(self.app_logic.image_path)
-            image.thumbnail((720, 400))
-            image.save("temp.png")
-            pixmap = QPixmap("temp.png")
-            self.image_preview.setPixmap(pixmap)
+            # Miniatura desde los bytes ya leídos (sin releer ni escribir archivos)
+            image = preview_image(self.app_logic.image.source, (720, 400))
+            qimage = QImage(image.tobytes(), image.width, image.height,
+                            3 * image.width, QImage.Format.Format_RGB888)
+            self.image_preview.setPixmap(QPixmap.fromImage(qimage))
             self.instruction_label.hide()
         except Exception as e:
             SecurityLogger.log_invalid_input('show_image_preview', str(e))
             QMessageBox.critical(self, "Error", f"Error al cargar la imagen: {e}")
 
+    def showEvent(self, event):
+        super().showEvent(event)
+        # Calentar el motor OCR después del primer pintado de la ventana
+        if self.warmup_worker is None:
+            QTimer.singleShot(0, self.start_engine_warmup)
+
+    def start_engine_warmup(self):
+        """Inicia la carga del motor OCR en segundo plano"""
+        self.warmup_worker = ModelWarmupWorker(self.app_logic)
+        self.warmup_worker.progress.connect(self.update_warmup_progress)
+        self.warmup_worker.ready.connect(self.handle_engine_ready)
+        self.warmup_worker.error.connect(self.handle_warmup_error)
+        self.warmup_worker.start()
+
+    def update_warmup_progress(self, value, message):
+        self.statusBar().showMessage(f"{message} ({value}%)")
+
+    def handle_engine_ready(self):
+        self.engine_ready = True
+        self.statusBar().showMessage("Motor OCR listo", 3000)
+
+    def handle_warmup_error(self, error_message):
+        # No es fatal: la extracción reintentará la carga
+        SecurityLogger.log_invalid_input('engine_warmup', error_message)
+        self.statusBar().showMessage(f"No se pudo preparar el motor OCR: {error_message}")
+
     def enable_extract_button(self):
         self.extract_button.setEnabled(True)
         self.tools_button.setEnabled(True)
 
-    def extract_text_from_image(self):
-        """Extrae el texto de la imagen"""
+    def extract_text_from_region(self, selection):
+        """Extrae el texto de la región seleccionada en la vista previa"""
+        if not self.app_logic.image_path or not self.extract_button.isEnabled():
+            return
+        
+        # Convertir la selección de la vista previa a píxeles de la imagen original
+        pixmap_rect = self.image_preview.pixmap_rect()
+        width, height = self.app_logic.image.width, self.app_logic.image.height
+        scale_x = width / pixmap_rect.width()
+        scale_y = height / pixmap_rect.height()
+        left = (selection.left() - pixmap_rect.left()) * scale_x
+        top = (selection.top() - pixmap_rect.top()) * scale_y
+        region = (
+            int(left), int(top),
+            min(width, int(round(left + selection.width() * scale_x))),
+            min(height, int(round(top + selection.height() * scale_y)))
+        )
+        self.statusBar().showMessage(
+            f"Extrayendo región {region[2] - region[0]}x{region[3] - region[1]} px", 3000)
+        self.extract_text_from_image(regions=[region])
+
+    def extract_text_from_image(self, regions=None):
+        """Extrae el texto de la imagen (o solo de las regiones indicadas)"""
         self.progress_bar.show()
         self.progress_bar.setValue(0)
         self.extract_button.setEnabled(False)
+        if not self.engine_ready:
+            self.statusBar().showMessage("Esperando a que el motor OCR termine de cargar...")
         
-        self.worker = ExtractionWorker(self.app_logic)
+        self.live_text.clear()
+        self.live_text.show()
+        
+        self.worker = ExtractionWorker(self.app_logic, regions)
         self.worker.progress.connect(self.update_progress)
+        self.worker.partial.connect(self.append_partial_text)
         self.worker.finished.connect(self.handle_extraction_finished)
         self.worker.error.connect(self.handle_extraction_error)
         self.worker.processing_time.connect(self.save_processing_time)
@@ -395,6 +536,11 @@ class MainWindow(QMainWindow):
     def update_progress(self, value):
         self.progress_bar.setValue(value)
 
+    def append_partial_text(self, paragraphs):
+        """Agrega al panel los párrafos que el motor va reconociendo"""
+        for paragraph in paragraphs:
+            self.live_text.appendPlainText(paragraph)
+
     def handle_extraction_finished(self, result):
         try:
             self.extracted_text = result
@@ -407,6 +553,23 @@ class MainWindow(QMainWindow):
             default_format = self.config_manager.get("default_export_format", "docx")
             self.show_export_options(result, default_format)
             
+            # El texto final reagrupa todas las líneas y reemplaza al provisorio
+            self.live_text.setPlainText('\n'.join(result))
+            
+            if self.app_logic.last_near_distance is not None:
+                self.statusBar().showMessage(
+                    "Resultado reutilizado de una imagen casi idéntica "
+                    f"(distancia {self.app_logic.last_near_distance})", 5000)
+            elif self.app_logic.last_cache_hit:
+                self.statusBar().showMessage("Resultado desde la caché (imagen ya extraída)", 5000)
+            elif self.app_logic.last_orientation:
+                self.statusBar().showMessage(
+                    f"Imagen girada {self.app_logic.last_orientation}° en memoria para el OCR", 5000)
+            elif self.worker.first_text_seconds is not None:
+                self.statusBar().showMessage(
+                    f"Primer texto en {self.worker.first_text_seconds:.1f} s de "
+                    f"{self.current_processing_time:.1f} s", 5000)
+            
             self.open_button.setEnabled(True)
             self.edit_button.setEnabled(True)
             self.copy_button.setEnabled(True)
@@ -419,6 +582,7 @@ class MainWindow(QMainWindow):
             self.progress_bar.hide()
 
     def handle_extraction_error(self, error_message):
+        self.live_text.hide()
         QMessageBox.critical(self, "Error", error_message)
         self.extract_button.setEnabled(True)
         self.progress_bar.hide()
@@ -535,7 +699,8 @@ class MainWindow(QMainWindow):
             try:
                 dialog = ImageToolsDialog(self.app_logic.image_path, self)
                 if dialog.exec() == 1:
-                    # Recargar la imagen después de editarla
+                    # Recargar la imagen después de editarla (el archivo cambió en disco)
+                    self.app_logic.set_image_path(self.app_logic.image_path)
                     self.show_image_preview()
                     QMessageBox.information(self, "Éxito", "Cambios aplicados a la imagen")
             except Exception as e:
@@ -557,6 +722,8 @@ class MainWindow(QMainWindow):
     def clear_image(self):
         """Limpia la imagen cargada"""
         self.image_preview.clear()
+        self.live_text.clear()
+        self.live_text.hide()
         self.instruction_label.show()
         self.extract_button.setEnabled(False)
         self.tools_button.setEnabled(False)
@@ -566,6 +733,7 @@ class MainWindow(QMainWindow):
         self.open_button.setEnabled(False)
         self.extracted_text = None
         self.app_logic.image_path = None
+        self.app_logic.image = None
         QMessageBox.information(self, "Limpiado", "Imagen y datos limpiados")
     
     def load_recent_files(self):
@@ -612,7 +780,7 @@ class MainWindow(QMainWindow):
         
         extract_action = process_menu.addAction("Extraer texto...")
         extract_action.setShortcut(QKeySequence.StandardKey.Save)
-        extract_action.triggered.connect(self.extract_text_from_image)
+        extract_action.triggered.connect(lambda: self.extract_text_from_image())
         
         batch_action = process_menu.addAction("Procesamiento por lotes...")
         batch_action.triggered.connect(self.process_batch)
@@ -643,6 +811,15 @@ class MainWindow(QMainWindow):
         clear_shortcut.activated.connect(self.clear_image)
 
     def closeEvent(self, event):
+        # Un QThread destruido en marcha aborta la aplicación: se detienen y se esperan
+        if self.worker is not None and self.worker.isRunning():
+            self.worker.cancel()
+            self.worker.wait()
+        if self.warmup_worker is not None and self.warmup_worker.isRunning():
+            # La carga de modelos no tiene puntos de control: se espera a que termine
+            self.statusBar().showMessage("Esperando a que termine la carga del motor OCR...")
+            self.warmup_worker.wait()
+
         # Limpieza al cerrar la aplicación
         if os.path.exists("temp.png"):
             try:
@@ -1,51 +1,245 @@
-import easyocr
 from docx import Document
-from PyQt6.QtWidgets import QFileDialog
 import subprocess
 import os
 import platform
+import threading
 import time
 import warnings
 import logging
 
 # Importar validadores de seguridad
 from utils import SecurityValidator, SecurityLogger
+from src.infrastructure.reader_registry import get_reader_registry
+from src.infrastructure.configuration_adapter import PerformanceSettingsAdapter, FileConfigurationAdapter
+from src.infrastructure.performance_tuner import apply_performance_settings
+from src.infrastructure.ocr_adapter import ocr_lines, iter_ocr_lines, format_lines, read_regions
+from src.infrastructure.refinement import aggregate_confidence
+from src.infrastructure.script_detection import AUTO_LANGUAGES, ScriptRouter
+from src.infrastructure.ingestion import ingest_image
+from src.infrastructure.result_cache import engine_params, get_result_cache
+from src.infrastructure.perceptual_index import get_near_duplicate_index
+from src.infrastructure.daemon_client import DaemonOverloaded, DaemonUnavailable, find_daemon
+from src.domain.cancellation import DeadlineExceeded, OperationCancelled, check_cancelled
 
 # Suprimir warnings de torch
 logging.getLogger('torch').setLevel(logging.ERROR)
 warnings.filterwarnings('ignore', category=UserWarning)
 
 class TextExtractorApp:
+    OCR_LANGUAGES = ['en', 'es']
+
     def __init__(self):
         self.reader = None
         self.image_path = None
+        # Imagen leída una sola vez al cargarla (Image.data son los bytes del archivo)
+        self.image = None
         self.save_path = None
+        self.is_warmed_up = False
+        # Rotación (grados) aplicada en memoria en la última extracción
+        self.last_orientation = 0
+        # Parámetros de rendimiento guardados por el ajuste automático
+        self.performance = PerformanceSettingsAdapter('config.json').get_settings()
+        # Idiomas OCR por defecto (configurables); cada extracción puede pedir otros
+        self.languages = FileConfigurationAdapter('config.json').get_configuration().ocr_languages or self.OCR_LANGUAGES
+        # Con 'auto' cada imagen se enruta según su escritura; el lector latino es la base
+        self.script_router = ScriptRouter(self.languages) if AUTO_LANGUAGES in self.languages else None
+        # Serializa la carga del motor entre el calentamiento y la extracción
+        self._engine_lock = threading.Lock()
+        # Cliente del demonio OCR si hay uno listo (modo cliente: no se cargan modelos)
+        self.daemon = None
+        # Caché de resultados por contenido (None si está desactivada)
+        self.result_cache = get_result_cache(self.performance)
+        # Casi duplicados (cursor, recompresión) que reutilizan resultados guardados
+        self.near_duplicates = get_near_duplicate_index(self.result_cache, self.performance)
+        # Si la última extracción salió de la caché (y la distancia si fue un casi duplicado)
+        self.last_cache_hit = False
+        self.last_near_distance = None
+
+    @property
+    def base_languages(self):
+        """Idiomas del lector por defecto (sin el marcador 'auto')"""
+        return self.script_router.latin_languages if self.script_router else self.languages
+
+    def _resolve_languages(self, languages=None):
+        """Idiomas para la imagen actual; con 'auto' se detecta la escritura"""
+        languages = languages or self.languages
+        if AUTO_LANGUAGES not in languages:
+            return languages
+        router = self.script_router or ScriptRouter(languages)
+        return router.languages_for(self._ensure_reader(router.latin_languages), self.image.source,
+                                   self._ensure_reader)
+
+    def _ensure_reader(self, languages=None):
+        """
+        Obtiene el lector compartido para los idiomas pedidos. El registro lo
+        carga una sola vez por proceso y lo mantiene mientras quepa en el
+        presupuesto de memoria (LRU), por lo que alternar idiomas no recarga
+        """
+        with self._engine_lock:
+            try:
+                apply_performance_settings(self.performance)
+                self.reader = get_reader_registry().get_reader(
+                    languages or self.base_languages, gpu=False, quantize=self.performance.quantized_recognizer)
+            except Exception as e:
+                raise Exception(f"Error al inicializar EasyOCR: {str(e)}")
+            return self.reader
+
+    def warm_up(self, progress_callback=None):
+        """
+        Carga el motor OCR y ejecuta una inferencia ficticia para preparar torch.
+        Una extracción solicitada mientras tanto espera a que termine.
+
+        Args:
+            progress_callback: Función opcional (porcentaje, mensaje)
+        """
+        def report(value, message):
+            if progress_callback:
+                progress_callback(value, message)
+
+        with self._engine_lock:
+            if self.is_warmed_up:
+                report(100, "Motor OCR listo")
+                return
 
-    def set_image_path(self, path):
-        """Establece la ruta de la imagen a procesar"""
+            # Con un demonio en marcha se usan sus lectores ya cargados
+            self.daemon = find_daemon()
+            if self.daemon is not None:
+                self.is_warmed_up = True
+                report(100, "Motor OCR listo (demonio)")
+                return
+
+            report(10, "Cargando modelos OCR...")
+            try:
+                apply_performance_settings(self.performance)
+                self.reader = get_reader_registry().get_reader(
+                    self.base_languages, gpu=False, quantize=self.performance.quantized_recognizer)
+            except Exception as e:
+                raise Exception(f"Error al inicializar EasyOCR: {str(e)}")
+
+            report(70, "Preparando motor OCR...")
+            import numpy as np
+            dummy = np.full((64, 256, 3), 255, dtype=np.uint8)
+            dummy[24:40, 32:224] = 0
+            self.reader.readtext(dummy, detail=0)
+
+            self.is_warmed_up = True
+            report(100, "Motor OCR listo")
+
+    def set_image_path(self, path, data=None):
+        """
+        Establece la imagen a procesar: la valida y la lee una sola vez. La
+        vista previa y el OCR decodifican desde los mismos bytes
+        (self.image.source), los JPEG directamente a la escala que necesitan
+
+        Args:
+            path: Ruta de la imagen
+            data: Bytes del archivo si ya se leyeron (no se vuelve a leer)
+        """
         # Validar ruta de imagen (OWASP A01)
         is_valid, error = SecurityValidator.validate_image_path(path)
         if not is_valid:
             SecurityLogger.log_invalid_input('image_path', error)
             raise ValueError(f"Ruta de imagen inválida: {error}")
         
+        if data is None and self.result_cache is not None:
+            # Archivo sin digest memorizado: una sola lectura para decodificar y hashear
+            data = self.result_cache.read_unless_known(path)
+        try:
+            self.image = ingest_image(path, validate=False, data=data, decode=False)
+        except ValueError as e:
+            SecurityLogger.log_invalid_input('image_path', str(e))
+            raise
+        if data is not None and self.result_cache is not None:
+            try:
+                self.result_cache.image_digest(path, data)
+            except OSError:
+                pass
         self.image_path = path
 
-    def extract_text(self):
-        """Extrae el texto de la imagen usando EasyOCR"""
-        if not self.image_path:
+    def extract_text(self, regions=None, languages=None, cancel_token=None, on_progress=None):
+        """
+        Extrae el texto de la imagen usando EasyOCR
+        
+        Args:
+            regions: Lista opcional de (izquierda, arriba, derecha, abajo) en
+                píxeles de la imagen. Si se indica, solo se procesan esas zonas
+                (recortadas en memoria) y se retorna un texto por región
+            languages: Idiomas para esta extracción (None = self.languages;
+                'auto' = según la escritura detectada)
+            cancel_token: CancellationToken opcional (con plazo o no); se
+                consulta entre etapas y lanza OperationCancelled o DeadlineExceeded
+            on_progress: Callback opcional (párrafos, hechos, total) llamado por
+                cada tanda de líneas reconocidas (o por región). Los párrafos
+                entregados son provisorios; el resultado final reagrupa todo
+        """
+        if not self.image_path or self.image is None:
             raise ValueError("Primero debes cargar una imagen.")
         
-        if not self.reader:
-            # Inicializar el lector solo cuando sea necesario para mejorar el rendimiento
-            try:
-                self.reader = easyocr.Reader(['en', 'es'], gpu=False)
-            except Exception as e:
-                raise Exception(f"Error al inicializar EasyOCR: {str(e)}")
+        # Misma imagen (por contenido) con los mismos ajustes: resultado guardado
+        cache_key, cached = self.cached_result(self.image_path, languages, regions)
+        self.last_near_distance = None
+        signature = None
+        if cached is None and cache_key is not None and not regions and self.near_duplicates is not None:
+            # Imagen casi idéntica a una ya extraída: se reutiliza su texto
+            signature = self.near_duplicates.signature(self.image.source)
+            match = self.near_duplicates.find(signature, self.cache_params(languages))
+            if match is not None:
+                cached, self.last_near_distance = match
+        self.last_cache_hit = cached is not None
+        if cached is not None:
+            self.last_orientation = cached.get('orientation', 0)
+            text_list = cached['texts'] or [""]
+            if on_progress:
+                on_progress(text_list, len(text_list), len(text_list))
+            SecurityLogger.log_extraction(self.image_path, True, len('\n'.join(text_list)))
+            return text_list
+        
+        # Modo cliente: el demonio extrae con sus lectores (solo idiomas por defecto)
+        result = None
+        if self.daemon is not None and not languages:
+            result = self._extract_with_daemon(regions, cancel_token)
+        
+        # Si hay un calentamiento en curso, espera a que termine en lugar de cargar otra vez
+        if result is None:
+            self._ensure_reader(self._resolve_languages(languages))
         
+        # Confianza media de las líneas (sin líneas: regiones o demonio)
+        confidence = None
         try:
-            # Usar paragraph=True para agrupar el texto en párrafos (más simple)
-            result = self.reader.readtext(self.image_path, detail=0, paragraph=True)
+            if result is not None:
+                # El demonio entrega el texto completo de una vez
+                if on_progress:
+                    on_progress(result, len(result), len(result))
+            elif regions:
+                self.last_orientation = 0
+                # Con callback se lee región por región para informar cada una al terminar
+                batches = [[region] for region in regions] if on_progress else [regions]
+                result = []
+                for batch in batches:
+                    outputs = read_regions(self.reader, self.image.source, batch,
+                                           normalize=self.performance.normalize_input,
+                                           detail=0, paragraph=True,
+                                           readtext_options=self.performance.readtext_options,
+                                           refine_threshold=self.performance.refine_threshold,
+                                           cancel_token=cancel_token)
+                    texts = ['\n'.join(str(item) for item in output if item) for output in outputs]
+                    result.extend(texts)
+                    if on_progress:
+                        on_progress(texts, len(result), len(regions))
+            elif on_progress:
+                lines = []
+                for chunk, done, total, self.last_orientation in iter_ocr_lines(
+                        self.reader, self.image.source, self.performance, cancel_token):
+                    lines.extend(chunk)
+                    on_progress(format_lines(chunk, detail=0, paragraph=True) if chunk else [], done, total)
+                result = format_lines(lines, detail=0, paragraph=True)
+                confidence = aggregate_confidence(lines)
+            else:
+                # Usar paragraph=True para agrupar el texto en párrafos (más simple)
+                lines, self.last_orientation = ocr_lines(self.reader, self.image.source, self.performance,
+                                                         cancel_token)
+                result = format_lines(lines, detail=0, paragraph=True)
+                confidence = aggregate_confidence(lines)
             
             if not result or not isinstance(result, list):
                 text_list = [""]
@@ -69,12 +263,87 @@ class TextExtractorApp:
             # Registrar extracción exitosa (OWASP A09)
             SecurityLogger.log_extraction(self.image_path, True, len(full_text))
             
+            if cache_key is not None:
+                self.result_cache.put(cache_key, {'texts': [text for text in text_list if text],
+                                                  'orientation': self.last_orientation,
+                                                  'confidence': confidence})
+                if signature is not None:
+                    self.near_duplicates.add(self.result_cache.image_digest(self.image_path), signature)
             return text_list
+        except (OperationCancelled, DeadlineExceeded):
+            SecurityLogger.log_extraction(self.image_path, False, 0)
+            raise
         except Exception as e:
             # Registrar error de extracción (OWASP A09)
             SecurityLogger.log_extraction(self.image_path, False, 0)
             raise Exception(f"Error al procesar la imagen: {str(e)}")
 
+    def cache_params(self, languages=None, regions=None, pipeline='completo'):
+        """Parámetros del motor que forman la clave de caché de una extracción"""
+        params = engine_params(self.performance, languages or self.languages, pipeline=pipeline)
+        if regions:
+            params['regions'] = [list(region) for region in regions]
+        return params
+
+    def cache_key(self, path, languages=None, regions=None, pipeline='completo'):
+        """Clave de caché del contenido del archivo (None sin caché o si no se puede leer)"""
+        if self.result_cache is None:
+            return None
+        try:
+            return self.result_cache.key(self.result_cache.image_digest(path),
+                                         self.cache_params(languages, regions, pipeline))
+        except OSError:
+            return None
+
+    def cached_result(self, path, languages=None, regions=None, pipeline='completo', data=None):
+        """
+        Busca una extracción guardada para el contenido del archivo
+
+        Args:
+            data: Bytes del archivo si ya se leyeron (no se vuelve a leer para el hash)
+
+        Returns:
+            (clave, valor o None); la clave es None sin caché o si el archivo
+            no se puede leer
+        """
+        if self.result_cache is None:
+            return None, None
+        return self.result_cache.lookup(path, self.cache_params(languages, regions, pipeline), data)
+
+    def _extract_with_daemon(self, regions, cancel_token):
+        """
+        Extrae la imagen actual en el demonio OCR
+
+        Returns:
+            Lista de textos (párrafos, o uno por región), o None si el demonio
+            no respondió o está saturado y hay que extraer en el proceso
+
+        Raises:
+            OperationCancelled: Si se canceló antes o durante la espera
+            DeadlineExceeded: Si venció el plazo del token
+        """
+        check_cancelled(cancel_token)
+        timeout = cancel_token.remaining() if cancel_token is not None else None
+        try:
+            response = self.daemon.extract(self.image_path, regions, timeout=timeout)
+        except DaemonOverloaded as e:
+            print(f"Warning: demonio OCR saturado, se extrae localmente: {e}")
+            return None
+        except DaemonUnavailable as e:
+            print(f"Warning: demonio OCR no disponible, se extrae localmente: {e}")
+            self.daemon = None
+            self.is_warmed_up = False
+            return None
+        except TimeoutError as e:
+            raise DeadlineExceeded(str(e))
+        check_cancelled(cancel_token)
+
+        if regions:
+            self.last_orientation = 0
+            return [item['text'] for item in response['regions']]
+        self.last_orientation = response.get('orientation', 0)
+        return [paragraph for paragraph in response['text'].split('\n') if paragraph]
+
     def save_text_to_docx(self, text, file_path=None, parent_widget=None):
         """Guarda el texto extraído en un archivo Word"""
         try:
@@ -93,6 +362,7 @@ class TextExtractorApp:
             if not file_path:
                 from pathlib import Path
                 documents_path = str(Path.home() / "Documents")
+                from PyQt6.QtWidgets import QFileDialog
                 file_path, _ = QFileDialog.getSaveFileName(
                     parent=parent_widget,
                     caption="Guardar como",
@@ -136,6 +406,7 @@ class TextExtractorApp:
             if not file_path:
                 from pathlib import Path
                 documents_path = str(Path.home() / "Documents")
+                from PyQt6.QtWidgets import QFileDialog
                 file_path, _ = QFileDialog.getSaveFileName(
                     caption="Guardar como TXT",
                     directory=documents_path,
@@ -185,6 +456,7 @@ class TextExtractorApp:
             if not file_path:
                 from pathlib import Path
                 documents_path = str(Path.home() / "Documents")
+                from PyQt6.QtWidgets import QFileDialog
                 file_path, _ = QFileDialog.getSaveFileName(
                     caption="Guardar como PDF",
                     directory=documents_path,
@@ -239,6 +511,7 @@ class TextExtractorApp:
             if not file_path:
                 from pathlib import Path
                 documents_path = str(Path.home() / "Documents")
+                from PyQt6.QtWidgets import QFileDialog
                 file_path, _ = QFileDialog.getSaveFileName(
                     caption="Guardar como RTF",
                     directory=documents_path,
@@ -333,4 +606,5 @@ class TextExtractorApp:
         """Limpia los recursos utilizados por la aplicación"""
         self.reader = None
         self.image_path = None
+        self.image = None
         self.save_path = None
@@ -0,0 +1,226 @@
+"""
+Fachada asyncio sobre los casos de uso de extracción y exportación
+Los casos de uso son bloqueantes: cada llamada se ejecuta en un executor y
+los semáforos limitan cuántas extracciones y exportaciones hay en curso.
+Los semáforos se crean al primer uso en cada bucle de eventos (un
+asyncio.Semaphore queda ligado al bucle en el que espera), así el servicio
+del contenedor sirve a varios bucles sucesivos o en hilos distintos.
+Cancelar la tarea que espera cancela el CancellationToken de la extracción;
+el hilo se detiene en el próximo punto de control y el cupo se libera recién
+entonces, así el límite de concurrencia refleja el trabajo real.
+"""
+import asyncio
+import functools
+import threading
+import weakref
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import AsyncIterator, Iterable, Optional
+
+from ..domain.cancellation import CancellationToken, OperationCancelled
+from ..domain.entities import BatchJobTask, ExtractionResult
+from .export_usecase import ExportFormat, ExportTextUseCase
+from .extraction_usecase import ExtractTextUseCase
+
+# Extracciones simultáneas por defecto (cada una ocupa el motor OCR)
+MAX_EXTRACTIONS = 2
+# Exportaciones simultáneas por defecto (solo escriben archivos)
+MAX_EXPORTS = 4
+
+
+def _retrieve_exception(future) -> None:
+    """Consume la excepción de un futuro abandonado (evita el aviso de asyncio)"""
+    if not future.cancelled():
+        future.exception()
+
+
+class AsyncExtractionService:
+    """API asíncrona: await extract(ruta), async for tarea in extract_many(rutas)"""
+
+    def __init__(self, extract_use_case: ExtractTextUseCase,
+                 export_use_case: Optional[ExportTextUseCase] = None,
+                 max_extractions: int = MAX_EXTRACTIONS, max_exports: int = MAX_EXPORTS,
+                 executor: Optional[Executor] = None):
+        """
+        Args:
+            extract_use_case: Caso de uso de extracción (bloqueante)
+            export_use_case: Caso de uso de exportación opcional (bloqueante)
+            max_extractions: Extracciones en curso como máximo (por bucle de eventos)
+            max_exports: Exportaciones en curso como máximo (por bucle de eventos)
+            executor: Executor para el trabajo bloqueante (None = uno propio
+                con un hilo por cupo, que close() libera)
+        """
+        self.extract_use_case = extract_use_case
+        self.export_use_case = export_use_case
+        self.max_extractions = max(1, max_extractions)
+        self.max_exports = max(1, max_exports)
+        # Bucle de eventos -> (cupos de extracción, cupos de exportación)
+        self._slots = weakref.WeakKeyDictionary()
+        self._slots_lock = threading.Lock()
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=self.max_extractions + self.max_exports, thread_name_prefix='ocr-async')
+
+    async def __aenter__(self) -> 'AsyncExtractionService':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Libera el executor propio (uno externo queda a cargo de quien lo creó)"""
+        if self._owns_executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _loop_slots(self) -> tuple[asyncio.Semaphore, asyncio.Semaphore]:
+        """Semáforos (extracción, exportación) del bucle en curso, creados al primer uso"""
+        loop = asyncio.get_running_loop()
+        with self._slots_lock:
+            slots = self._slots.get(loop)
+            if slots is None:
+                slots = (asyncio.Semaphore(self.max_extractions), asyncio.Semaphore(self.max_exports))
+                self._slots[loop] = slots
+        return slots
+
+    async def _run_cancellable(self, function, token: CancellationToken):
+        """
+        Ejecuta function(cancel_token=token) en el executor
+
+        Raises:
+            asyncio.CancelledError: Si se cancela la tarea; antes de propagarla
+                se cancela el token y se espera a que el hilo suelte el motor
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, functools.partial(function, cancel_token=token))
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            token.cancel()
+            future.add_done_callback(_retrieve_exception)
+            await asyncio.wait({future})
+            raise
+
+    async def extract(self, image_path: str, timeout: Optional[float] = None,
+                      cancel_token: Optional[CancellationToken] = None) -> ExtractionResult:
+        """
+        Extrae el texto de una imagen sin bloquear el bucle de eventos
+
+        Args:
+            image_path: Ruta de la imagen
+            timeout: Segundos máximos para esta imagen (None = sin límite);
+                el plazo corre desde que obtiene un cupo
+            cancel_token: Token externo opcional (ej. el de un trabajo) del que
+                se heredan la cancelación y la pausa
+
+        Returns:
+            ExtractionResult
+
+        Raises:
+            asyncio.CancelledError: Si se cancela la tarea que espera
+            OperationCancelled: Si se cancela el token externo
+            DeadlineExceeded: Si vence el plazo
+        """
+        async with self._loop_slots()[0]:
+            token = (cancel_token or CancellationToken()).with_timeout(timeout)
+            return await self._run_cancellable(
+                functools.partial(self.extract_use_case.execute, image_path), token)
+
+    async def extract_regions(self, image_path: str, regions: list, timeout: Optional[float] = None,
+                              cancel_token: Optional[CancellationToken] = None) -> list[ExtractionResult]:
+        """
+        Extrae el texto de algunas zonas de una imagen (ver extract)
+
+        Args:
+            image_path: Ruta de la imagen
+            regions: Lista de (izquierda, arriba, derecha, abajo) en píxeles
+
+        Returns:
+            Lista de ExtractionResult, uno por región
+        """
+        async with self._loop_slots()[0]:
+            token = (cancel_token or CancellationToken()).with_timeout(timeout)
+            return await self._run_cancellable(
+                functools.partial(self.extract_use_case.execute_regions, image_path, regions), token)
+
+    async def _extract_task(self, image_path: str, timeout: Optional[float],
+                            cancel_token: Optional[CancellationToken]) -> BatchJobTask:
+        """Extrae una imagen y registra el resultado o el error en una tarea"""
+        task = BatchJobTask(image_path=image_path, status="processing")
+        try:
+            task.result = await self.extract(image_path, timeout=timeout, cancel_token=cancel_token)
+            task.status = "completed"
+        except OperationCancelled:
+            task.status = "cancelled"
+        except Exception as e:
+            # Incluye DeadlineExceeded: la imagen vencida no detiene el resto
+            task.status = "failed"
+            task.error = str(e)
+        return task
+
+    async def extract_many(self, image_paths: Iterable[str], timeout: Optional[float] = None,
+                           cancel_token: Optional[CancellationToken] = None) -> AsyncIterator[BatchJobTask]:
+        """
+        Extrae varias imágenes y entrega cada tarea en cuanto termina
+
+        Solo se crean tareas para el doble de los cupos de extracción, así una
+        lista larga de rutas no llena la memoria de corrutinas en espera. Al
+        cerrar el generador (aclose(), o contextlib.aclosing si se corta el
+        ciclo) o cancelar la tarea que itera, las extracciones en curso se
+        cancelan y se esperan antes de salir.
+
+        Args:
+            image_paths: Rutas de las imágenes (cualquier iterable)
+            timeout: Segundos máximos por imagen (None = sin límite)
+            cancel_token: Token externo opcional del trabajo
+
+        Yields:
+            BatchJobTask con estado completed, failed o cancelled, en orden de
+            finalización
+        """
+        paths = iter(image_paths)
+        window = 2 * self.max_extractions
+        pending = set()
+
+        def refill():
+            for path in paths:
+                pending.add(asyncio.ensure_future(self._extract_task(path, timeout, cancel_token)))
+                if len(pending) >= window:
+                    break
+
+        try:
+            refill()
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                pending.difference_update(done)
+                for finished in done:
+                    yield finished.result()
+                refill()
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def export(self, text: str, file_path: str, format: ExportFormat) -> bool:
+        """
+        Exporta texto sin bloquear el bucle de eventos
+
+        Una escritura ya iniciada no se interrumpe: si se cancela la tarea, la
+        cancelación se propaga cuando el archivo termina de escribirse.
+
+        Returns:
+            True si se exportó exitosamente
+
+        Raises:
+            ValueError: Si no hay caso de uso de exportación o el texto está vacío
+        """
+        if self.export_use_case is None:
+            raise ValueError("Exportación no disponible")
+        loop = asyncio.get_running_loop()
+        async with self._loop_slots()[1]:
+            future = loop.run_in_executor(self._executor, self.export_use_case.execute, text, file_path, format)
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                future.add_done_callback(_retrieve_exception)
+                await asyncio.wait({future})
+                raise
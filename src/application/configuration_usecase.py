@@ -35,6 +35,12 @@ class SaveConfigurationUseCase:
         if config.theme not in ["light", "dark"]:
             raise ValueError("Tema inválido: debe ser 'light' o 'dark'")
         
+        if config.ocr_backend not in ["easyocr", "onnx"]:
+            raise ValueError("Motor OCR inválido: debe ser 'easyocr' u 'onnx'")
+        
+        if not config.ocr_languages or not all(isinstance(lang, str) and lang for lang in config.ocr_languages):
+            raise ValueError("Idiomas OCR inválidos: debe haber al menos un código de idioma")
+        
         self.config_repository.save_configuration(config)
 
 
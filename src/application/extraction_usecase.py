@@ -1,36 +1,128 @@
 """
 Casos de uso para extracción de texto OCR
 """
-from typing import Optional
-from ..domain.entities import ExtractionResult, Image
+import uuid
+from datetime import datetime
+from typing import Callable, Optional
+from ..domain.entities import ExtractionResult, Image, BatchJob, BatchJobTask
+from ..domain.cancellation import CancellationToken, OperationCancelled, check_cancelled
 from ..domain.repositories import TextExtractionRepository
 
 
 class ExtractTextUseCase:
     """Usa caso para extraer texto de una imagen"""
     
-    def __init__(self, extraction_repository: TextExtractionRepository):
+    def __init__(self, extraction_repository: TextExtractionRepository,
+                 image_loader: Optional[Callable[[str], Image]] = None,
+                 result_cache=None, cache_params: Optional[dict] = None, near_duplicates=None):
+        """
+        Args:
+            extraction_repository: Repositorio de extracción
+            image_loader: Función (ruta, data=bytes opcional) -> Image que
+                valida y lee la imagen una sola vez (Image.pixels o Image.data);
+                el repositorio reutiliza ese buffer. Por defecto solo se leen
+                las dimensiones
+            result_cache: Caché de resultados por contenido opcional (con
+                read_unless_known(ruta), lookup(ruta, parámetros, data) y
+                put(clave, valor))
+            cache_params: Parámetros del motor que forman parte de la clave
+            near_duplicates: Índice de casi duplicados opcional (signature,
+                find y add) para reutilizar resultados de imágenes parecidas
+        """
         self.extraction_repository = extraction_repository
+        self.image_loader = image_loader
+        self.result_cache = result_cache
+        self.cache_params = cache_params or {}
+        self.near_duplicates = near_duplicates if result_cache is not None else None
     
-    def execute(self, image_path: str) -> ExtractionResult:
+    def execute(self, image_path: str, cancel_token: Optional[CancellationToken] = None) -> ExtractionResult:
         """
         Ejecuta la extracción de texto
         
         Args:
             image_path: Ruta de la imagen
+            cancel_token: Token de cancelación (con o sin plazo) consultado
+                entre etapas del OCR
             
         Returns:
             ExtractionResult con texto extraído
         """
-        # Cargar información de la imagen
-        image = self._load_image_info(image_path)
+        # Un resultado guardado para el mismo contenido y los mismos ajustes evita el OCR
+        cache_key = None
+        data = None
+        if self.result_cache is not None:
+            # Archivo nuevo o modificado: una sola lectura para el hash y la decodificación
+            if self.image_loader is not None:
+                data = self.result_cache.read_unless_known(image_path)
+            cache_key, cached = self.result_cache.lookup(image_path, self.cache_params, data)
+            if cached is not None:
+                return self._cached_result(image_path, cached)
+        
+        image = self._load(image_path, data)
+        # Los bytes del archivo no se retienen durante el OCR
+        del data
+        check_cancelled(cancel_token)
+        
+        # Casi duplicado de una imagen ya extraída (cursor, recompresión)
+        signature = None
+        if cache_key is not None and self.near_duplicates is not None:
+            signature = self.near_duplicates.signature(image.source)
+            match = self.near_duplicates.find(signature, self.cache_params)
+            if match is not None:
+                return self._cached_result(image_path, match[0])
         
         # Extraer texto usando el repositorio
-        result = self.extraction_repository.extract_text(image)
+        result = self.extraction_repository.extract_text(image, cancel_token)
         result.image_path = image_path
         
+        if cache_key is not None:
+            self.result_cache.put(cache_key, {
+                'texts': [line for line in result.text.split('\n') if line],
+                'orientation': result.orientation,
+                'confidence': result.confidence
+            })
+            if signature is not None:
+                self.near_duplicates.add(self.result_cache.image_digest(image_path), signature)
+        
         return result
     
+    def execute_regions(self, image_path: str, regions: list,
+                        cancel_token: Optional[CancellationToken] = None) -> list[ExtractionResult]:
+        """
+        Extrae texto solo de algunas zonas de una imagen
+        
+        Args:
+            image_path: Ruta de la imagen
+            regions: Lista de (izquierda, arriba, derecha, abajo) en píxeles
+            cancel_token: Token de cancelación consultado antes de cada región
+            
+        Returns:
+            Lista de ExtractionResult, uno por región
+        """
+        image = self._load(image_path)
+        check_cancelled(cancel_token)
+        results = self.extraction_repository.extract_text_regions(image, regions, cancel_token)
+        for result in results:
+            result.image_path = image_path
+        return results
+    
+    def _load(self, image_path: str, data: Optional[bytes] = None) -> Image:
+        """Información de la imagen (y el buffer decodificado, si hay ingesta)"""
+        if self.image_loader is not None:
+            return self.image_loader(image_path, data=data)
+        return self._load_image_info(image_path)
+    
+    @staticmethod
+    def _cached_result(image_path: str, cached: dict) -> ExtractionResult:
+        """ExtractionResult a partir de un valor de la caché de resultados"""
+        return ExtractionResult(
+            text='\n'.join(cached['texts']),
+            # Las entradas sin confianza registrada (regiones, demonio) informan 0
+            confidence=cached.get('confidence') or 0.0,
+            image_path=image_path,
+            orientation=cached.get('orientation', 0)
+        )
+    
     def _load_image_info(self, image_path: str) -> Image:
         """Carga información básica de la imagen"""
         from PIL import Image as PILImage
@@ -49,27 +141,135 @@ class ExtractTextUseCase:
 class ExtractBatchUseCase:
     """Caso de uso para extraer texto de múltiples imágenes"""
     
-    def __init__(self, extraction_repository: TextExtractionRepository):
+    def __init__(self, extraction_repository: TextExtractionRepository, process_engine=None):
+        """
+        Args:
+            extraction_repository: Repositorio de extracción
+            process_engine: Motor multiproceso opcional con
+                imap(paths, cancel_token=, image_timeout=) que entrega un
+                WorkerResult por imagen a medida que termina
+        """
         self.extraction_repository = extraction_repository
+        self.process_engine = process_engine
     
-    def execute(self, image_paths: list[str]) -> list[ExtractionResult]:
+    def execute(self, image_paths: list[str], cancel_token: Optional[CancellationToken] = None,
+                image_timeout: Optional[float] = None) -> list[ExtractionResult]:
         """
         Ejecuta la extracción en lote
         
         Args:
             image_paths: Lista de rutas de imágenes
+            cancel_token: Token de cancelación y pausa del trabajo
+            image_timeout: Segundos máximos por imagen (None = sin límite); con
+                plazo, cada imagen se procesa por separado
             
         Returns:
-            Lista de ExtractionResult
+            Lista de ExtractionResult de las imágenes completadas
+        
+        Raises:
+            OperationCancelled: Si se cancela durante el reconocimiento agrupado
         """
+        if self.process_engine is not None or image_timeout:
+            job = self.execute_job(self.create_job(image_paths), cancel_token, image_timeout)
+            return [task.result for task in job.tasks if task.status == "completed"]
+        
         extract_use_case = ExtractTextUseCase(self.extraction_repository)
-        results = []
+        images = []
         
         for path in image_paths:
             try:
-                result = extract_use_case.execute(path)
-                results.append(result)
+                images.append(extract_use_case._load_image_info(path))
             except Exception as e:
                 print(f"Error extrayendo {path}: {e}")
         
-        return results
+        if not images:
+            return []
+        
+        # Un solo llamado para que el repositorio pueda agrupar el reconocimiento;
+        # devuelve un resultado por imagen en el mismo orden
+        completed = []
+        for image, result in zip(images, self.extraction_repository.extract_text_batch(images, cancel_token)):
+            result.image_path = image.path
+            if result.error is None:
+                completed.append(result)
+        
+        return completed
+    
+    @staticmethod
+    def create_job(image_paths: list[str]) -> BatchJob:
+        """Crea un trabajo con una tarea pendiente por imagen"""
+        return BatchJob(job_id=uuid.uuid4().hex, tasks=[BatchJobTask(image_path=path) for path in image_paths])
+    
+    def execute_job(self, job: BatchJob, cancel_token: Optional[CancellationToken] = None,
+                    image_timeout: Optional[float] = None) -> BatchJob:
+        """
+        Procesa las tareas de un trabajo actualizando su estado
+        
+        Args:
+            job: Trabajo con las tareas a procesar
+            cancel_token: Token de cancelación y pausa; la pausa retiene la
+                cola entre imágenes sin descargar el motor
+            image_timeout: Segundos máximos por imagen (None = sin límite)
+            
+        Returns:
+            El mismo trabajo: las imágenes vencidas quedan "failed" con el
+            error de plazo y, si se canceló, las no procesadas "cancelled"
+        """
+        token = cancel_token or CancellationToken()
+        try:
+            if self.process_engine is not None:
+                self._run_with_engine(job, token, image_timeout)
+            else:
+                self._run_sequential(job, token, image_timeout)
+        except OperationCancelled:
+            pass
+        
+        for task in job.tasks:
+            if task.status in ("pending", "processing"):
+                task.status = "cancelled"
+        job.completed_at = datetime.now()
+        return job
+    
+    def _run_sequential(self, job: BatchJob, token: CancellationToken,
+                        image_timeout: Optional[float]) -> None:
+        """Procesa las tareas una a una, cada una con su propio plazo"""
+        extract_use_case = ExtractTextUseCase(self.extraction_repository)
+        
+        for task in job.tasks:
+            token.wait_if_paused()
+            task.status = "processing"
+            try:
+                image = extract_use_case._load_image_info(task.image_path)
+                result = self.extraction_repository.extract_text(image, token.with_timeout(image_timeout))
+                result.image_path = task.image_path
+                task.result = result
+                task.status = "completed"
+            except OperationCancelled:
+                raise
+            except Exception as e:
+                # Incluye DeadlineExceeded: la imagen vencida no detiene el lote
+                task.status = "failed"
+                task.error = str(e)
+                print(f"Error extrayendo {task.image_path}: {e}")
+    
+    def _run_with_engine(self, job: BatchJob, token: CancellationToken,
+                         image_timeout: Optional[float]) -> None:
+        """Ejecuta las tareas repartidas en el motor multiproceso"""
+        for task in job.tasks:
+            task.status = "processing"
+        
+        paths = [task.image_path for task in job.tasks]
+        for result in self.process_engine.imap(paths, cancel_token=token, image_timeout=image_timeout):
+            task = job.tasks[result.index]
+            if result.error is not None:
+                print(f"Error extrayendo {result.path}: {result.error}")
+                task.status = "failed"
+                task.error = result.error
+                continue
+            task.result = ExtractionResult(
+                text='\n'.join(result.lines),
+                confidence=result.confidence,
+                image_path=result.path,
+                orientation=result.orientation
+            )
+            task.status = "completed"
@@ -0,0 +1,306 @@
+"""
+Extracción por lotes desde la línea de comandos
+Pensado para servidores: no importa PyQt6 ni cv2 (EasyOCR trae cv2 recién al
+cargar el motor). Las rutas llegan de carpetas, patrones glob, una lista en
+archivo o la entrada estándar; cada imagen pasa por los casos de uso de
+extracción y exportación en cuanto termina, y el resumen JSONL se escribe
+línea por línea.
+
+Uso:
+    python -m src.cli escaneos/ --formato txt --salida textos/
+    python -m src.cli "capturas/*.png" --workers 4 --resumen resumen.jsonl
+    find escaneos -name "*.jpg" | python -m src.cli - --salida textos/
+
+Códigos de salida:
+    0 todas las imágenes se procesaron
+    1 alguna imagen falló (ver el resumen)
+    2 argumentos inválidos o ninguna imagen para procesar
+    3 motor OCR o exportador no disponibles
+    130 interrumpido (Ctrl+C); las imágenes pendientes quedan "cancelled"
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, TextIO
+
+from .application.export_usecase import ExportFormat
+from .domain.cancellation import CancellationToken, OperationCancelled
+from .infrastructure.security import SecurityValidator
+
+EXIT_OK = 0
+EXIT_FAILURES = 1
+EXIT_USAGE = 2
+EXIT_UNAVAILABLE = 3
+EXIT_CANCELLED = 130
+
+
+def collect_paths(inputs: Iterable[str], list_file: Optional[str] = None,
+                  recursive: bool = False, stdin: Optional[TextIO] = None) -> list[str]:
+    """
+    Reúne las rutas de imagen a procesar, sin repetidos y en orden
+
+    Args:
+        inputs: Carpetas, patrones glob o archivos; '-' lee una ruta por línea de stdin
+        list_file: Archivo con una ruta por línea (opcional)
+        recursive: Si recorrer subcarpetas
+        stdin: Flujo para '-' (None = sys.stdin)
+
+    Returns:
+        Rutas absolutas de archivos con extensión de imagen permitida
+    """
+    extensions = SecurityValidator.ALLOWED_IMAGE_EXTENSIONS
+    candidates = []
+
+    def read_lines(stream):
+        candidates.extend(line.strip() for line in stream if line.strip())
+
+    for item in inputs:
+        if item == '-':
+            read_lines(stdin or sys.stdin)
+        elif os.path.isdir(item):
+            pattern = '**/*' if recursive else '*'
+            candidates.extend(sorted(str(path) for path in Path(item).glob(pattern) if path.is_file()))
+        elif glob.has_magic(item):
+            candidates.extend(sorted(glob.glob(item, recursive=recursive)))
+        else:
+            candidates.append(item)
+    if list_file:
+        with open(list_file, encoding='utf-8') as f:
+            read_lines(f)
+
+    paths, seen = [], set()
+    for candidate in candidates:
+        path = os.path.abspath(candidate)
+        if path not in seen and Path(path).suffix.lower() in extensions:
+            seen.add(path)
+            paths.append(path)
+    return paths
+
+
+def output_path_for(image_path: str, output_dir: str, format: ExportFormat, used: set) -> str:
+    """
+    Ruta de salida <carpeta>/<nombre>.<formato>; los nombres repetidos
+    dentro de la misma corrida reciben un sufijo (_1, _2...) en lugar de pisarse
+    """
+    stem = Path(image_path).stem
+    candidate = os.path.join(output_dir, f"{stem}.{format.value}")
+    counter = 1
+    while candidate in used:
+        candidate = os.path.join(output_dir, f"{stem}_{counter}.{format.value}")
+        counter += 1
+    used.add(candidate)
+    return candidate
+
+
+def export_text(container, text: str, output_path: str, format: ExportFormat) -> None:
+    """
+    Exporta el texto de una imagen con el caso de uso de exportación
+
+    Raises:
+        ValueError: Si la ruta de exportación no es válida
+        IOError: Si no se pudo guardar el archivo
+    """
+    is_valid, error = SecurityValidator.validate_export_path(output_path, f".{format.value}")
+    if not is_valid:
+        raise ValueError(f"Ruta de exportación inválida: {error}")
+    if not container.get('export_text_usecase').execute(text, output_path, format):
+        raise IOError(f"No se pudo guardar {output_path}")
+
+
+class BatchCLI:
+    """Extrae y exporta un lote, entregando un registro por imagen"""
+
+    def __init__(self, container, format: ExportFormat, output_dir: str,
+                 workers: int = 1, image_timeout: Optional[float] = None):
+        """
+        Args:
+            container: ServiceContainer con los casos de uso
+            format: Formato de exportación
+            output_dir: Carpeta de salida (se crea si no existe)
+            workers: Procesos OCR (1 = en este proceso con el lector compartido)
+            image_timeout: Segundos máximos por imagen (None = sin límite)
+        """
+        self.container = container
+        self.format = format
+        self.output_dir = output_dir
+        self.workers = max(1, workers)
+        self.image_timeout = image_timeout
+        self.cancel_token = CancellationToken()
+        self._used_outputs = set()
+
+    def _export(self, image_path: str, text: str, record: dict) -> None:
+        """Valida y exporta el texto de una imagen, completando el registro"""
+        is_valid, error = SecurityValidator.validate_text_input(text)
+        if not is_valid:
+            raise ValueError(f"Texto extraído inválido: {error}")
+        record['characters'] = len(text)
+        if not text.strip():
+            # Sin texto no hay archivo que escribir (la imagen igual se procesó)
+            return
+
+        output_path = output_path_for(image_path, self.output_dir, self.format, self._used_outputs)
+        export_text(self.container, text, output_path, self.format)
+        record['output'] = output_path
+
+    def run(self, image_paths: list[str]) -> Iterator[dict]:
+        """
+        Procesa las imágenes y entrega cada registro en cuanto termina
+
+        Yields:
+            Diccionarios con image, status (completed, failed o cancelled),
+            output, characters, seconds y error
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        if self.workers > 1:
+            yield from self._run_process_pool(image_paths)
+        else:
+            yield from self._run_sequential(image_paths)
+
+    @staticmethod
+    def _record(image_path: str) -> dict:
+        return {'image': image_path, 'status': 'pending', 'output': None,
+                'characters': 0, 'seconds': 0.0, 'error': None}
+
+    def _run_sequential(self, image_paths: list[str]) -> Iterator[dict]:
+        extract_use_case = self.container.get('extract_text_usecase')
+        for index, image_path in enumerate(image_paths):
+            record = self._record(image_path)
+            start = time.perf_counter()
+            try:
+                result = extract_use_case.execute(
+                    image_path, cancel_token=self.cancel_token.with_timeout(self.image_timeout))
+                self._export(image_path, result.text, record)
+                record['status'] = 'completed'
+            except (OperationCancelled, KeyboardInterrupt):
+                self.cancel_token.cancel()
+                for pending in image_paths[index:]:
+                    yield dict(self._record(pending), status='cancelled')
+                return
+            except Exception as e:
+                # Incluye DeadlineExceeded: la imagen vencida no detiene el lote
+                record['status'] = 'failed'
+                record['error'] = str(e)
+            record['seconds'] = round(time.perf_counter() - start, 3)
+            yield record
+
+    def _run_process_pool(self, image_paths: list[str]) -> Iterator[dict]:
+        from .infrastructure.configuration_adapter import FileConfigurationAdapter, PerformanceSettingsAdapter
+        from .infrastructure.process_pool_engine import ProcessPoolOCREngine
+
+        performance = PerformanceSettingsAdapter('config.json').get_settings()
+        languages = FileConfigurationAdapter('config.json').get_configuration().ocr_languages or ['en', 'es']
+
+        valid_paths = []
+        for image_path in image_paths:
+            is_valid, error = SecurityValidator.validate_image_path(image_path)
+            if is_valid:
+                valid_paths.append(image_path)
+            else:
+                yield dict(self._record(image_path), status='failed', error=f"Ruta de imagen inválida: {error}")
+
+        engine = ProcessPoolOCREngine(languages, gpu=False, workers=self.workers, performance=performance)
+        finished = set()
+        start = time.perf_counter()
+        try:
+            for result in engine.imap(valid_paths, cancel_token=self.cancel_token,
+                                      image_timeout=self.image_timeout):
+                finished.add(result.index)
+                record = self._record(result.path)
+                # Tiempo de pared medio por imagen con todos los procesos en marcha
+                record['seconds'] = round((time.perf_counter() - start) / len(finished), 3)
+                try:
+                    if result.error is not None:
+                        raise RuntimeError(result.error)
+                    self._export(result.path, '\n'.join(result.lines or []), record)
+                    record['status'] = 'completed'
+                except Exception as e:
+                    record['status'] = 'failed'
+                    record['error'] = str(e)
+                yield record
+        except (OperationCancelled, KeyboardInterrupt):
+            self.cancel_token.cancel()
+            engine.terminate()
+            for index, image_path in enumerate(valid_paths):
+                if index not in finished:
+                    yield dict(self._record(image_path), status='cancelled')
+        finally:
+            engine.close()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m src.cli',
+                                     description="Extrae el texto de un lote de imágenes sin interfaz gráfica")
+    parser.add_argument("entradas", nargs="*",
+                        help="Carpetas, patrones glob o imágenes ('-' = una ruta por línea de stdin)")
+    parser.add_argument("--lista", default=None, help="Archivo con una ruta por línea")
+    parser.add_argument("--recursivo", action="store_true", help="Recorrer subcarpetas")
+    parser.add_argument("--formato", choices=[format.value for format in ExportFormat], default="txt")
+    parser.add_argument("--salida", default="textos", help="Carpeta de salida (por defecto ./textos)")
+    parser.add_argument("--workers", type=int, default=1, help="Procesos OCR en paralelo")
+    parser.add_argument("--plazo", type=float, default=None,
+                        help="Segundos máximos por imagen (por defecto image_timeout_seconds)")
+    parser.add_argument("--resumen", default=None,
+                        help="Resumen JSONL (por defecto <salida>/resumen.jsonl; '-' = stdout)")
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Punto de entrada; retorna el código de salida"""
+    args = build_parser().parse_args(argv)
+    try:
+        paths = collect_paths(args.entradas, args.lista, args.recursivo)
+    except OSError as e:
+        print(f"Error leyendo las entradas: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    if not paths:
+        print("No hay imágenes para procesar", file=sys.stderr)
+        return EXIT_USAGE
+
+    from .service_container import get_service_container
+
+    container = get_service_container()
+    if args.workers <= 1 and not container.warm(['extract_text_usecase'])['extract_text_usecase']:
+        return EXIT_UNAVAILABLE
+    if not container.warm(['export_text_usecase'])['export_text_usecase']:
+        return EXIT_UNAVAILABLE
+
+    timeout = args.plazo
+    if timeout is None:
+        from .infrastructure.configuration_adapter import PerformanceSettingsAdapter
+        timeout = PerformanceSettingsAdapter('config.json').get_settings().image_timeout_seconds
+    runner = BatchCLI(container, ExportFormat(args.formato), args.salida, args.workers, timeout or None)
+
+    summary_path = args.resumen or os.path.join(args.salida, 'resumen.jsonl')
+    os.makedirs(args.salida, exist_ok=True)
+    summary = sys.stdout if summary_path == '-' else open(summary_path, 'w', encoding='utf-8')
+    counts = {'completed': 0, 'failed': 0, 'cancelled': 0}
+    start = time.perf_counter()
+    try:
+        for record in runner.run(paths):
+            counts[record['status']] += 1
+            summary.write(json.dumps(record, ensure_ascii=False) + '\n')
+            summary.flush()
+            if record['status'] == 'failed':
+                print(f"Error procesando {record['image']}: {record['error']}", file=sys.stderr)
+    except KeyboardInterrupt:
+        # Interrupción fuera del OCR (al escribir el resumen): lo pendiente no se registra
+        runner.cancel_token.cancel()
+        counts['cancelled'] += len(paths) - sum(counts.values())
+    finally:
+        if summary is not sys.stdout:
+            summary.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"{counts['completed']} completadas, {counts['failed']} con error, {counts['cancelled']} canceladas "
+          f"en {elapsed:.1f}s ({counts['completed'] / elapsed if elapsed else 0:.2f} img/s)", file=sys.stderr)
+    if counts['cancelled']:
+        return EXIT_CANCELLED
+    return EXIT_FAILURES if counts['failed'] else EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
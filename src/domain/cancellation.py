@@ -0,0 +1,117 @@
+"""
+Cancelación cooperativa, pausa y plazos por imagen
+El token se consulta en puntos seguros (entre imágenes, entre etapas del OCR,
+entre mosaicos y lotes del reconocedor); nunca interrumpe un paso a la mitad.
+Un token hijo con plazo (with_timeout) hereda la cancelación y la pausa del
+token del trabajo.
+"""
+import threading
+import time
+from typing import Optional
+
+
+class OperationCancelled(Exception):
+    """La operación se canceló a pedido del usuario"""
+
+
+class DeadlineExceeded(TimeoutError):
+    """La imagen superó su tiempo máximo de procesamiento"""
+
+
+class CancellationToken:
+    """Token de cancelación, pausa y plazo compartido entre hilos"""
+
+    def __init__(self, timeout: Optional[float] = None, parent: Optional['CancellationToken'] = None):
+        """
+        Args:
+            timeout: Segundos disponibles desde la creación (None = sin plazo)
+            parent: Token del que se heredan la cancelación, la pausa y el plazo
+        """
+        self.timeout = timeout
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self._parent = parent
+        self._cancelled = threading.Event()
+        self._running = threading.Event()
+        self._running.set()
+
+    def _root(self) -> 'CancellationToken':
+        token = self
+        while token._parent is not None:
+            token = token._parent
+        return token
+
+    def with_timeout(self, seconds: Optional[float]) -> 'CancellationToken':
+        """Token hijo con un plazo propio (None o 0 = solo hereda)"""
+        return CancellationToken(seconds or None, parent=self)
+
+    def cancel(self) -> None:
+        """Pide la cancelación; también libera a quien espera en pausa"""
+        self._cancelled.set()
+        self._root()._running.set()
+
+    def pause(self) -> None:
+        """Retiene la cola en el próximo punto de espera (el trabajo en curso sigue)"""
+        self._root()._running.clear()
+
+    def resume(self) -> None:
+        """Reanuda la cola"""
+        self._root()._running.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set() or (self._parent is not None and self._parent.cancelled)
+
+    @property
+    def paused(self) -> bool:
+        return not self._root()._running.is_set()
+
+    @property
+    def expired(self) -> bool:
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            return True
+        return self._parent is not None and self._parent.expired
+
+    def remaining(self) -> Optional[float]:
+        """Segundos restantes hasta el plazo más cercano (None = sin plazo)"""
+        remaining = None if self.deadline is None else max(0.0, self.deadline - time.monotonic())
+        if self._parent is not None:
+            inherited = self._parent.remaining()
+            if inherited is not None:
+                remaining = inherited if remaining is None else min(remaining, inherited)
+        return remaining
+
+    def check(self) -> None:
+        """
+        Punto de control
+
+        Raises:
+            OperationCancelled: Si se pidió la cancelación
+            DeadlineExceeded: Si venció el plazo
+        """
+        if self.cancelled:
+            raise OperationCancelled("Operación cancelada")
+        if self.expired:
+            token = self
+            while token.deadline is None or time.monotonic() <= token.deadline:
+                token = token._parent
+            raise DeadlineExceeded(f"Tiempo agotado ({token.timeout:g} s)")
+
+    def wait_if_paused(self, poll: float = 0.1) -> None:
+        """
+        Bloquea mientras el trabajo esté en pausa
+
+        Raises:
+            OperationCancelled: Si se cancela durante la espera
+        """
+        root = self._root()
+        while not root._running.wait(poll):
+            if self.cancelled:
+                break
+        if self.cancelled:
+            raise OperationCancelled("Operación cancelada")
+
+
+def check_cancelled(token: Optional[CancellationToken]) -> None:
+    """Punto de control que admite token None (sin cancelación)"""
+    if token is not None:
+        token.check()
@@ -1,8 +1,8 @@
 """
 Entidades del dominio para OCR
 """
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Any, Optional
 from datetime import datetime
 from pathlib import Path
 
@@ -15,6 +15,8 @@ class ExtractionResult:
     image_path: Optional[str] = None
     timestamp: datetime = None
     language: str = "English"
+    orientation: int = 0  # rotación antihoraria aplicada para enderezar el texto (0/90/180/270)
+    error: Optional[str] = None  # motivo si la imagen falló dentro de un lote (texto vacío)
     
     def __post_init__(self):
         if self.timestamp is None:
@@ -28,6 +30,15 @@ class Image:
     width: int
     height: int
     format: str
+    pixels: Optional[Any] = field(default=None, repr=False, compare=False)  # ndarray RGB ya decodificado (None = leer de path)
+    data: Optional[bytes] = field(default=None, repr=False, compare=False)  # bytes del archivo ya leídos, sin decodificar
+    
+    @property
+    def source(self):
+        """Buffer decodificado si existe; si no, los bytes leídos o la ruta del archivo"""
+        if self.pixels is not None:
+            return self.pixels
+        return self.data if self.data is not None else self.path
     
     @property
     def aspect_ratio(self) -> float:
@@ -42,13 +53,43 @@ class Configuration:
     ocr_detail_level: int = 0
     use_gpu: bool = False
     paragraph_mode: bool = True
+    ocr_backend: str = "easyocr"  # easyocr/onnx
+    ocr_languages: list[str] = field(default_factory=lambda: ['en', 'es'])  # idiomas de EasyOCR por defecto
+
+
+@dataclass
+class PerformanceSettings:
+    """Parámetros de rendimiento del motor OCR en CPU"""
+    process_workers: int = 1
+    torch_threads: int = 0  # 0 = valor por defecto de torch
+    batch_size: int = 1  # batch_size de readtext
+    recognizer_workers: int = 0  # workers de readtext
+    quantized_recognizer: bool = True  # int8 dinámico de EasyOCR en CPU (False = modelos float)
+    normalize_input: bool = True  # reescalar según la altura estimada del texto
+    refine_threshold: float = 0.5  # segunda pasada bajo esta confianza (0 = desactivada)
+    text_presence_threshold: float = 0.01  # pre-filtro de imágenes sin texto en lotes (0 = desactivado)
+    detect_orientation: bool = True  # detectar 0/90/180/270 y rotar en memoria antes del OCR
+    reader_memory_budget_mb: int = 0  # memoria para lectores en caché (LRU); 0 = sin límite
+    image_timeout_seconds: float = 120.0  # tiempo máximo por imagen en lotes (0 = sin límite)
+    daemon_batch_window_ms: float = 5.0  # el demonio agrupa las solicitudes que llegan en esta ventana
+    daemon_max_batch: int = 8  # imágenes por lote del demonio
+    daemon_max_queue: int = 32  # solicitudes en cola del demonio; las demás se rechazan (503)
+    result_cache_mb: int = 256  # caché de resultados en disco por contenido (0 = desactivada)
+    near_duplicate_distance: int = 0  # reutilizar resultados de imágenes a esta distancia de dHash (0 = desactivado)
+    near_duplicate_verify: bool = True  # exigir también cada celda de la grilla dentro de esa distancia
+    watch_settle_seconds: float = 2.0  # carpeta vigilada: segundos sin cambios antes de procesar un archivo
+    watch_poll_seconds: float = 2.0  # carpeta vigilada: intervalo de sondeo sin inotify
+    
+    @property
+    def readtext_options(self) -> dict:
+        return {'batch_size': self.batch_size, 'workers': self.recognizer_workers}
 
 
 @dataclass
 class BatchJobTask:
     """Una tarea dentro de un trabajo en lote"""
     image_path: str
-    status: str = "pending"  # pending, processing, completed, failed
+    status: str = "pending"  # pending, processing, completed, skipped (sin texto), failed, cancelled
     result: Optional[ExtractionResult] = None
     error: Optional[str] = None
 
@@ -73,8 +114,20 @@ class BatchJob:
     def completed_tasks(self) -> int:
         return sum(1 for t in self.tasks if t.status == "completed")
     
+    @property
+    def failed_tasks(self) -> int:
+        return sum(1 for t in self.tasks if t.status == "failed")
+    
+    @property
+    def cancelled_tasks(self) -> int:
+        return sum(1 for t in self.tasks if t.status == "cancelled")
+    
+    @property
+    def skipped_tasks(self) -> int:
+        return sum(1 for t in self.tasks if t.status == "skipped")
+    
     @property
     def progress(self) -> float:
         if self.total_tasks == 0:
             return 0
-        return (self.completed_tasks / self.total_tasks) * 100
+        return ((self.completed_tasks + self.skipped_tasks) / self.total_tasks) * 100
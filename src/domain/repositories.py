@@ -4,20 +4,66 @@ Interfaces y repositorios del dominio
 from abc import ABC, abstractmethod
 from typing import Optional
 from .entities import ExtractionResult, Image, Configuration
+from .cancellation import CancellationToken, check_cancelled
 
 
 class TextExtractionRepository(ABC):
     """Interfaz para extracción de texto"""
     
     @abstractmethod
-    def extract_text(self, image: Image) -> ExtractionResult:
-        """Extrae texto de una imagen"""
+    def extract_text(self, image: Image, cancel_token: Optional[CancellationToken] = None) -> ExtractionResult:
+        """
+        Extrae texto de una imagen; el token (con o sin plazo) se consulta
+        entre etapas y lanza OperationCancelled o DeadlineExceeded
+        """
         pass
     
     @abstractmethod
-    def extract_text_batch(self, images: list[Image]) -> list[ExtractionResult]:
-        """Extrae texto de múltiples imágenes"""
+    def extract_text_batch(self, images: list[Image],
+                           cancel_token: Optional[CancellationToken] = None) -> list[ExtractionResult]:
+        """
+        Extrae texto de múltiples imágenes (OperationCancelled si se cancela)
+
+        Returns:
+            Un resultado por imagen en el orden de entrada; las que fallan
+            llevan texto vacío y el motivo en error
+        """
         pass
+    
+    def extract_text_regions(self, image: Image, regions: list[tuple[int, int, int, int]],
+                             cancel_token: Optional[CancellationToken] = None) -> list[ExtractionResult]:
+        """
+        Extrae texto solo de las regiones (izquierda, arriba, derecha, abajo) de una imagen
+
+        Por defecto recorta cada región del buffer decodificado (o de los
+        bytes leídos o del archivo) y llama a extract_text; los adaptadores pueden reemplazarlo
+        por una lectura en memoria propia
+
+        Returns:
+            Un ExtractionResult por región, en el orden de entrada
+        """
+        pixels = image.pixels
+        if pixels is None:
+            import io
+            import numpy as np
+            from PIL import Image as PILImage
+
+            with PILImage.open(io.BytesIO(image.data) if image.data is not None else image.path) as img:
+                pixels = np.asarray(img.convert('RGB'))
+        height, width = pixels.shape[:2]
+
+        results = []
+        for region in regions:
+            check_cancelled(cancel_token)
+            left, top, right, bottom = (int(round(value)) for value in region)
+            left, right = max(0, min(left, right)), min(width, max(left, right))
+            top, bottom = max(0, min(top, bottom)), min(height, max(top, bottom))
+            if right - left < 2 or bottom - top < 2:
+                raise ValueError(f"Región vacía o fuera de la imagen: {tuple(region)}")
+            crop = Image(path=image.path, width=right - left, height=bottom - top,
+                         format=image.format, pixels=pixels[top:bottom, left:right])
+            results.append(self.extract_text(crop, cancel_token))
+        return results
 
 
 class ConfigurationRepository(ABC):
@@ -0,0 +1,170 @@
+"""
+Motor de reconocimiento por lotes - Agrupa los recortes de línea de muchas
+imágenes en lotes del reconocedor ordenados por ancho
+"""
+import math
+from typing import Any, Optional
+
+from ..domain.cancellation import CancellationToken, check_cancelled
+
+# Altura de entrada del reconocedor de EasyOCR (fija en Reader.recognize)
+RECOGNIZER_HEIGHT = 64
+
+
+class PooledRecognitionEngine:
+    """
+    Ejecuta la detección por imagen y el reconocimiento sobre un fondo común
+    de recortes, para que cada pasada del reconocedor procese un lote completo
+    """
+
+    def __init__(self, reader, batch_size: int = 32, paragraph: bool = True,
+                 workers: int = 0, loader=None, **readtext_options):
+        """
+        Inicializa el motor
+
+        Args:
+            reader: Instancia de easyocr.Reader
+            batch_size: Cantidad de recortes por pasada del reconocedor
+            paragraph: Si agrupar las líneas en párrafos
+            workers: Workers del DataLoader del reconocedor
+            loader: Función opcional que convierte cada entrada antes de la
+                detección (ej: decodificación normalizada); se aplica por imagen
+            readtext_options: Parámetros de detección/decodificación de readtext
+                (decoder, contrast_ths, text_threshold, ...)
+        """
+        self.reader = reader
+        self.batch_size = max(1, int(batch_size))
+        self.paragraph = paragraph
+        self.workers = workers
+        self.loader = loader
+        self.options = readtext_options
+
+    def _option(self, name: str, default: Any) -> Any:
+        return self.options.get(name, default)
+
+    def detect(self, image) -> tuple[Any, list]:
+        """
+        Detecta las líneas de texto de una imagen
+
+        Args:
+            image: Ruta, bytes o ndarray aceptados por easyocr
+
+        Returns:
+            Tupla (imagen_gris, lista de (caja, recorte)) con los recortes ya
+            escalados a la altura del reconocedor
+        """
+        from easyocr.utils import reformat_input, get_image_list
+
+        if self.loader is not None:
+            image = self.loader(image)
+        img, img_cv_grey = reformat_input(image)
+        horizontal_list, free_list = self.reader.detect(
+            img,
+            min_size=self._option('min_size', 20),
+            text_threshold=self._option('text_threshold', 0.7),
+            low_text=self._option('low_text', 0.4),
+            link_threshold=self._option('link_threshold', 0.4),
+            canvas_size=self._option('canvas_size', 2560),
+            mag_ratio=self._option('mag_ratio', 1.0),
+        )
+        image_list, _ = get_image_list(
+            horizontal_list[0], free_list[0], img_cv_grey,
+            model_height=RECOGNIZER_HEIGHT, sort_output=False
+        )
+        return img_cv_grey, image_list
+
+    def _ignore_char(self) -> str:
+        """Caracteres que el reconocedor debe descartar (igual que Reader.recognize)"""
+        return ''.join(set(self.reader.character) - set(self.reader.lang_char))
+
+    def recognize_pool(self, pool: list[tuple[int, int, Any, Any]],
+                       cancel_token: Optional[CancellationToken] = None) -> dict:
+        """
+        Reconoce un fondo de recortes de varias imágenes
+
+        Args:
+            pool: Lista de (índice_imagen, índice_línea, caja, recorte)
+            cancel_token: Token consultado antes de cada pasada del reconocedor
+
+        Returns:
+            Diccionario {(índice_imagen, índice_línea): (caja, texto, confianza)}
+        """
+        from easyocr.recognition import get_text
+
+        # Ordenar por ancho para minimizar el relleno dentro de cada lote
+        ordered = sorted(pool, key=lambda item: item[3].shape[1])
+        ignore_char = self._ignore_char()
+        recognized = {}
+
+        for start in range(0, len(ordered), self.batch_size):
+            check_cancelled(cancel_token)
+            chunk = ordered[start:start + self.batch_size]
+            max_width = max(
+                math.ceil(crop.shape[1] / crop.shape[0]) * RECOGNIZER_HEIGHT
+                for _, _, _, crop in chunk
+            )
+            results = get_text(
+                self.reader.character, RECOGNIZER_HEIGHT, int(max_width),
+                self.reader.recognizer, self.reader.converter,
+                [(box, crop) for _, _, box, crop in chunk],
+                ignore_char,
+                self._option('decoder', 'greedy'),
+                self._option('beamWidth', 5),
+                len(chunk),
+                self._option('contrast_ths', 0.1),
+                self._option('adjust_contrast', 0.5),
+                self._option('filter_ths', 0.003),
+                self.workers,
+                self.reader.device,
+            )
+            for (image_index, line_index, _, _), result in zip(chunk, results):
+                recognized[(image_index, line_index)] = result
+
+        return recognized
+
+    def readtext_batch(self, images: list, detail: int = 0,
+                       cancel_token: Optional[CancellationToken] = None) -> list:
+        """
+        Extrae el texto de varias imágenes con reconocimiento agrupado
+
+        Args:
+            images: Lista de rutas, bytes o ndarrays
+            detail: 0 = solo textos, 1 = (caja, texto, confianza)
+            cancel_token: Token consultado entre imágenes y pasadas del
+                reconocedor (lanza OperationCancelled)
+
+        Returns:
+            Lista paralela a images; cada elemento es la salida equivalente a
+            readtext para esa imagen, o la excepción si su detección falló
+        """
+        from easyocr.utils import get_paragraph
+
+        pool = []
+        line_counts = {}
+        outputs = [None] * len(images)
+
+        for image_index, image in enumerate(images):
+            check_cancelled(cancel_token)
+            try:
+                _, image_list = self.detect(image)
+            except Exception as e:
+                outputs[image_index] = e
+                continue
+            line_counts[image_index] = len(image_list)
+            for line_index, (box, crop) in enumerate(image_list):
+                pool.append((image_index, line_index, box, crop))
+
+        recognized = self.recognize_pool(pool, cancel_token) if pool else {}
+
+        # Devolver cada línea a su imagen, en el orden original de detección
+        for image_index, count in line_counts.items():
+            lines = [recognized[(image_index, i)] for i in range(count)]
+            if self.paragraph:
+                lines = get_paragraph(
+                    lines,
+                    x_ths=self._option('x_ths', 1.0),
+                    y_ths=self._option('y_ths', 0.5),
+                )
+            outputs[image_index] = [item[1] for item in lines] if detail == 0 else lines
+
+        return outputs
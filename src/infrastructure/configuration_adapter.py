@@ -4,7 +4,7 @@ Adaptador de configuración - Gestión de configuración persistente
 import json
 from pathlib import Path
 from typing import Optional
-from ..domain.entities import Configuration
+from ..domain.entities import Configuration, PerformanceSettings
 from ..domain.repositories import ConfigurationRepository
 
 
@@ -35,7 +35,9 @@ class FileConfigurationAdapter(ConfigurationRepository):
                 language=data.get('language', 'English'),
                 ocr_detail_level=data.get('ocr_detail_level', 0),
                 use_gpu=data.get('use_gpu', False),
-                paragraph_mode=data.get('paragraph_mode', True)
+                paragraph_mode=data.get('paragraph_mode', True),
+                ocr_backend=data.get('ocr_backend', 'easyocr'),
+                ocr_languages=list(data.get('ocr_languages', ['en', 'es']))
             )
         except Exception as e:
             print(f"Error cargando configuración: {e}")
@@ -44,13 +46,21 @@ class FileConfigurationAdapter(ConfigurationRepository):
     def save_configuration(self, config: Configuration) -> None:
         """Guarda la configuración en archivo"""
         try:
-            data = {
+            # Conservar las demás claves del archivo (compartido con la aplicación)
+            data = {}
+            if self.config_file.exists():
+                with open(self.config_file, 'r') as f:
+                    data = json.load(f)
+            
+            data.update({
                 'theme': config.theme,
                 'language': config.language,
                 'ocr_detail_level': config.ocr_detail_level,
                 'use_gpu': config.use_gpu,
-                'paragraph_mode': config.paragraph_mode
-            }
+                'paragraph_mode': config.paragraph_mode,
+                'ocr_backend': config.ocr_backend,
+                'ocr_languages': list(config.ocr_languages)
+            })
             
             with open(self.config_file, 'w') as f:
                 json.dump(data, f, indent=2)
@@ -58,6 +68,95 @@ class FileConfigurationAdapter(ConfigurationRepository):
             print(f"Error guardando configuración: {e}")
 
 
+class PerformanceSettingsAdapter:
+    """Persiste los parámetros de rendimiento OCR dentro del archivo de configuración"""
+    
+    SECTION = 'ocr_performance'
+    
+    def __init__(self, config_file: str = "config.json"):
+        """
+        Inicializa el adaptador
+        
+        Args:
+            config_file: Ruta del archivo de configuración compartido con la aplicación
+        """
+        self.config_file = Path(config_file)
+    
+    def get_settings(self) -> PerformanceSettings:
+        """Carga los parámetros guardados (o los valores por defecto)"""
+        try:
+            section = self._load().get(self.SECTION) or {}
+            return PerformanceSettings(
+                process_workers=max(1, int(section.get('process_workers', 1))),
+                torch_threads=max(0, int(section.get('torch_threads', 0))),
+                batch_size=max(1, int(section.get('batch_size', 1))),
+                recognizer_workers=max(0, int(section.get('recognizer_workers', 0))),
+                quantized_recognizer=bool(section.get('quantized_recognizer', True)),
+                normalize_input=bool(section.get('normalize_input', True)),
+                refine_threshold=min(1.0, max(0.0, float(section.get('refine_threshold', 0.5)))),
+                text_presence_threshold=min(1.0, max(0.0, float(section.get('text_presence_threshold', 0.01)))),
+                detect_orientation=bool(section.get('detect_orientation', True)),
+                reader_memory_budget_mb=max(0, int(section.get('reader_memory_budget_mb', 0))),
+                image_timeout_seconds=max(0.0, float(section.get('image_timeout_seconds', 120.0))),
+                daemon_batch_window_ms=max(0.0, float(section.get('daemon_batch_window_ms', 5.0))),
+                daemon_max_batch=max(1, int(section.get('daemon_max_batch', 8))),
+                daemon_max_queue=max(1, int(section.get('daemon_max_queue', 32))),
+                result_cache_mb=max(0, int(section.get('result_cache_mb', 256))),
+                near_duplicate_distance=min(16, max(0, int(section.get('near_duplicate_distance', 0)))),
+                near_duplicate_verify=bool(section.get('near_duplicate_verify', True)),
+                watch_settle_seconds=max(0.0, float(section.get('watch_settle_seconds', 2.0))),
+                watch_poll_seconds=max(0.1, float(section.get('watch_poll_seconds', 2.0)))
+            )
+        except Exception as e:
+            print(f"Error cargando parámetros de rendimiento: {e}")
+            return PerformanceSettings()
+    
+    def save_settings(self, settings: PerformanceSettings, extra: dict = None) -> None:
+        """
+        Guarda los parámetros sin modificar el resto de la configuración
+        
+        Args:
+            settings: Parámetros a guardar
+            extra: Datos adicionales a guardar en la sección (ej: resultado del tuning)
+        """
+        try:
+            data = self._load()
+            section = {
+                'process_workers': settings.process_workers,
+                'torch_threads': settings.torch_threads,
+                'batch_size': settings.batch_size,
+                'recognizer_workers': settings.recognizer_workers,
+                'quantized_recognizer': settings.quantized_recognizer,
+                'normalize_input': settings.normalize_input,
+                'refine_threshold': settings.refine_threshold,
+                'text_presence_threshold': settings.text_presence_threshold,
+                'detect_orientation': settings.detect_orientation,
+                'reader_memory_budget_mb': settings.reader_memory_budget_mb,
+                'image_timeout_seconds': settings.image_timeout_seconds,
+                'daemon_batch_window_ms': settings.daemon_batch_window_ms,
+                'daemon_max_batch': settings.daemon_max_batch,
+                'daemon_max_queue': settings.daemon_max_queue,
+                'result_cache_mb': settings.result_cache_mb,
+                'near_duplicate_distance': settings.near_duplicate_distance,
+                'near_duplicate_verify': settings.near_duplicate_verify,
+                'watch_settle_seconds': settings.watch_settle_seconds,
+                'watch_poll_seconds': settings.watch_poll_seconds
+            }
+            section.update(extra or {})
+            data[self.SECTION] = section
+            
+            with open(self.config_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+        except Exception as e:
+            print(f"Error guardando parámetros de rendimiento: {e}")
+    
+    def _load(self) -> dict:
+        if not self.config_file.exists():
+            return {}
+        with open(self.config_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+
 class ExtractionHistoryAdapter:
     """Adaptador para gestionar historial de extracciones"""
     
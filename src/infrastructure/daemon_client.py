@@ -0,0 +1,162 @@
+"""
+Cliente del demonio OCR local
+Habla HTTP/JSON sobre un socket Unix (o localhost TCP donde no hay AF_UNIX)
+y no importa torch, EasyOCR ni Qt: así la GUI y los scripts pueden usar los
+lectores que el demonio mantiene cargados sin cargar los suyos.
+"""
+import http.client
+import json
+import os
+import socket
+import tempfile
+from typing import Optional
+
+# Socket Unix por defecto (uno por usuario)
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(),
+                              f"extractor-ocr-{os.getuid() if hasattr(os, 'getuid') else 'user'}.sock")
+# Puerto localhost por defecto donde no hay sockets Unix (Windows)
+DEFAULT_PORT = 8765
+# Segundos para conectar y consultar el estado
+PROBE_TIMEOUT = 0.5
+
+
+class DaemonUnavailable(ConnectionError):
+    """No hay un demonio escuchando o no está listo"""
+
+
+class DaemonOverloaded(RuntimeError):
+    """El demonio rechazó la solicitud por tener la cola llena"""
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection sobre un socket Unix"""
+
+    def __init__(self, socket_path: str, timeout: Optional[float] = None):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class DaemonClient:
+    """Solicitudes de extracción y exportación al demonio OCR"""
+
+    def __init__(self, socket_path: Optional[str] = None, port: Optional[int] = None):
+        """
+        Args:
+            socket_path: Socket Unix del demonio (None = DEFAULT_SOCKET)
+            port: Puerto localhost; si se indica se usa TCP en lugar del socket.
+                Sin sockets Unix se usa DEFAULT_PORT
+        """
+        if port is None and not hasattr(socket, 'AF_UNIX'):
+            port = DEFAULT_PORT
+        self.port = port
+        self.socket_path = None if port is not None else (socket_path or DEFAULT_SOCKET)
+
+    def _connection(self, timeout: Optional[float]) -> http.client.HTTPConnection:
+        if self.socket_path is not None:
+            return _UnixHTTPConnection(self.socket_path, timeout=timeout)
+        return http.client.HTTPConnection('127.0.0.1', self.port, timeout=timeout)
+
+    def _request(self, method: str, path: str, payload: Optional[dict] = None,
+                 timeout: Optional[float] = None) -> tuple[int, dict]:
+        """
+        Envía una solicitud y decodifica la respuesta JSON
+
+        Raises:
+            DaemonUnavailable: Si no se puede conectar
+        """
+        connection = self._connection(timeout)
+        try:
+            body = json.dumps(payload).encode('utf-8') if payload is not None else None
+            headers = {'Content-Type': 'application/json'} if body is not None else {}
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            data = response.read()
+            return response.status, json.loads(data.decode('utf-8')) if data else {}
+        except (OSError, http.client.HTTPException) as e:
+            raise DaemonUnavailable(f"Demonio OCR no disponible: {e}")
+        finally:
+            connection.close()
+
+    def _checked(self, status: int, data: dict) -> dict:
+        """
+        Raises:
+            DaemonOverloaded: Si la cola del demonio está llena (503)
+            DaemonUnavailable: Si el demonio aún no está listo
+            TimeoutError: Si la solicitud venció en el demonio (504)
+            ValueError: Si el demonio rechazó la solicitud (4xx)
+            RuntimeError: Si la extracción falló en el demonio
+        """
+        if status == 200:
+            return data
+        error = data.get('error', f"HTTP {status}")
+        if status == 503 and data.get('reason') == 'overloaded':
+            raise DaemonOverloaded(error)
+        if status == 503:
+            raise DaemonUnavailable(error)
+        if status == 504:
+            raise TimeoutError(error)
+        if 400 <= status < 500:
+            raise ValueError(error)
+        raise RuntimeError(error)
+
+    def health(self) -> Optional[dict]:
+        """Estado del demonio, o None si no hay uno escuchando"""
+        if self.socket_path is not None and not os.path.exists(self.socket_path):
+            return None
+        try:
+            _, data = self._request('GET', '/health', timeout=PROBE_TIMEOUT)
+            return data
+        except DaemonUnavailable:
+            return None
+
+    def is_ready(self) -> bool:
+        """Indica si el demonio está escuchando y con el motor cargado"""
+        if self.socket_path is not None and not os.path.exists(self.socket_path):
+            return False
+        try:
+            status, _ = self._request('GET', '/ready', timeout=PROBE_TIMEOUT)
+            return status == 200
+        except DaemonUnavailable:
+            return False
+
+    def stats(self) -> dict:
+        """Contadores del demonio (solicitudes, rechazos, lotes)"""
+        return self._checked(*self._request('GET', '/stats', timeout=PROBE_TIMEOUT))
+
+    def extract(self, image_path: str, regions: Optional[list] = None,
+                timeout: Optional[float] = None) -> dict:
+        """
+        Extrae el texto de una imagen en el demonio
+
+        Args:
+            image_path: Ruta de la imagen (el demonio la lee del mismo disco)
+            regions: Lista opcional de (izquierda, arriba, derecha, abajo) en píxeles
+            timeout: Segundos máximos de espera (None = sin límite)
+
+        Returns:
+            Diccionario con text, confidence, orientation e image_path, o con
+            regions (lista de esos diccionarios) si se indicaron regiones
+        """
+        payload = {'path': os.path.abspath(image_path)}
+        if regions:
+            payload['regions'] = [list(region) for region in regions]
+        if timeout:
+            payload['timeout'] = timeout
+        return self._checked(*self._request('POST', '/extract', payload, timeout=timeout))
+
+    def export(self, text: str, file_path: str, format: str) -> bool:
+        """Exporta texto desde el demonio ('txt', 'docx', 'pdf' o 'rtf')"""
+        payload = {'text': text, 'path': os.path.abspath(file_path), 'format': format}
+        return bool(self._checked(*self._request('POST', '/export', payload)).get('ok'))
+
+
+def find_daemon(socket_path: Optional[str] = None, port: Optional[int] = None) -> Optional[DaemonClient]:
+    """Cliente del demonio si hay uno listo, o None para trabajar en el proceso"""
+    client = DaemonClient(socket_path, port)
+    return client if client.is_ready() else None
@@ -0,0 +1,284 @@
+"""
+Vigilancia de carpetas para la ingesta en caliente
+InotifyWatcher usa inotify por ctypes (Linux, sin dependencias) y
+PollingWatcher compara (tamaño, mtime) en cada sondeo donde no hay inotify o
+la carpeta es un recurso de red que no lo notifica. SettleTracker retiene
+cada archivo hasta que deja de cambiar, así no se lee un escaneo a medio
+copiar, y WatchManifest recuerda (ruta, tamaño, mtime, hash) → salida en
+SQLite para que un reinicio no vuelva a leer ni extraer lo ya procesado.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import sqlite3
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from .security import SecurityValidator
+
+# Máscaras de inotify (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+_WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+_EVENT = struct.Struct('iIII')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest TEXT,
+    text_digest TEXT,
+    output TEXT,
+    status TEXT NOT NULL,
+    error TEXT,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_output ON files (output);
+"""
+
+
+def is_image_path(path: str) -> bool:
+    """Indica si la ruta tiene una extensión de imagen permitida"""
+    return Path(path).suffix.lower() in SecurityValidator.ALLOWED_IMAGE_EXTENSIONS
+
+
+def scan_folder(root: str, recursive: bool = False) -> list[str]:
+    """Imágenes de una carpeta (rutas absolutas, ordenadas); solo lista, no lee"""
+    pattern = '**/*' if recursive else '*'
+    return sorted(os.path.abspath(path) for path in map(str, Path(root).glob(pattern))
+                  if is_image_path(path) and os.path.isfile(path))
+
+
+def file_signature(path: str) -> Optional[tuple[int, int]]:
+    """(tamaño, mtime_ns) de un archivo, o None si ya no existe"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class PollingWatcher:
+    """Detecta archivos nuevos o modificados comparando (tamaño, mtime) entre sondeos"""
+
+    def __init__(self, root: str, recursive: bool = False, interval: float = 2.0):
+        """
+        Args:
+            root: Carpeta vigilada
+            recursive: Si incluir subcarpetas
+            interval: Segundos entre sondeos
+        """
+        self.root = root
+        self.recursive = recursive
+        self.interval = interval
+        self._snapshot = {path: file_signature(path) for path in scan_folder(root, recursive)}
+
+    def changes(self, timeout: float) -> set[str]:
+        """Espera hasta el próximo sondeo (como mucho timeout) y retorna las rutas que cambiaron"""
+        time.sleep(max(0.0, min(timeout, self.interval)))
+        snapshot = {path: file_signature(path) for path in scan_folder(self.root, self.recursive)}
+        changed = {path for path, signature in snapshot.items() if self._snapshot.get(path) != signature}
+        self._snapshot = snapshot
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """Eventos de inotify de la carpeta (y de sus subcarpetas si es recursivo)"""
+
+    def __init__(self, root: str, recursive: bool = False):
+        """
+        Raises:
+            OSError: Si inotify no está disponible o no se puede vigilar la carpeta
+        """
+        self.root = os.path.abspath(root)
+        self.recursive = recursive
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falló")
+        self._dirs = {}
+        # Desbordes de la cola del núcleo: quien vigila debe volver a listar la carpeta
+        self.overflowed = False
+        self._add_tree(self.root)
+
+    @staticmethod
+    def available() -> bool:
+        """Indica si la plataforma tiene inotify (Linux)"""
+        return sys.platform.startswith('linux')
+
+    def _add_tree(self, directory: str) -> None:
+        self._add_watch(directory)
+        if self.recursive:
+            for path in Path(directory).rglob('*'):
+                if path.is_dir():
+                    self._add_watch(str(path))
+
+    def _add_watch(self, directory: str) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"No se puede vigilar {directory}")
+        self._dirs[wd] = directory
+
+    def changes(self, timeout: float) -> set[str]:
+        """Espera eventos como mucho timeout segundos y retorna las rutas de imagen afectadas"""
+        readable, _, _ = select.select([self._fd], [], [], max(0.0, timeout))
+        if not readable:
+            return set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed = set()
+        offset = 0
+        while offset + _EVENT.size <= len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            name = data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b'\0')
+            offset += _EVENT.size + length
+            if mask & IN_Q_OVERFLOW:
+                self.overflowed = True
+                continue
+            if mask & IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            directory = self._dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, os.fsdecode(name))
+            if mask & IN_ISDIR:
+                if self.recursive and mask & (IN_CREATE | IN_MOVED_TO):
+                    # Carpeta nueva: se vigila y se toman las imágenes que ya trae
+                    try:
+                        self._add_tree(path)
+                    except OSError as e:
+                        print(f"Warning: {e}")
+                    changed.update(scan_folder(path, recursive=True))
+            elif is_image_path(path):
+                changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def create_watcher(root: str, recursive: bool = False, poll_interval: float = 2.0, polling: bool = False):
+    """InotifyWatcher donde esté disponible; PollingWatcher si no o si se pide sondeo"""
+    if not polling and InotifyWatcher.available():
+        try:
+            return InotifyWatcher(root, recursive)
+        except (OSError, AttributeError) as e:
+            print(f"Warning: inotify no disponible ({e}); se vigila por sondeo")
+    return PollingWatcher(root, recursive, poll_interval)
+
+
+class SettleTracker:
+    """Retiene archivos hasta que su (tamaño, mtime) no cambia durante settle segundos"""
+
+    def __init__(self, settle: float = 2.0):
+        self.settle = settle
+        self._pending = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def touch(self, path: str) -> None:
+        """Registra actividad en un archivo (reinicia su espera si cambió)"""
+        signature = file_signature(path)
+        if signature is None:
+            self._pending.pop(path, None)
+        elif self._pending.get(path, (None,))[0] != signature:
+            self._pending[path] = (signature, time.monotonic())
+
+    def ready(self) -> list[str]:
+        """Archivos estables, en orden de llegada; los borrados se descartan"""
+        now = time.monotonic()
+        ready = []
+        for path, (signature, since) in list(self._pending.items()):
+            current = file_signature(path)
+            if current is None:
+                del self._pending[path]
+            elif current != signature:
+                # Sigue creciendo: se copia o se escanea todavía
+                self._pending[path] = (current, now)
+            elif now - since >= self.settle:
+                del self._pending[path]
+                ready.append(path)
+        return ready
+
+    def next_deadline(self) -> Optional[float]:
+        """Segundos hasta que el archivo más antiguo pueda quedar estable (None sin pendientes)"""
+        if not self._pending:
+            return None
+        oldest = min(since for _, since in self._pending.values())
+        return max(0.0, oldest + self.settle - time.monotonic())
+
+
+class WatchManifest:
+    """(ruta, tamaño, mtime, hash) → salida de cada imagen procesada, en SQLite"""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Archivo SQLite del manifiesto (se crea con su carpeta si no existe)
+        """
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.executescript(_SCHEMA)
+
+    def get(self, path: str) -> Optional[dict]:
+        """Entrada de una imagen o None si nunca se procesó"""
+        with self._lock:
+            row = self._db.execute("SELECT * FROM files WHERE path = ?", (path,)).fetchone()
+        return dict(row) if row else None
+
+    def is_current(self, path: str) -> bool:
+        """Indica si la imagen ya se procesó con su tamaño y mtime actuales (sin leerla)"""
+        entry = self.get(path)
+        return entry is not None and (entry['size'], entry['mtime_ns']) == file_signature(path)
+
+    def record(self, path: str, signature: tuple[int, int], status: str, digest: Optional[str] = None,
+               text_digest: Optional[str] = None, output: Optional[str] = None,
+               error: Optional[str] = None) -> None:
+        """Guarda o reemplaza la entrada de una imagen"""
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO files (path, size, mtime_ns, digest, text_digest, output, status, error, updated)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (path, signature[0], signature[1], digest, text_digest, output, status, error, time.time()))
+            self._db.commit()
+
+    def output_taken(self, output: str, exclude: Optional[str] = None) -> bool:
+        """Indica si la salida ya está asignada a otra imagen (consulta por índice, sin recorrer el manifiesto)"""
+        with self._lock:
+            row = self._db.execute("SELECT 1 FROM files WHERE output = ? AND path IS NOT ? LIMIT 1",
+                                   (output, exclude)).fetchone()
+        return row is not None
+
+    def counts(self) -> dict:
+        """Imágenes del manifiesto por estado"""
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM files GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,130 @@
+"""
+Ingesta de imágenes: validar, leer y decodificar una sola vez
+El archivo se lee una vez y se decodifica a un buffer RGB (ndarray) que
+recorre orientación, detección de escritura, normalización y readtext. Con
+decode=False se conservan los bytes leídos y la única decodificación queda
+para la normalización, que decodifica los JPEG ya reducidos (draft). Las
+lecturas de archivo que quedan pasan por read_image_bytes y se cuentan por
+ruta en file_reads.
+"""
+import io
+import threading
+from collections import Counter
+from typing import Optional
+
+from ..domain.entities import Image
+from .security import SecurityValidator
+
+# Lecturas completas de archivo por ruta (instrumentación)
+file_reads = Counter()
+_reads_lock = threading.Lock()
+
+
+def read_image_bytes(path: str) -> bytes:
+    """Lee el contenido de un archivo de imagen y registra la lectura"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    with _reads_lock:
+        file_reads[path] += 1
+    return data
+
+
+def reset_file_reads() -> None:
+    """Reinicia el contador de lecturas"""
+    with _reads_lock:
+        file_reads.clear()
+
+
+def open_image(path: str):
+    """
+    Abre una imagen desde disco con una lectura registrada
+
+    Returns:
+        PIL.Image (sin decodificar hasta el primer uso de los píxeles)
+    """
+    from PIL import Image as PILImage
+
+    return PILImage.open(io.BytesIO(read_image_bytes(path)))
+
+
+def as_pil(source):
+    """
+    PIL.Image a partir de una ruta, los bytes del archivo, un ndarray o una PIL.Image
+
+    Args:
+        source: Ruta (se lee con open_image), bytes, ndarray HxW o HxWx3, o PIL.Image
+    """
+    from PIL import Image as PILImage
+
+    if isinstance(source, str):
+        return open_image(source)
+    if isinstance(source, bytes):
+        return PILImage.open(io.BytesIO(source))
+    if isinstance(source, PILImage.Image):
+        return source
+    return PILImage.fromarray(source)
+
+
+def preview_image(source, size: tuple[int, int]):
+    """
+    Miniatura RGB para mostrar; los JPEG se decodifican directamente reducidos
+
+    Args:
+        source: Ruta, bytes del archivo, ndarray o PIL.Image
+        size: (ancho, alto) máximos de la miniatura
+    """
+    image = as_pil(source)
+    # draft() solo sobre un archivo recién abierto: no altera imágenes del llamador
+    if isinstance(source, (str, bytes)) and image.format == 'JPEG':
+        image.draft('RGB', size)
+    image = image.convert('RGB')
+    image.thumbnail(size)
+    return image
+
+
+def ingest_image(path: str, validate: bool = True, max_pixels: Optional[int] = None,
+                 data: Optional[bytes] = None, decode: bool = True) -> Image:
+    """
+    Valida, lee y decodifica una imagen una sola vez
+
+    Args:
+        path: Ruta de la imagen
+        validate: Si aplicar SecurityValidator.validate_image_path antes de leer
+        max_pixels: Límite de píxeles decodificados (None = límite de PIL)
+        data: Bytes del archivo si quien llama ya los leyó (ej. para un
+            pre-filtro o un hash); así el archivo no se vuelve a leer
+        decode: Si decodificar a pixels. Con False solo se leen la cabecera
+            (dimensiones y formato) y los bytes quedan en data, para que el
+            motor los decodifique una vez a la escala que necesita
+
+    Returns:
+        Image con dimensiones, formato y el buffer RGB en pixels (o los
+        bytes del archivo en data si decode=False)
+
+    Raises:
+        ValueError: Si la ruta no es válida o el archivo no es una imagen
+    """
+    import numpy as np
+
+    if validate:
+        is_valid, error = SecurityValidator.validate_image_path(path)
+        if not is_valid:
+            raise ValueError(f"Ruta de imagen inválida: {error}")
+
+    try:
+        if data is None:
+            data = read_image_bytes(path)
+        image = as_pil(data)
+        image_format = image.format or "unknown"
+        if max_pixels is not None and image.width * image.height > max_pixels:
+            raise ValueError(f"Imagen demasiado grande ({image.width}x{image.height})")
+        if not decode:
+            return Image(path=path, width=image.width, height=image.height, format=image_format, data=data)
+        pixels = np.asarray(image.convert('RGB'))
+    except ValueError:
+        raise
+    except Exception as e:
+        raise ValueError(f"No se pudo decodificar la imagen: {e}")
+
+    height, width = pixels.shape[:2]
+    return Image(path=path, width=width, height=height, format=image_format, pixels=pixels)
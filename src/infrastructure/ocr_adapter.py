@@ -1,73 +1,618 @@
 """
 Adaptador OCR - Implementación de extracción de texto con EasyOCR
 """
-import easyocr
-from typing import Optional
-from ..domain.entities import ExtractionResult, Image
+from typing import Iterator, Optional
+from ..domain.entities import ExtractionResult, Image, PerformanceSettings
+from ..domain.cancellation import CancellationToken, DeadlineExceeded, OperationCancelled, check_cancelled
 from ..domain.repositories import TextExtractionRepository
+from .reader_registry import get_reader_registry
+from .batch_engine import PooledRecognitionEngine
+from .performance_tuner import apply_performance_settings
+from .tiling import TiledOCREngine, needs_tiling
+from .preprocessing import load_normalized, normalize_image
+from .ingestion import as_pil, read_image_bytes
+from .refinement import refine_low_confidence, aggregate_confidence
+from .orientation import estimate_orientation, apply_orientation
+from .script_detection import AUTO_LANGUAGES, ScriptRouter
+
+
+# Líneas reconocidas por tanda en la lectura progresiva
+STREAM_LINES = 8
+
+
+def _rescale_boxes(results: list, factor: float) -> list:
+    """Lleva las cajas de detail=1 a coordenadas de la imagen original"""
+    return [
+        ([[x * factor, y * factor] for x, y in item[0]],) + tuple(item[1:])
+        for item in results
+    ]
+
+
+def format_lines(lines: list, detail: int = 0, paragraph: bool = True) -> list:
+    """
+    Convierte líneas (caja, texto, confianza) a la salida de readtext
+
+    Args:
+        lines: Lista de (caja, texto, confianza) sin agrupar
+        detail: 0 = solo textos, 1 = cajas y textos
+        paragraph: Si agrupar las líneas en párrafos (igual que readtext)
+    """
+    if paragraph:
+        from easyocr.utils import get_paragraph
+        lines = get_paragraph(lines, x_ths=1.0, y_ths=0.5)
+    if detail == 0:
+        return [item[1] for item in lines]
+    return lines
+
+
+def _readtext_checked(reader, image, options: dict, cancel_token: Optional[CancellationToken]) -> list:
+    """
+    readtext línea por línea; con token, detección y reconocimiento van por
+    separado (lo mismo que hace readtext) con un punto de control entre ambos
+    """
+    if cancel_token is None or not hasattr(reader, 'recognize'):
+        return reader.readtext(image, detail=1, paragraph=False, **options)
+
+    from easyocr.utils import reformat_input
+
+    img, img_cv_grey = reformat_input(image)
+    horizontal_list, free_list = reader.detect(img, reformat=False)
+    cancel_token.check()
+    return reader.recognize(img_cv_grey, horizontal_list[0], free_list[0],
+                            detail=1, paragraph=False, reformat=False, **options)
+
+
+def _prepare_source(reader, image, performance: PerformanceSettings,
+                    cancel_token: Optional[CancellationToken] = None) -> tuple:
+    """
+    Orientación y normalización de escala previas al OCR
+
+    Args:
+        image: Bytes del archivo o imagen ya decodificada (ndarray RGB o PIL.Image)
+
+    Returns:
+        Tupla (PIL.Image RGB enderezada y reescalada, escala aplicada, ángulo)
+    """
+
+    angle = estimate_orientation(reader, image) if performance.detect_orientation else 0
+    check_cancelled(cancel_token)
+
+    scale = 1.0
+    if performance.normalize_input:
+        source, scale = load_normalized(image, angle)
+    else:
+        source = as_pil(image)
+        # convert() siempre copia: solo se convierte si no es RGB
+        if source.mode != 'RGB':
+            source = source.convert('RGB')
+        source = apply_orientation(source, angle)
+    check_cancelled(cancel_token)
+    return source, scale, angle
+
+
+def _original_loader(image, angle: int):
+    """
+    Función que decodifica una sola vez, y solo si se la llama, el original
+    enderezado sin reescalar (de donde se recortan las líneas dudosas)
+    """
+    loaded = []
+
+    def load():
+        if not loaded:
+            original = as_pil(image)
+            if original.mode != 'RGB':
+                original = original.convert('RGB')
+            loaded.append(apply_orientation(original, angle))
+        return loaded[0]
+    return load
+
+
+def _finish_lines(reader, source, lines: list, scale: float, performance: PerformanceSettings,
+                  original=None) -> list:
+    """
+    Segunda pasada sobre las líneas dudosas y cajas en coordenadas originales
+
+    Args:
+        original: Función que entrega el original a resolución completa
+            (ver _original_loader); sin ella se recorta de source
+    """
+    threshold = performance.refine_threshold
+    refine_source, refine_scale = source, 1.0
+    if (scale != 1.0 and original is not None and threshold > 0
+            and any(conf < threshold for _, _, conf in lines)):
+        refine_source, refine_scale = original(), scale
+    lines, _ = refine_low_confidence(reader, refine_source, lines, threshold,
+                                     recognize_options=performance.readtext_options,
+                                     scale=refine_scale)
+    if scale != 1.0:
+        lines = _rescale_boxes(lines, 1.0 / scale)
+    return lines
+
+
+def ocr_lines(reader, image, performance: PerformanceSettings,
+              cancel_token: Optional[CancellationToken] = None) -> tuple[list, int]:
+    """
+    Lectura de una imagen línea por línea: orientación, normalización de
+    escala, mosaicos para escaneos grandes o readtext directo, y segunda
+    pasada sobre las líneas de confianza baja
+
+    Args:
+        reader: Lector con readtext
+        image: Ruta (se lee una sola vez) o imagen ya decodificada
+            (ndarray RGB o PIL.Image); todas las etapas usan el mismo buffer
+        performance: Parámetros de rendimiento
+        cancel_token: Token consultado entre etapas (cancelación y plazo)
+
+    Returns:
+        Tupla (lista de (caja, texto, confianza), ángulo aplicado). Las cajas
+        están en coordenadas de la imagen original ya enderezada
+
+    Raises:
+        OperationCancelled, DeadlineExceeded: Si el token lo indica
+    """
+    import numpy as np
+
+    if isinstance(image, str):
+        image = read_image_bytes(image)
+    source, scale, angle = _prepare_source(reader, image, performance, cancel_token)
+    original = _original_loader(image, angle)
+
+    if needs_tiling(*source.size):
+        # Escaneos grandes: mosaicos en paralelo; el trabajo del detector se acota
+        # por mosaico (la imagen completa ya está decodificada)
+        lines = TiledOCREngine(
+            reader,
+            readtext_options=performance.readtext_options
+        ).readtext(source, detail=1, paragraph=False, cancel_token=cancel_token)
+    else:
+        lines = _readtext_checked(reader, np.asarray(source), performance.readtext_options, cancel_token)
+    check_cancelled(cancel_token)
+
+    return _finish_lines(reader, source, lines, scale, performance, original), angle
+
+
+def iter_ocr_lines(reader, image, performance: PerformanceSettings,
+                   cancel_token: Optional[CancellationToken] = None,
+                   chunk_lines: int = STREAM_LINES) -> Iterator[tuple]:
+    """
+    Lectura progresiva (mismas etapas que ocr_lines): se detectan todas las
+    líneas y se reconocen por tandas en orden de lectura, entregando cada
+    tanda en cuanto termina. En CPU recognize procesa las líneas de a una, así
+    que partir el reconocimiento no agrega trabajo
+
+    Args:
+        reader: Lector con detect/recognize (sin ellos se usa readtext de una vez)
+        image: Ruta o imagen ya decodificada (ndarray RGB o PIL.Image)
+        performance: Parámetros de rendimiento
+        cancel_token: Token consultado entre tandas
+        chunk_lines: Líneas reconocidas por tanda
+
+    Yields:
+        Tuplas (líneas de la tanda, líneas procesadas, líneas detectadas,
+        ángulo aplicado), con cajas en coordenadas de la imagen original ya
+        enderezada. Los escaneos por mosaicos informan el avance por mosaico y
+        entregan las líneas al final: la fusión de costuras necesita todos
+    """
+    import numpy as np
+
+    if isinstance(image, str):
+        image = read_image_bytes(image)
+    source, scale, angle = _prepare_source(reader, image, performance, cancel_token)
+    original = _original_loader(image, angle)
+    options = performance.readtext_options
+
+    if needs_tiling(*source.size):
+        engine = TiledOCREngine(reader, readtext_options=options)
+        lines = []
+        for tile_lines, done, total in engine.iter_tile_lines(source, cancel_token):
+            lines.extend(tile_lines)
+            if done < total:
+                yield [], done, total, angle
+        lines = engine.merge(lines, detail=1, paragraph=False)
+        yield _finish_lines(reader, source, lines, scale, performance, original), total, total, angle
+        return
+
+    if not hasattr(reader, 'recognize'):
+        lines = reader.readtext(np.asarray(source), detail=1, paragraph=False, **options)
+        yield _finish_lines(reader, source, lines, scale, performance, original), 1, 1, angle
+        return
+
+    from easyocr.utils import reformat_input
+
+    img, img_cv_grey = reformat_input(np.asarray(source))
+    horizontal_list, free_list = reader.detect(img, reformat=False)
+    check_cancelled(cancel_token)
+
+    # Orden de lectura: de arriba hacia abajo y de izquierda a derecha
+    boxes = sorted(horizontal_list[0], key=lambda box: (box[2], box[0]))
+    step = max(1, chunk_lines)
+    chunks = [(boxes[i:i + step], []) for i in range(0, len(boxes), step)]
+    if free_list[0]:
+        chunks.append(([], free_list[0]))
+    total = len(boxes) + len(free_list[0])
+    if not chunks:
+        yield [], 0, 0, angle
+        return
+
+    done = 0
+    for horizontal, free in chunks:
+        check_cancelled(cancel_token)
+        lines = reader.recognize(img_cv_grey, horizontal, free, detail=1, paragraph=False,
+                                 reformat=False, **options)
+        done += len(horizontal) + len(free)
+        yield _finish_lines(reader, source, lines, scale, performance, original), done, total, angle
+
+
+def run_readtext(reader, image, performance: PerformanceSettings,
+                 detail: int = 0, paragraph: bool = True) -> list:
+    """
+    Lectura de una imagen con la salida de readtext (ver ocr_lines)
+
+    Args:
+        reader: Lector con readtext
+        image: Ruta o imagen ya decodificada (ndarray RGB o PIL.Image)
+        performance: Parámetros de rendimiento
+        detail: 0 = solo textos, 1 = (caja, texto, confianza)
+        paragraph: Si agrupar las líneas en párrafos
+
+    Returns:
+        Salida equivalente a readtext (cajas en coordenadas originales)
+    """
+    lines, _ = ocr_lines(reader, image, performance)
+    return format_lines(lines, detail, paragraph)
+
+
+def clip_regions(regions: list, width: int, height: int) -> list[tuple[int, int, int, int]]:
+    """
+    Valida y recorta las regiones a los límites de la imagen
+
+    Args:
+        regions: Lista de (izquierda, arriba, derecha, abajo) en píxeles de la imagen
+        width: Ancho de la imagen
+        height: Alto de la imagen
+
+    Returns:
+        Lista de regiones enteras dentro de la imagen
+
+    Raises:
+        ValueError: Si alguna región queda vacía
+    """
+    clipped = []
+    for region in regions:
+        left, top, right, bottom = (int(round(value)) for value in region)
+        left, right = max(0, min(left, right)), min(width, max(left, right))
+        top, bottom = max(0, min(top, bottom)), min(height, max(top, bottom))
+        if right - left < 2 or bottom - top < 2:
+            raise ValueError(f"Región vacía o fuera de la imagen: {tuple(region)}")
+        clipped.append((left, top, right, bottom))
+    return clipped
+
+
+def region_lines(reader, image, regions: list, normalize: bool = True,
+                 readtext_options: Optional[dict] = None,
+                 refine_threshold: float = 0.0,
+                 cancel_token: Optional[CancellationToken] = None) -> list[list]:
+    """
+    Lee solo las regiones indicadas de una imagen, recortando en memoria.
+    La detección y el reconocimiento trabajan sobre cada recorte, por lo que
+    el costo es proporcional al área seleccionada y no al de la imagen
+
+    Args:
+        reader: Lector con readtext
+        image: Ruta o imagen ya decodificada (ndarray RGB o PIL.Image)
+        regions: Lista de (izquierda, arriba, derecha, abajo) en píxeles de la imagen
+        normalize: Si reescalar cada recorte según la altura estimada del texto
+        readtext_options: Argumentos extra de readtext
+        refine_threshold: Confianza bajo la cual una línea se reconoce de
+            nuevo (0 = sin segunda pasada)
+        cancel_token: Token consultado antes de cada región
+
+    Returns:
+        Lista paralela a regions con las líneas (caja, texto, confianza) de
+        cada una, con cajas en coordenadas de la imagen completa
+    """
+    import numpy as np
+
+    options = dict(readtext_options or {})
+    source = as_pil(image)
+    regions = clip_regions(regions, *source.size)
+    crops = [source.crop(region) for region in regions]
+
+    outputs = []
+    for (left, top, _, _), original in zip(regions, crops):
+        check_cancelled(cancel_token)
+        scale = 1.0
+        if normalize:
+            crop, scale = normalize_image(original)
+        else:
+            crop = original.convert('RGB')
+        lines = reader.readtext(np.asarray(crop), detail=1, paragraph=False, **options)
+        # Las líneas dudosas se recortan del recorte original, sin reescalar
+        lines, _ = refine_low_confidence(reader, original, lines, refine_threshold,
+                                         recognize_options=options, scale=scale)
+        outputs.append([
+            ([[x / scale + left, y / scale + top] for x, y in box], text, conf)
+            for box, text, conf in lines
+        ])
+    return outputs
+
+
+def read_regions(reader, image, regions: list, normalize: bool = True,
+                 detail: int = 0, paragraph: bool = True,
+                 readtext_options: Optional[dict] = None,
+                 refine_threshold: float = 0.0,
+                 cancel_token: Optional[CancellationToken] = None) -> list[list]:
+    """
+    Lee solo las regiones indicadas (ver region_lines) con la salida de readtext
+
+    Returns:
+        Lista paralela a regions con la salida de readtext de cada una
+        (con detail=1, cajas en coordenadas de la imagen completa)
+    """
+    return [
+        format_lines(lines, detail, paragraph)
+        for lines in region_lines(reader, image, regions, normalize,
+                                  readtext_options, refine_threshold, cancel_token)
+    ]
+
+
+def failed_result(image: Image, error: Exception) -> ExtractionResult:
+    """Resultado vacío de una imagen que falló dentro de un lote"""
+    return ExtractionResult(text='', confidence=0.0, image_path=image.path, error=str(error) or type(error).__name__)
 
 
 class EasyOCRAdapter(TextExtractionRepository):
     """Implementación de extracción de texto usando EasyOCR"""
     
-    def __init__(self, languages: list[str] = None, gpu: bool = False, detail: int = 0):
+    def __init__(self, languages: list[str] = None, gpu: bool = False, detail: int = 0,
+                 model_dir: Optional[str] = None, recognition_batch_size: int = 32,
+                 performance: Optional[PerformanceSettings] = None):
         """
         Inicializa el adaptador OCR
         
         Args:
-            languages: Lista de idiomas (ej: ['en', 'es'])
+            languages: Lista de idiomas (ej: ['en', 'es']). Si incluye 'auto',
+                cada imagen se enruta según su escritura al lector más pequeño
+                que la cubre; el resto de los idiomas forman el lector latino base
             gpu: Si usar GPU para OCR
             detail: Nivel de detalle (0=mínimo, 1=máximo)
+            model_dir: Directorio de modelos de EasyOCR (None = por defecto)
+            recognition_batch_size: Recortes de línea por pasada del reconocedor
+                en extract_text_batch
+            performance: Parámetros de rendimiento (hilos de torch, batch_size
+                y workers de readtext)
         """
         self.languages = languages or ['en', 'es']
+        # Enrutamiento por escritura: el lector latino base es el de uso habitual
+        self.router = None
+        if AUTO_LANGUAGES in self.languages:
+            self.router = ScriptRouter(self.languages)
+            self.languages = self.router.latin_languages
         self.gpu = gpu
         self.detail = detail
-        self.reader = easyocr.Reader(self.languages, gpu=self.gpu)
+        self.model_dir = model_dir
+        self.recognition_batch_size = recognition_batch_size
+        self.performance = performance or PerformanceSettings()
+        apply_performance_settings(self.performance)
+        # Carga anticipada del lector compartido
+        self.reader
+    
+    @property
+    def reader(self):
+        """
+        Lector compartido con el resto del proceso. Se consulta al registro en
+        cada uso para no retener un lector que el LRU haya desalojado
+        """
+        return self._reader_for(self.languages)
+    
+    def _reader_for(self, languages: list[str]):
+        """Lector del registro para un conjunto de idiomas"""
+        return get_reader_registry().get_reader(
+            languages,
+            gpu=self.gpu,
+            model_dir=self.model_dir,
+            quantize=self.performance.quantized_recognizer
+        )
     
-    def extract_text(self, image: Image) -> ExtractionResult:
+    def _route(self, source) -> list[str]:
+        """
+        Idiomas con los que procesar una imagen (detección de escritura si
+        está activa); source es una ruta o el buffer ya decodificado
+        """
+        if self.router is None:
+            return self.languages
+        return self.router.languages_for(self.reader, source, self._reader_for)
+    
+    def extract_text(self, image: Image, cancel_token: Optional[CancellationToken] = None) -> ExtractionResult:
         """
         Extrae texto de una imagen individual
         
         Args:
             image: Objeto Image con la información de la imagen
+            cancel_token: Token de cancelación (y plazo) consultado entre etapas
             
         Returns:
             ExtractionResult con el texto y confianza
         """
         try:
-            results = self.reader.readtext(
-                image.path,
-                detail=self.detail,
-                paragraph=True
-            )
+            # Con el buffer de la ingesta no se vuelve a leer el archivo
+            source = image.source
+            if isinstance(source, str):
+                source = read_image_bytes(source)
+            languages = self._route(source)
+            lines, angle = ocr_lines(self._reader_for(languages), source, self.performance, cancel_token)
             
             # Combinar todos los textos extraídos
-            extracted_text = '\n'.join(results) if isinstance(results, list) else str(results)
+            extracted_text = '\n'.join(format_lines(lines, detail=0, paragraph=True))
             
             return ExtractionResult(
                 text=extracted_text,
-                confidence=0.95,  # Valor por defecto
-                language=self.languages[0] if self.languages else "English"
+                confidence=aggregate_confidence(lines),
+                image_path=image.path,
+                language=languages[0] if languages else "English",
+                orientation=angle
             )
+        except (OperationCancelled, DeadlineExceeded):
+            raise
         except Exception as e:
             raise RuntimeError(f"Error al extraer texto: {str(e)}")
     
-    def extract_text_batch(self, images: list[Image]) -> list[ExtractionResult]:
+    def extract_text_regions(self, image: Image, regions: list,
+                             cancel_token: Optional[CancellationToken] = None) -> list[ExtractionResult]:
+        """
+        Extrae texto de regiones de una imagen sin escribir archivos temporales
+        
+        Args:
+            image: Objeto Image con la información de la imagen
+            regions: Lista de (izquierda, arriba, derecha, abajo) en píxeles
+            cancel_token: Token consultado antes de cada región
+            
+        Returns:
+            Lista de ExtractionResult, uno por región
+        """
+        try:
+            source = image.source
+            if isinstance(source, str):
+                source = read_image_bytes(source)
+            languages = self._route(source)
+            outputs = region_lines(self._reader_for(languages), source, regions,
+                                   normalize=self.performance.normalize_input,
+                                   readtext_options=self.performance.readtext_options,
+                                   refine_threshold=self.performance.refine_threshold,
+                                   cancel_token=cancel_token)
+        except (OperationCancelled, DeadlineExceeded):
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Error al extraer texto: {str(e)}")
+        
+        return [
+            ExtractionResult(
+                text='\n'.join(format_lines(lines, detail=0, paragraph=True)),
+                confidence=aggregate_confidence(lines),
+                image_path=image.path,
+                language=languages[0] if languages else "English"
+            )
+            for lines in outputs
+        ]
+    
+    def _batch_source(self, reader, source, index: int, orientations: dict, scales: dict):
+        """
+        Decodifica una imagen del lote enderezada y normalizada (una sola vez,
+        desde sus bytes o su buffer); el ángulo detectado y la escala aplicada
+        se guardan por índice en orientations y scales para reutilizarlos
+        """
+        prepared, scales[index], orientations[index] = _prepare_source(reader, source, self.performance)
+        return prepared
+    
+    def _refine_batch_output(self, reader, source, index: int, lines: list,
+                             orientations: dict, scales: dict) -> list:
+        """Segunda pasada de una imagen del lote; solo se decodifica si hay líneas dudosas"""
+        threshold = self.performance.refine_threshold
+        if threshold <= 0 or all(conf >= threshold for _, _, conf in lines):
+            return lines
+        
+        # Original enderezado a resolución completa; las cajas del motor están
+        # en la escala del loader y se llevan al original con scales
+        original = _original_loader(source, orientations.get(index, 0))()
+        lines, _ = refine_low_confidence(reader, original, lines, threshold,
+                                         recognize_options=self.performance.readtext_options,
+                                         scale=scales.get(index, 1.0))
+        return lines
+    
+    def _extract_group(self, languages: list[str], images: list[Image], sources: list,
+                       cancel_token: Optional[CancellationToken] = None) -> list[ExtractionResult]:
+        """
+        Detección por imagen y reconocimiento agrupado entre imágenes con un
+        mismo lector; sources son los bytes o buffers de cada imagen
+        """
+        import numpy as np
+        
+        reader = self._reader_for(languages)
+        orientations = {}
+        scales = {}
+        engine = PooledRecognitionEngine(
+            reader,
+            batch_size=self.recognition_batch_size,
+            paragraph=False,
+            workers=self.performance.recognizer_workers,
+            loader=lambda index: np.asarray(self._batch_source(reader, sources[index], index, orientations, scales))
+        )
+        # Líneas sin agrupar para conservar la confianza de cada una
+        outputs = engine.readtext_batch(list(range(len(images))), detail=1, cancel_token=cancel_token)
+        
+        results = []
+        for index, (image, output) in enumerate(zip(images, outputs)):
+            if isinstance(output, Exception):
+                print(f"Error procesando {image.path}: {output}")
+                results.append(failed_result(image, output))
+                continue
+            check_cancelled(cancel_token)
+            output = self._refine_batch_output(reader, sources[index], index, output, orientations, scales)
+            results.append(ExtractionResult(
+                text='\n'.join(format_lines(output, detail=0, paragraph=True)),
+                confidence=aggregate_confidence(output),
+                image_path=image.path,
+                language=languages[0] if languages else "English",
+                orientation=orientations.get(index, 0)
+            ))
+        return results
+    
+    def extract_text_batch(self, images: list[Image],
+                           cancel_token: Optional[CancellationToken] = None) -> list[ExtractionResult]:
         """
         Extrae texto de múltiples imágenes
         
         Args:
             images: Lista de objetos Image
+            cancel_token: Token consultado entre imágenes y entre lotes del
+                reconocedor
             
         Returns:
-            Lista de ExtractionResult
+            Un ExtractionResult por imagen, en el orden de entrada; las
+            imágenes que fallan llevan texto vacío y el motivo en error
+        
+        Raises:
+            OperationCancelled: Si se cancela el lote
         """
-        results = []
-        for image in images:
+        results = [None] * len(images)
+        
+        # Las imágenes grandes van por mosaicos; el resto comparte el reconocedor.
+        # Con detección de escritura, cada grupo de idiomas comparte su lector
+        large = []
+        groups = {}
+        sources = {}
+        for index, image in enumerate(images):
+            if needs_tiling(image.width, image.height):
+                large.append(index)
+                continue
+            check_cancelled(cancel_token)
             try:
-                result = self.extract_text(image)
-                results.append(result)
+                # Buffer de la ingesta, o los bytes leídos una vez para
+                # enrutar, decodificar y refinar
+                source = image.source
+                if isinstance(source, str):
+                    source = read_image_bytes(source)
+                languages = tuple(self._route(source))
             except Exception as e:
                 print(f"Error procesando {image.path}: {e}")
+                results[index] = failed_result(image, e)
+                continue
+            sources[index] = source
+            groups.setdefault(languages, []).append(index)
+        
+        for languages, indices in groups.items():
+            group_results = self._extract_group(list(languages), [images[index] for index in indices],
+                                                [sources.pop(index) for index in indices], cancel_token)
+            for index, result in zip(indices, group_results):
+                results[index] = result
+        
+        for index in large:
+            try:
+                results[index] = self.extract_text(images[index], cancel_token)
+            except OperationCancelled:
+                raise
+            except Exception as e:
+                print(f"Error procesando {images[index].path}: {e}")
+                results[index] = failed_result(images[index], e)
         
         return results
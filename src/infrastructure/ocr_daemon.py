@@ -0,0 +1,408 @@
+"""
+Demonio OCR local
+Un proceso de larga duración construido sobre ServiceContainer mantiene los
+lectores cargados y atiende extracciones y exportaciones por HTTP/JSON sobre
+un socket Unix o localhost. Un solo hilo despacha el motor: las solicitudes
+que llegan dentro de la ventana de agrupación (pocos milisegundos) se
+reconocen juntas con extract_text_batch. La cola tiene profundidad máxima y
+las solicitudes que no caben se rechazan con 503 en lugar de acumularse.
+
+Uso:
+    python -m src.infrastructure.ocr_daemon [--socket RUTA | --port 8765]
+
+Endpoints:
+    GET  /health   proceso vivo (siempre 200)
+    GET  /ready    200 con el motor cargado y lugar en la cola, si no 503
+    GET  /stats    contadores de solicitudes, rechazos y lotes
+    POST /extract  {"path", "regions"?, "timeout"?}
+    POST /export   {"text", "path", "format"}
+
+Los POST exigen Content-Type application/json y Host 127.0.0.1 o localhost:
+un formulario o fetch "simple" de una página web no puede enviar JSON sin
+una consulta previa (preflight) que el demonio no responde, y un nombre
+DNS reasignado a 127.0.0.1 llega con otro Host. Así una página abierta en
+el navegador no puede pedir extracciones ni escribir archivos vía /export.
+"""
+import argparse
+import json
+import os
+import queue
+import socketserver
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from ..domain.entities import ExtractionResult, PerformanceSettings
+from .daemon_client import DEFAULT_PORT, DEFAULT_SOCKET, DaemonOverloaded
+from .security import SecurityValidator
+
+# Tamaño máximo del cuerpo de una solicitud
+MAX_BODY_BYTES = 10 * 1024 * 1024
+# Nombres de Host aceptados en los POST (el servidor TCP solo escucha en 127.0.0.1)
+ALLOWED_HOSTS = {'127.0.0.1', 'localhost'}
+
+
+def is_local_host(host: Optional[str]) -> bool:
+    """Indica si la cabecera Host nombra al equipo local (con o sin puerto)"""
+    if not host:
+        return False
+    name = host.strip().lower()
+    if name.count(':') == 1:
+        name = name.rsplit(':', 1)[0]
+    return name in ALLOWED_HOSTS
+
+
+def result_to_dict(result: ExtractionResult) -> dict:
+    """Representación JSON de un ExtractionResult"""
+    return {
+        'text': result.text,
+        'confidence': result.confidence,
+        'image_path': result.image_path,
+        'language': result.language,
+        'orientation': result.orientation,
+    }
+
+
+class _Request:
+    """Extracción en cola con el futuro que espera el hilo HTTP"""
+
+    def __init__(self, image, regions: Optional[list]):
+        self.image = image
+        self.regions = regions
+        self.future = Future()
+
+
+class OCRDaemon:
+    """Motor OCR compartido con agrupación de solicitudes y control de admisión"""
+
+    def __init__(self, container=None, performance: Optional[PerformanceSettings] = None):
+        """
+        Args:
+            container: ServiceContainer (None = el contenedor del proceso)
+            performance: Parámetros de rendimiento (None = los de config.json)
+        """
+        if container is None:
+            from ..service_container import get_service_container
+            container = get_service_container()
+        if performance is None:
+            from .configuration_adapter import PerformanceSettingsAdapter
+            performance = PerformanceSettingsAdapter('config.json').get_settings()
+
+        self.container = container
+        self.batch_window = performance.daemon_batch_window_ms / 1000.0
+        self.max_batch = max(1, performance.daemon_max_batch)
+        self._queue = queue.Queue(maxsize=max(1, performance.daemon_max_queue))
+        self._ready = threading.Event()
+        self._stopping = threading.Event()
+        self._started_at = time.monotonic()
+        self._stats_lock = threading.Lock()
+        self.stats = {'requests': 0, 'rejected': 0, 'batches': 0, 'batched_images': 0, 'errors': 0}
+        self.warmup_error = None
+        self.repository = None
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name='ocr-dispatch', daemon=True)
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    def start(self) -> None:
+        """Carga el motor en segundo plano y arranca el despachador"""
+        def warm():
+            try:
+                self.repository = self.container.get('ocr_repository')
+                self.container.warm(['export_text_usecase'])
+                self._ready.set()
+            except Exception as e:
+                self.warmup_error = str(e)
+                print(f"Error cargando el motor OCR del demonio: {e}")
+
+        threading.Thread(target=warm, name='ocr-warmup', daemon=True).start()
+        self._dispatcher.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    @property
+    def overloaded(self) -> bool:
+        return self._queue.full()
+
+    def stats_snapshot(self) -> dict:
+        with self._stats_lock:
+            return dict(self.stats, queue_depth=self.queue_depth)
+
+    def health(self) -> dict:
+        return {
+            'status': 'ok',
+            'ready': self.ready,
+            'queue_depth': self.queue_depth,
+            'queue_limit': self._queue.maxsize,
+            'uptime_seconds': round(time.monotonic() - self._started_at, 1),
+            'pid': os.getpid(),
+            'error': self.warmup_error,
+        }
+
+    def submit(self, image, regions: Optional[list] = None) -> Future:
+        """
+        Encola una extracción
+
+        Raises:
+            DaemonOverloaded: Si la cola está llena
+        """
+        self._count('requests')
+        request = _Request(image, regions)
+        try:
+            self._queue.put_nowait(request)
+        except queue.Full:
+            self._count('rejected')
+            raise DaemonOverloaded(f"Cola llena ({self._queue.maxsize} solicitudes)")
+        return request.future
+
+    def _next_batch(self) -> list[_Request]:
+        """Toma una solicitud y junta las que lleguen dentro de la ventana"""
+        try:
+            batch = [self._queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _dispatch_loop(self) -> None:
+        self._ready.wait()
+        while not self._stopping.is_set():
+            batch = [request for request in self._next_batch() if request.future.set_running_or_notify_cancel()]
+            if batch:
+                self._run_batch(batch)
+
+    def _run_batch(self, batch: list[_Request]) -> None:
+        """Reconoce un lote: las regiones van de a una, el resto en un solo llamado"""
+        whole = [request for request in batch if not request.regions]
+        for request in batch:
+            if request.regions:
+                self._resolve(request, lambda r=request: self.repository.extract_text_regions(r.image, r.regions))
+
+        if len(whole) == 1:
+            self._resolve(whole[0], lambda: self.repository.extract_text(whole[0].image))
+        elif whole:
+            self._count('batches')
+            self._count('batched_images', len(whole))
+            try:
+                results = self.repository.extract_text_batch([request.image for request in whole])
+            except Exception as e:
+                self._count('errors')
+                for request in whole:
+                    request.future.set_exception(e)
+                return
+            # Un resultado por imagen y en el mismo orden que el lote
+            for request, result in zip(whole, results):
+                if result.error is None:
+                    request.future.set_result(result)
+                else:
+                    self._count('errors')
+                    request.future.set_exception(RuntimeError(f"No se pudo extraer {request.image.path}: {result.error}"))
+
+    def _resolve(self, request: _Request, work) -> None:
+        try:
+            request.future.set_result(work())
+        except Exception as e:
+            self._count('errors')
+            request.future.set_exception(e)
+
+    def extract(self, payload: dict) -> dict:
+        """
+        Atiende POST /extract desde un hilo HTTP (decodifica aquí, reconoce en el despachador)
+
+        Raises:
+            ValueError: Si la ruta o las regiones no son válidas
+            DaemonOverloaded: Si la cola está llena
+            TimeoutError: Si vence el plazo de la solicitud
+        """
+        from .ingestion import ingest_image
+
+        regions = payload.get('regions')
+        if regions is not None:
+            regions = [tuple(int(value) for value in region) for region in regions]
+            if any(len(region) != 4 for region in regions):
+                raise ValueError("Cada región debe ser (izquierda, arriba, derecha, abajo)")
+        if self.overloaded:
+            # Rechazo temprano: no vale la pena decodificar una imagen que no entra
+            self._count('requests')
+            self._count('rejected')
+            raise DaemonOverloaded(f"Cola llena ({self._queue.maxsize} solicitudes)")
+
+        image = ingest_image(str(payload.get('path', '')))
+        future = self.submit(image, regions)
+        timeout = payload.get('timeout')
+        try:
+            result = future.result(timeout=float(timeout) if timeout else None)
+        except FutureTimeout:
+            future.cancel()
+            raise TimeoutError("Tiempo agotado esperando el motor OCR")
+        if regions:
+            return {'regions': [result_to_dict(item) for item in result]}
+        return result_to_dict(result)
+
+    def export(self, payload: dict) -> dict:
+        """
+        Atiende POST /export (no usa el motor: corre en el hilo HTTP)
+
+        Raises:
+            ValueError: Si el formato, la ruta o el texto no son válidos
+        """
+        from ..application.export_usecase import ExportFormat
+
+        format = ExportFormat(str(payload.get('format', '')).lower())
+        path = str(payload.get('path', ''))
+        is_valid, error = SecurityValidator.validate_export_path(path, f".{format.value}")
+        if not is_valid:
+            raise ValueError(f"Ruta de exportación inválida: {error}")
+        return {'ok': self.container.get('export_text_usecase').execute(str(payload.get('text', '')), path, format)}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = 'ExtractorOCR/1.0'
+    protocol_version = 'HTTP/1.1'
+
+    @property
+    def ocr(self) -> OCRDaemon:
+        return self.server.ocr_daemon
+
+    def log_message(self, format, *args):
+        # Sin registro por solicitud (el socket Unix no tiene dirección de cliente)
+        pass
+
+    def _reply(self, status: int, payload: dict, headers: Optional[dict] = None) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._reply(200, self.ocr.health())
+        elif self.path == '/ready':
+            if not self.ocr.ready:
+                self._reply(503, {'ready': False, 'reason': 'warming', 'error': self.ocr.warmup_error})
+            elif self.ocr.overloaded:
+                self._reply(503, {'ready': False, 'reason': 'overloaded'}, {'Retry-After': '1'})
+            else:
+                self._reply(200, {'ready': True})
+        elif self.path == '/stats':
+            self._reply(200, self.ocr.stats_snapshot())
+        else:
+            self._reply(404, {'error': f"Ruta no encontrada: {self.path}"})
+
+    def do_POST(self):
+        handlers = {'/extract': self.ocr.extract, '/export': self.ocr.export}
+        if self.path not in handlers:
+            self._reply(404, {'error': f"Ruta no encontrada: {self.path}"})
+            return
+        # Defensa contra solicitudes cruzadas desde el navegador (ver docstring del módulo)
+        # (el cuerpo no se lee: se cierra la conexión en lugar de reutilizarla)
+        if not is_local_host(self.headers.get('Host')):
+            self.close_connection = True
+            self._reply(403, {'error': "Host no permitido"})
+            return
+        content_type = self.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type != 'application/json':
+            self.close_connection = True
+            self._reply(415, {'error': "Se requiere Content-Type: application/json"})
+            return
+        if not self.ocr.ready:
+            self._reply(503, {'error': "El motor OCR aún se está cargando", 'reason': 'warming'},
+                        {'Retry-After': '2'})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            if length > MAX_BODY_BYTES:
+                raise ValueError("Solicitud demasiado grande")
+            payload = json.loads(self.rfile.read(length).decode('utf-8') or '{}')
+            self._reply(200, handlers[self.path](payload))
+        except DaemonOverloaded as e:
+            self._reply(503, {'error': str(e), 'reason': 'overloaded'}, {'Retry-After': '1'})
+        except TimeoutError as e:
+            self._reply(504, {'error': str(e)})
+        except ValueError as e:
+            self._reply(400, {'error': str(e)})
+        except Exception as e:
+            self._reply(500, {'error': str(e)})
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Servidor HTTP sobre un socket Unix (solo accesible por el usuario)"""
+    daemon_threads = True
+
+    def server_bind(self):
+        # Un socket que quedó de una ejecución anterior impide el bind
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+        super().server_bind()
+        os.chmod(self.server_address, 0o600)
+
+    def get_request(self):
+        request, _ = super().get_request()
+        # BaseHTTPRequestHandler espera una dirección (host, puerto)
+        return request, ('local', 0)
+
+
+def serve(daemon: OCRDaemon, socket_path: Optional[str] = None, port: Optional[int] = None) -> None:
+    """
+    Atiende solicitudes hasta Ctrl+C
+
+    Args:
+        daemon: Demonio ya construido (se arranca aquí)
+        socket_path: Socket Unix (None = DEFAULT_SOCKET)
+        port: Puerto localhost; si se indica se usa TCP (solo 127.0.0.1)
+    """
+    if port is None and not hasattr(socketserver, 'UnixStreamServer'):
+        port = DEFAULT_PORT
+    if port is not None:
+        server = ThreadingHTTPServer(('127.0.0.1', port), _Handler)
+        address = f"http://127.0.0.1:{port}"
+    else:
+        socket_path = socket_path or DEFAULT_SOCKET
+        server = _UnixHTTPServer(socket_path, _Handler)
+        address = socket_path
+    server.ocr_daemon = daemon
+    daemon.start()
+    print(f"Demonio OCR escuchando en {address}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.stop()
+        server.server_close()
+        if port is None and os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Demonio OCR local")
+    parser.add_argument("--socket", default=None, help=f"Socket Unix (por defecto {DEFAULT_SOCKET})")
+    parser.add_argument("--port", type=int, default=None, help="Puerto localhost en lugar del socket")
+    args = parser.parse_args()
+    serve(OCRDaemon(), socket_path=args.socket, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
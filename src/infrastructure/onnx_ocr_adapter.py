@@ -0,0 +1,336 @@
+"""
+Adaptador OCR con ONNX Runtime - Ejecuta el detector CRAFT y el reconocedor
+de EasyOCR exportados a ONNX sobre el proveedor de CPU
+"""
+import json
+import math
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from ..domain.entities import ExtractionResult, Image, PerformanceSettings
+from ..domain.cancellation import CancellationToken, DeadlineExceeded, OperationCancelled, check_cancelled
+from ..domain.repositories import TextExtractionRepository
+
+# Altura de entrada del reconocedor de EasyOCR
+RECOGNIZER_HEIGHT = 64
+
+DEFAULT_ONNX_DIR = Path.home() / '.EasyOCR' / 'onnx'
+
+
+def _model_stem(languages: list[str]) -> str:
+    return f"recognizer_{'-'.join(sorted(languages))}"
+
+
+def onnx_model_paths(languages: list[str], onnx_dir: Optional[str] = None) -> dict:
+    """Rutas de los modelos ONNX y metadatos para un conjunto de idiomas"""
+    directory = Path(onnx_dir) if onnx_dir else DEFAULT_ONNX_DIR
+    stem = _model_stem(languages)
+    return {
+        'detector': directory / 'craft_detector.onnx',
+        'recognizer': directory / f'{stem}.onnx',
+        'metadata': directory / f'{stem}.json',
+    }
+
+
+def export_onnx_models(languages: list[str], onnx_dir: Optional[str] = None,
+                       model_dir: Optional[str] = None) -> dict:
+    """
+    Exporta el detector y el reconocedor de EasyOCR a ONNX (solo si faltan)
+
+    Args:
+        languages: Idiomas del reconocedor
+        onnx_dir: Directorio destino de los modelos ONNX
+        model_dir: Directorio de modelos de EasyOCR
+
+    Returns:
+        Diccionario con las rutas de los archivos exportados
+    """
+    paths = onnx_model_paths(languages, onnx_dir)
+    if all(path.exists() for path in paths.values()):
+        return paths
+
+    import easyocr
+    import torch
+
+    kwargs = {'gpu': False, 'quantize': False}
+    if model_dir:
+        kwargs['model_storage_directory'] = model_dir
+    # Modelo float: los módulos cuantizados no se exportan a ONNX
+    reader = easyocr.Reader(list(languages), **kwargs)
+    paths['detector'].parent.mkdir(parents=True, exist_ok=True)
+
+    if not paths['detector'].exists():
+        detector = reader.detector.eval()
+        dummy = torch.randn(1, 3, 640, 640)
+        torch.onnx.export(
+            detector, dummy, str(paths['detector']),
+            input_names=['input'], output_names=['scores', 'features'],
+            dynamic_axes={'input': {0: 'batch', 2: 'height', 3: 'width'},
+                          'scores': {0: 'batch', 1: 'height', 2: 'width'}},
+            opset_version=17
+        )
+
+    class _RecognizerWrapper(torch.nn.Module):
+        """El reconocedor CTC ignora el argumento de texto"""
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, image):
+            return self.model(image, None)
+
+    recognizer = _RecognizerWrapper(reader.recognizer.eval())
+    dummy = torch.randn(2, 1, RECOGNIZER_HEIGHT, 256)
+    torch.onnx.export(
+        recognizer, dummy, str(paths['recognizer']),
+        input_names=['input'], output_names=['logits'],
+        dynamic_axes={'input': {0: 'batch', 3: 'width'}, 'logits': {0: 'batch', 1: 'steps'}},
+        opset_version=17
+    )
+
+    with open(paths['metadata'], 'w', encoding='utf-8') as f:
+        json.dump({
+            'languages': list(languages),
+            'character': reader.character,
+            'lang_char': reader.lang_char,
+        }, f, ensure_ascii=False)
+
+    return paths
+
+
+class OnnxOCRAdapter(TextExtractionRepository):
+    """Implementación de extracción de texto con modelos EasyOCR en ONNX Runtime"""
+
+    def __init__(self, languages: list[str] = None, detail: int = 0,
+                 onnx_dir: Optional[str] = None, model_dir: Optional[str] = None,
+                 performance: Optional[PerformanceSettings] = None, paragraph: bool = True):
+        """
+        Inicializa el adaptador (exporta los modelos la primera vez)
+
+        Args:
+            languages: Lista de idiomas (ej: ['en', 'es'])
+            detail: Nivel de detalle (0=mínimo, 1=máximo)
+            onnx_dir: Directorio de los modelos ONNX
+            model_dir: Directorio de modelos de EasyOCR (para la exportación)
+            performance: Parámetros de rendimiento (hilos intra-op)
+            paragraph: Si agrupar las líneas en párrafos
+        """
+        import onnxruntime as ort
+
+        self.languages = languages or ['en', 'es']
+        self.detail = detail
+        self.paragraph = paragraph
+        self.performance = performance or PerformanceSettings()
+
+        paths = export_onnx_models(self.languages, onnx_dir, model_dir)
+        with open(paths['metadata'], 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+        self.character = metadata['character']
+        # Índice 0 = blank de CTC
+        self._labels = np.array(['[blank]'] + list(self.character))
+        self._ignore_idx = [
+            self.character.index(char) + 1
+            for char in set(self.character) - set(metadata['lang_char'])
+        ]
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        threads = self.performance.torch_threads * self.performance.process_workers
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        providers = ['CPUExecutionProvider']
+        self.detector = ort.InferenceSession(str(paths['detector']), options, providers=providers)
+        self.recognizer = ort.InferenceSession(str(paths['recognizer']), options, providers=providers)
+
+    def detect(self, img, canvas_size: int = 2560, mag_ratio: float = 1.0,
+               text_threshold: float = 0.7, link_threshold: float = 0.4,
+               low_text: float = 0.4, min_size: int = 20) -> tuple[list, list]:
+        """Detecta cajas de texto (equivalente a Reader.detect con una imagen)"""
+        import cv2
+        from easyocr.imgproc import resize_aspect_ratio, normalizeMeanVariance
+        from easyocr.craft_utils import getDetBoxes, adjustResultCoordinates
+        from easyocr.utils import group_text_box, diff
+
+        img_resized, target_ratio, _ = resize_aspect_ratio(
+            img, canvas_size, interpolation=cv2.INTER_LINEAR, mag_ratio=mag_ratio
+        )
+        ratio = 1 / target_ratio
+        x = np.transpose(normalizeMeanVariance(img_resized), (2, 0, 1))[np.newaxis].astype(np.float32)
+        scores = self.detector.run(['scores'], {'input': x})[0]
+
+        boxes, polys, _ = getDetBoxes(
+            scores[0, :, :, 0], scores[0, :, :, 1],
+            text_threshold, link_threshold, low_text, False, False
+        )
+        boxes = adjustResultCoordinates(boxes, ratio, ratio)
+        polys = adjustResultCoordinates(polys, ratio, ratio)
+        text_boxes = [
+            np.array(poly if poly is not None else box).astype(np.int32).reshape(-1)
+            for box, poly in zip(boxes, polys)
+        ]
+
+        horizontal_list, free_list = group_text_box(text_boxes, 0.1, 0.5, 0.5, 0.5, 0.1, True)
+        if min_size:
+            horizontal_list = [i for i in horizontal_list if max(i[1] - i[0], i[3] - i[2]) > min_size]
+            free_list = [i for i in free_list
+                         if max(diff([c[0] for c in i]), diff([c[1] for c in i])) > min_size]
+        return horizontal_list, free_list
+
+    def _predict(self, crops: list, adjust_contrast: float = 0.0) -> list[tuple[str, float]]:
+        """Reconoce un lote de recortes (ya escalados a la altura del modelo)"""
+        from PIL import Image as PILImage
+        from easyocr.recognition import AlignCollate
+
+        max_width = max(math.ceil(crop.shape[1] / crop.shape[0]) * RECOGNIZER_HEIGHT for crop in crops)
+        collate = AlignCollate(imgH=RECOGNIZER_HEIGHT, imgW=int(max_width),
+                               keep_ratio_with_pad=True, adjust_contrast=adjust_contrast)
+        batch = collate([PILImage.fromarray(crop, 'L') for crop in crops]).numpy()
+        logits = self.recognizer.run(['logits'], {'input': batch})[0]
+
+        # Softmax y descarte de caracteres fuera de los idiomas (igual que EasyOCR)
+        logits = logits - logits.max(axis=2, keepdims=True)
+        probs = np.exp(logits)
+        probs[:, :, self._ignore_idx] = 0.0
+        probs /= probs.sum(axis=2, keepdims=True)
+
+        results = []
+        for sequence in probs:
+            indices = sequence.argmax(axis=1)
+            keep = np.insert(indices[1:] != indices[:-1], 0, True) & (indices != 0)
+            text = ''.join(self._labels[indices[keep]])
+            max_probs = sequence.max(axis=1)[indices != 0]
+            confidence = float(max_probs.prod() ** (2.0 / np.sqrt(len(max_probs)))) if len(max_probs) else 0.0
+            results.append((text, confidence))
+        return results
+
+    def readtext(self, image, detail: int = 0, paragraph: bool = True,
+                 contrast_ths: float = 0.1, adjust_contrast: float = 0.5) -> list:
+        """Equivalente a Reader.readtext con los parámetros por defecto"""
+        from easyocr.utils import reformat_input, get_image_list, get_paragraph
+
+        img, img_cv_grey = reformat_input(image)
+        horizontal_list, free_list = self.detect(img)
+        image_list, _ = get_image_list(horizontal_list, free_list, img_cv_grey,
+                                       model_height=RECOGNIZER_HEIGHT, sort_output=False)
+        if not image_list:
+            return []
+
+        batch_size = max(1, self.performance.batch_size)
+        predictions = []
+        for start in range(0, len(image_list), batch_size):
+            chunk = [crop for _, crop in image_list[start:start + batch_size]]
+            predictions.extend(self._predict(chunk))
+
+        # Segunda pasada con contraste ajustado para las líneas dudosas
+        low = [i for i, (_, conf) in enumerate(predictions) if conf < contrast_ths]
+        if low:
+            retried = self._predict([image_list[i][1] for i in low], adjust_contrast)
+            for i, candidate in zip(low, retried):
+                if candidate[1] > predictions[i][1]:
+                    predictions[i] = candidate
+
+        result = [(box, text, conf) for (box, _), (text, conf) in zip(image_list, predictions)]
+        if paragraph:
+            result = get_paragraph(result, x_ths=1.0, y_ths=0.5)
+        if detail == 0:
+            return [item[1] for item in result]
+        return result
+
+    def extract_text(self, image: Image, cancel_token: Optional[CancellationToken] = None) -> ExtractionResult:
+        """
+        Extrae texto de una imagen individual
+
+        Args:
+            image: Objeto Image con la información de la imagen
+            cancel_token: Token de cancelación (y plazo), consultado antes y
+                después de readtext
+
+        Returns:
+            ExtractionResult con el texto y la confianza media de las líneas
+        """
+        check_cancelled(cancel_token)
+        try:
+            lines = self.readtext(image.source, detail=1, paragraph=False)
+            check_cancelled(cancel_token)
+            confidence = sum(conf for _, _, conf in lines) / len(lines) if lines else 0.0
+            if self.paragraph:
+                from easyocr.utils import get_paragraph
+                lines = get_paragraph(lines, x_ths=1.0, y_ths=0.5)
+
+            return ExtractionResult(
+                text='\n'.join(item[1] for item in lines),
+                confidence=confidence,
+                image_path=image.path,
+                language=self.languages[0] if self.languages else "English"
+            )
+        except (OperationCancelled, DeadlineExceeded):
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Error al extraer texto: {str(e)}")
+
+    def extract_text_regions(self, image: Image, regions: list,
+                             cancel_token: Optional[CancellationToken] = None) -> list[ExtractionResult]:
+        """
+        Extrae texto de regiones de una imagen (recortes en memoria)
+
+        Args:
+            image: Objeto Image con la información de la imagen
+            regions: Lista de (izquierda, arriba, derecha, abajo) en píxeles
+            cancel_token: Token consultado antes de cada región
+
+        Returns:
+            Lista de ExtractionResult, uno por región
+        """
+        from .ocr_adapter import read_regions
+
+        try:
+            outputs = read_regions(self, image.source, regions,
+                                   normalize=self.performance.normalize_input,
+                                   detail=1, paragraph=False, cancel_token=cancel_token)
+        except (OperationCancelled, DeadlineExceeded):
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Error al extraer texto: {str(e)}")
+
+        results = []
+        for lines in outputs:
+            confidence = sum(conf for _, _, conf in lines) / len(lines) if lines else 0.0
+            if self.paragraph:
+                from easyocr.utils import get_paragraph
+                lines = get_paragraph(lines, x_ths=1.0, y_ths=0.5)
+            results.append(ExtractionResult(
+                text='\n'.join(item[1] for item in lines),
+                confidence=confidence,
+                image_path=image.path,
+                language=self.languages[0] if self.languages else "English"
+            ))
+        return results
+
+    def extract_text_batch(self, images: list[Image],
+                           cancel_token: Optional[CancellationToken] = None) -> list[ExtractionResult]:
+        """
+        Extrae texto de múltiples imágenes
+
+        Args:
+            images: Lista de objetos Image
+            cancel_token: Token consultado entre imágenes
+
+        Returns:
+            Un ExtractionResult por imagen, en el orden de entrada (las
+            fallidas con texto vacío y el motivo en error)
+        """
+        from .ocr_adapter import failed_result
+
+        results = []
+        for image in images:
+            try:
+                results.append(self.extract_text(image, cancel_token))
+            except OperationCancelled:
+                raise
+            except Exception as e:
+                print(f"Error procesando {image.path}: {e}")
+                results.append(failed_result(image, e))
+
+        return results
@@ -0,0 +1,250 @@
+"""
+Detección de casi duplicados por hash perceptual
+Capturas que solo difieren por el cursor o por una recompresión tienen bytes
+distintos (la caché exacta no acierta) pero un dHash casi igual. El índice
+usa hashing multi-índice: los 64 bits se parten en radio + 1 trozos y, por el
+principio del palomar, todo hash a distancia de Hamming <= radio coincide
+exactamente en al menos un trozo; solo esos candidatos se comparan, así la
+búsqueda no recorre el índice aunque crezca a cientos de miles de entradas.
+Un dHash de 64 bits (y el de cada celda de una grilla 2x2) es demasiado
+grueso para asegurar que el texto es el mismo: solo elige candidatos. Antes
+de reutilizar un resultado se compara píxel a píxel una miniatura en gris de
+THUMBNAIL_SIDE guardada con la firma; se aceptan solo diferencias del tamaño
+de un cursor y el ruido de una recompresión. Un cambio de ese tamaño (un
+carácter chico) puede pasar igual, por eso la reutilización está desactivada
+por defecto (near_duplicate_distance = 0).
+"""
+import struct
+import threading
+import zlib
+from typing import Any, Optional
+
+from .preprocessing import grey_proxy
+
+# Bits de un dHash de 8x8
+HASH_BITS = 64
+# Lado de la copia en gris de la que salen los hashes
+HASH_SIDE = 256
+# Celdas por lado de la grilla de verificación
+VERIFY_GRID = 2
+# Lado de la miniatura en gris guardada para confirmar un candidato
+THUMBNAIL_SIDE = 512
+# Diferencia de gris a partir de la cual un píxel de la miniatura cambió
+PIXEL_STEP = 40
+# Fracción máxima de píxeles cambiados (del orden de un cursor a esta escala)
+MAX_CHANGED_FRACTION = 0.0005
+_THUMBNAIL_HEADER = struct.Struct('>HH')
+
+
+def hamming(a: int, b: int) -> int:
+    """Distancia de Hamming entre dos hashes"""
+    return (a ^ b).bit_count()
+
+
+def _dhash_of(gray) -> int:
+    """dHash de 64 bits de una PIL.Image en gris (gradiente horizontal en 9x8)"""
+    from PIL import Image as PILImage
+
+    pixels = list(gray.resize((9, 8), PILImage.Resampling.BILINEAR).getdata())
+    value = 0
+    for row in range(8):
+        for column in range(8):
+            value = (value << 1) | (pixels[row * 9 + column] > pixels[row * 9 + column + 1])
+    return value
+
+
+def same_content(thumbnail: bytes, other: bytes) -> bool:
+    """
+    Compara dos miniaturas de image_signature píxel a píxel
+
+    Returns:
+        True si tienen el mismo tamaño y a lo sumo MAX_CHANGED_FRACTION de
+        los píxeles difiere en más de PIXEL_STEP niveles de gris
+    """
+    import numpy as np
+
+    size = _THUMBNAIL_HEADER.unpack_from(thumbnail)
+    if size != _THUMBNAIL_HEADER.unpack_from(other):
+        return False
+    width, height = size
+    pixels = np.frombuffer(zlib.decompress(thumbnail[_THUMBNAIL_HEADER.size:]), dtype=np.uint8)
+    stored = np.frombuffer(zlib.decompress(other[_THUMBNAIL_HEADER.size:]), dtype=np.uint8)
+    changed = np.count_nonzero(np.abs(pixels.astype(np.int16) - stored) > PIXEL_STEP)
+    return changed <= MAX_CHANGED_FRACTION * width * height
+
+
+def image_signature(source) -> tuple[int, list[int], bytes]:
+    """
+    Hash perceptual de la imagen completa y de cada celda de la grilla, más
+    la miniatura con la que se confirma un candidato
+
+    Args:
+        source: Ruta, bytes del archivo, ndarray o PIL.Image
+
+    Returns:
+        Tupla (dHash global, dHash por celda en orden de lectura, miniatura
+        en gris comprimida)
+    """
+    proxy, _ = grey_proxy(source, THUMBNAIL_SIDE)
+    thumbnail = _THUMBNAIL_HEADER.pack(*proxy.size) + zlib.compress(proxy.tobytes())
+    proxy.thumbnail((HASH_SIDE, HASH_SIDE))
+    width, height = proxy.size
+    cells = []
+    for row in range(VERIFY_GRID):
+        for column in range(VERIFY_GRID):
+            box = (column * width // VERIFY_GRID, row * height // VERIFY_GRID,
+                   (column + 1) * width // VERIFY_GRID, (row + 1) * height // VERIFY_GRID)
+            cells.append(_dhash_of(proxy.crop(box)))
+    return _dhash_of(proxy), cells, thumbnail
+
+
+class MultiIndexHash:
+    """Búsqueda por radio de Hamming con hashing multi-índice"""
+
+    def __init__(self, radius: int, bits: int = HASH_BITS):
+        """
+        Args:
+            radius: Radio máximo de búsqueda (fija la cantidad de trozos)
+            bits: Bits de los hashes
+        """
+        self.radius = max(0, radius)
+        chunks = min(bits, self.radius + 1)
+        widths = [bits // chunks + (1 if i < bits % chunks else 0) for i in range(chunks)]
+        self._chunks = []
+        shift = bits
+        for width in widths:
+            shift -= width
+            self._chunks.append((shift, (1 << width) - 1))
+        self._tables = [{} for _ in self._chunks]
+        self._hashes = []
+        self._values = []
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def add(self, value_hash: int, value: Any) -> None:
+        """Agrega un hash con su valor asociado"""
+        index = len(self._hashes)
+        self._hashes.append(value_hash)
+        self._values.append(value)
+        for table, (shift, mask) in zip(self._tables, self._chunks):
+            table.setdefault((value_hash >> shift) & mask, []).append(index)
+
+    def search(self, value_hash: int, radius: Optional[int] = None) -> list[tuple[int, Any]]:
+        """
+        Entradas a distancia <= radio, de la más cercana a la más lejana
+
+        Args:
+            value_hash: Hash buscado
+            radius: Radio (None o mayor que el del índice = el del índice)
+        """
+        radius = self.radius if radius is None else min(radius, self.radius)
+        candidates = set()
+        for table, (shift, mask) in zip(self._tables, self._chunks):
+            candidates.update(table.get((value_hash >> shift) & mask, ()))
+        matches = []
+        for index in candidates:
+            distance = hamming(value_hash, self._hashes[index])
+            if distance <= radius:
+                matches.append((distance, self._values[index]))
+        matches.sort(key=lambda match: match[0])
+        return matches
+
+
+class NearDuplicateIndex:
+    """Índice persistente de imágenes ya extraídas para reutilizar su resultado"""
+
+    def __init__(self, result_cache, radius: int = 4, verify: bool = True):
+        """
+        Args:
+            result_cache: ResultCache donde viven los resultados y las firmas
+            radius: Distancia de Hamming máxima del dHash global
+            verify: Si exigir además que cada celda de la grilla esté dentro
+                del mismo radio (filtro barato previo a comparar miniaturas,
+                que se hace siempre)
+        """
+        self.result_cache = result_cache
+        self.radius = radius
+        self.verify = verify
+        self._index = None
+        self._cells = {}
+        self._lock = threading.Lock()
+        self.reused = 0
+        self.rejected = 0
+
+    def _loaded(self) -> MultiIndexHash:
+        """Carga las firmas guardadas la primera vez que se usa el índice"""
+        with self._lock:
+            if self._index is None:
+                index = MultiIndexHash(self.radius)
+                for digest, value_hash, cells in self.result_cache.perceptual_rows():
+                    index.add(value_hash, digest)
+                    self._cells[digest] = cells
+                self._index = index
+            return self._index
+
+    def __len__(self) -> int:
+        return len(self._loaded())
+
+    @staticmethod
+    def signature(source) -> tuple[int, list[int], bytes]:
+        """Firma perceptual de una imagen (ver image_signature)"""
+        return image_signature(source)
+
+    def find(self, signature: tuple[int, list[int], bytes], params: dict) -> Optional[tuple[Any, int]]:
+        """
+        Resultado guardado de la imagen parecida más cercana
+
+        Args:
+            signature: Firma de image_signature
+            params: Parámetros del motor (los mismos de la caché exacta)
+
+        Returns:
+            (valor guardado, distancia) o None si no hay un casi duplicado
+            confirmado por su miniatura con resultado para esos parámetros
+        """
+        value_hash, cells, thumbnail = signature
+        for distance, digest in self._loaded().search(value_hash):
+            if self.verify:
+                stored = self._cells.get(digest)
+                if not stored or any(hamming(a, b) > self.radius for a, b in zip(cells, stored)):
+                    self.rejected += 1
+                    continue
+            # Confirmación de contenido: las firmas sin miniatura no se reutilizan
+            stored_thumbnail = self.result_cache.perceptual_thumbnail(digest)
+            if stored_thumbnail is None or not same_content(thumbnail, stored_thumbnail):
+                self.rejected += 1
+                continue
+            cached = self.result_cache.get(self.result_cache.key(digest, params))
+            if cached is not None:
+                self.reused += 1
+                return cached, distance
+        return None
+
+    def add(self, digest: str, signature: tuple[int, list[int], bytes]) -> None:
+        """Registra la firma de una imagen extraída (una vez por contenido)"""
+        value_hash, cells, thumbnail = signature
+        index = self._loaded()
+        with self._lock:
+            if digest in self._cells:
+                return
+            self._cells[digest] = cells
+            index.add(value_hash, digest)
+        self.result_cache.add_perceptual(digest, value_hash, cells, thumbnail)
+
+
+# Instancia única por proceso (sobre la caché del proceso)
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_near_duplicate_index(result_cache, performance) -> Optional[NearDuplicateIndex]:
+    """Índice de casi duplicados, o None sin caché o con near_duplicate_distance = 0"""
+    global _index
+    if result_cache is None or performance.near_duplicate_distance <= 0:
+        return None
+    with _index_lock:
+        if _index is None or _index.result_cache is not result_cache:
+            _index = NearDuplicateIndex(result_cache, performance.near_duplicate_distance,
+                                        performance.near_duplicate_verify)
+        return _index
@@ -0,0 +1,191 @@
+"""
+Ajuste automático de hilos y workers para OCR en CPU
+Prueba combinaciones de procesos, hilos de torch y argumentos de readtext
+(batch_size/workers) sobre una carga sintética y guarda la mejor en la
+configuración de la aplicación.
+
+Uso:
+    python -m src.infrastructure.performance_tuner --config config.json
+"""
+import argparse
+import os
+import random
+import string
+import tempfile
+import time
+from dataclasses import replace
+from datetime import datetime
+from typing import Optional
+
+from ..domain.entities import PerformanceSettings
+from .configuration_adapter import PerformanceSettingsAdapter
+from .process_pool_engine import ProcessPoolOCREngine, available_cpus, cgroup_cpu_quota
+from .reader_registry import get_reader_registry
+
+# Campos que mide el ajuste; los demás parámetros guardados no se tocan
+TUNED_FIELDS = ('process_workers', 'torch_threads', 'batch_size', 'recognizer_workers')
+
+_applied_torch_threads = None
+
+
+def apply_performance_settings(settings: PerformanceSettings) -> None:
+    """
+    Aplica los hilos de torch configurados al proceso actual y el presupuesto
+    de memoria del registro de lectores.
+    Un lector en proceso único usa el presupuesto completo (hilos x workers)
+    """
+    global _applied_torch_threads
+
+    budget = settings.reader_memory_budget_mb * 1024 * 1024 or None
+    registry = get_reader_registry()
+    if registry.memory_budget != budget:
+        registry.set_memory_budget(budget)
+
+    threads = settings.torch_threads * settings.process_workers
+    if threads <= 0 or _applied_torch_threads == threads:
+        return
+
+    try:
+        import torch
+        torch.set_num_threads(threads)
+        _applied_torch_threads = threads
+    except ImportError:
+        pass
+
+
+def candidate_settings(cpus: int) -> list[PerformanceSettings]:
+    """Combinaciones a evaluar: workers x hilos = CPUs disponibles"""
+    worker_options = sorted({w for w in (1, 2, 4, cpus // 2, cpus) if 1 <= w <= cpus})
+    candidates = []
+    for workers in worker_options:
+        threads = max(1, cpus // workers)
+        for batch_size in (1, 8, 32):
+            for recognizer_workers in (0, 1):
+                candidates.append(PerformanceSettings(
+                    process_workers=workers,
+                    torch_threads=threads,
+                    batch_size=batch_size,
+                    recognizer_workers=recognizer_workers
+                ))
+    return candidates
+
+
+def write_synthetic_workload(directory: str, count: int = 16, seed: int = 0) -> list[str]:
+    """Genera capturas sintéticas con texto y retorna sus rutas"""
+    from PIL import Image, ImageDraw, ImageFont
+
+    rng = random.Random(seed)
+    try:
+        font = ImageFont.truetype("DejaVuSans.ttf", 22)
+    except OSError:
+        font = ImageFont.load_default()
+
+    paths = []
+    for i in range(count):
+        image = Image.new("RGB", (800, 240), "white")
+        draw = ImageDraw.Draw(image)
+        for line in range(4):
+            words = [
+                ''.join(rng.choice(string.ascii_letters) for _ in range(rng.randint(3, 9)))
+                for _ in range(rng.randint(3, 6))
+            ]
+            draw.text((20, 20 + line * 52), ' '.join(words), fill="black", font=font)
+        path = os.path.join(directory, f"tuning_{i:03d}.png")
+        image.save(path)
+        paths.append(path)
+    return paths
+
+
+class PerformanceTuner:
+    """Evalúa combinaciones de parámetros y elige la de mayor rendimiento"""
+
+    def __init__(self, languages: list[str] = None, cpus: Optional[int] = None, images: int = 16):
+        """
+        Args:
+            languages: Idiomas del lector a evaluar
+            cpus: CPUs a repartir (None = afinidad y cuota del cgroup)
+            images: Tamaño de la carga sintética
+        """
+        self.languages = languages or ['en', 'es']
+        self.cpus = cpus or available_cpus()
+        self.images = images
+
+    def run(self, verbose: bool = True) -> tuple[PerformanceSettings, list]:
+        """
+        Ejecuta el ajuste
+
+        Returns:
+            Tupla (mejores parámetros, lista de (parámetros, imágenes/s))
+        """
+        measurements = []
+        candidates = candidate_settings(self.cpus)
+
+        with tempfile.TemporaryDirectory() as directory:
+            paths = write_synthetic_workload(directory, self.images)
+
+            # Un pool por (workers, hilos); batch_size/workers varían por llamada
+            groups = {}
+            for settings in candidates:
+                groups.setdefault((settings.process_workers, settings.torch_threads), []).append(settings)
+
+            for (workers, threads), group in groups.items():
+                with ProcessPoolOCREngine(self.languages, workers=workers, torch_threads=threads) as engine:
+                    list(engine.imap(paths[:workers]))  # Carga de modelos y calentamiento
+                    for settings in group:
+                        start = time.perf_counter()
+                        for _ in engine.imap(paths, readtext_options=settings.readtext_options):
+                            pass
+                        throughput = len(paths) / (time.perf_counter() - start)
+                        measurements.append((settings, throughput))
+                        if verbose:
+                            print(f"  workers={workers} hilos={threads} batch_size={settings.batch_size} "
+                                  f"readtext_workers={settings.recognizer_workers}: {throughput:.2f} img/s")
+
+        best = max(measurements, key=lambda item: item[1])[0]
+        return best, measurements
+
+
+def save_tuned_settings(config_file: str, best: PerformanceSettings, extra: dict = None) -> PerformanceSettings:
+    """
+    Guarda el resultado del ajuste conservando los parámetros que no se midieron
+
+    Args:
+        config_file: Archivo de configuración a actualizar
+        best: Mejores parámetros encontrados (solo se toman TUNED_FIELDS)
+        extra: Datos adicionales del ajuste
+
+    Returns:
+        Parámetros guardados
+    """
+    adapter = PerformanceSettingsAdapter(config_file)
+    settings = replace(adapter.get_settings(), **{name: getattr(best, name) for name in TUNED_FIELDS})
+    adapter.save_settings(settings, extra=extra)
+    return settings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ajuste automático de rendimiento OCR en CPU")
+    parser.add_argument("--config", default="config.json", help="Archivo de configuración a actualizar")
+    parser.add_argument("--idiomas", nargs="+", default=["en", "es"])
+    parser.add_argument("--imagenes", type=int, default=16)
+    parser.add_argument("--cpus", type=int, default=None, help="Forzar la cantidad de CPUs")
+    args = parser.parse_args()
+
+    quota = cgroup_cpu_quota()
+    print(f"CPUs utilizables: {args.cpus or available_cpus()} "
+          f"(cuota cgroup: {f'{quota:.2f}' if quota is not None else 'sin límite'})")
+
+    tuner = PerformanceTuner(args.idiomas, cpus=args.cpus, images=args.imagenes)
+    best, measurements = tuner.run()
+    throughput = max(t for _, t in measurements)
+
+    saved = save_tuned_settings(args.config, best, extra={
+        'cpus': tuner.cpus,
+        'images_per_second': round(throughput, 3),
+        'tuned_at': datetime.now().isoformat()
+    })
+    print(f"Mejor configuración: {saved} ({throughput:.2f} img/s) guardada en {args.config}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Normalización de entrada para OCR
+Estima la altura dominante de las líneas de texto sobre una copia reducida y
+reescala la imagen para que el texto quede en el rango que mejor procesa el
+reconocedor. Los JPEG se decodifican directamente a escala reducida con
+PIL draft() en lugar de decodificar a tamaño completo y luego reducir.
+Las funciones aceptan una ruta o una imagen ya decodificada; una ruta se lee
+una sola vez aunque se decodifique para la copia y para la imagen final.
+"""
+import math
+from typing import Optional
+
+from .ingestion import as_pil, read_image_bytes
+
+# Rango de altura de línea (px) en el que el detector y el reconocedor rinden mejor
+TARGET_TEXT_HEIGHT = 32
+MAX_TEXT_HEIGHT = 48
+MIN_TEXT_HEIGHT = 12
+# Lado de la copia reducida usada para la estimación
+ESTIMATION_SIDE = 1024
+
+
+def estimate_text_height(gray, strips: int = 4) -> Optional[float]:
+    """
+    Estima la altura dominante de las líneas de texto con perfiles de proyección
+
+    Args:
+        gray: ndarray 2D uint8 (escala de grises)
+        strips: Franjas verticales analizadas por separado (tolera columnas)
+
+    Returns:
+        Altura mediana de línea en píxeles, o None si no se detecta texto
+    """
+    import numpy as np
+
+    gray = np.asarray(gray, dtype=np.float32)
+    if gray.size == 0:
+        return None
+
+    ink = gray < gray.mean() - 0.5 * gray.std()
+    # Texto claro sobre fondo oscuro
+    if ink.mean() > 0.5:
+        ink = ~ink
+
+    heights = []
+    for strip in np.array_split(ink, strips, axis=1):
+        if strip.shape[1] == 0:
+            continue
+        rows = (strip.mean(axis=1) > 0.01).astype(np.int8)
+        edges = np.diff(np.concatenate(([0], rows, [0])))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        runs = ends - starts
+        heights.extend(runs[runs >= 2].tolist())
+
+    if not heights:
+        return None
+    return float(np.median(heights))
+
+
+def text_scale_factor(text_height: Optional[float]) -> float:
+    """Factor de escala que lleva la altura de línea al rango objetivo"""
+    if not text_height:
+        return 1.0
+    if text_height > MAX_TEXT_HEIGHT:
+        return TARGET_TEXT_HEIGHT / text_height
+    if text_height < MIN_TEXT_HEIGHT:
+        return min(2.0, TARGET_TEXT_HEIGHT / text_height)
+    return 1.0
+
+
+def grey_proxy(source, side: int = ESTIMATION_SIDE):
+    """
+    Copia reducida en gris; los JPEG se decodifican directamente reducidos
+
+    Args:
+        source: Ruta, bytes del archivo, ndarray o PIL.Image
+        side: Lado máximo de la copia
+
+    Returns:
+        Tupla (PIL.Image 'L' de lado máximo side, ancho original / ancho de la copia)
+    """
+    image = as_pil(source)
+    width, height = image.size
+    reduction = max(1.0, max(width, height) / side)
+    # draft() solo sobre un archivo recién abierto: no altera imágenes del llamador
+    if isinstance(source, (str, bytes)) and image.format == 'JPEG':
+        image.draft('L', (int(width / reduction), int(height / reduction)))
+    proxy = image.convert('L')
+    proxy.thumbnail((side, side))
+    return proxy, width / proxy.width
+
+
+def load_normalized(source, angle: int = 0):
+    """
+    Decodifica la imagen reescalada según la altura estimada del texto
+
+    Args:
+        source: Ruta (se lee una sola vez), bytes del archivo, ndarray o PIL.Image
+        angle: Rotación antihoraria (grados) que endereza el texto; se aplica
+            antes de estimar la altura de línea y a la imagen resultante
+
+    Returns:
+        Tupla (PIL.Image RGB, factor de escala aplicado respecto al original)
+    """
+    import numpy as np
+    from PIL import Image as PILImage
+
+    if isinstance(source, str):
+        source = read_image_bytes(source)
+
+    proxy, proxy_ratio = grey_proxy(source)
+    if angle:
+        proxy = proxy.rotate(angle, expand=True)
+    text_height = estimate_text_height(np.asarray(proxy))
+    scale = text_scale_factor(text_height * proxy_ratio if text_height else None)
+
+    image = as_pil(source)
+    width, height = image.size
+    target = (max(1, math.ceil(width * scale)), max(1, math.ceil(height * scale)))
+    if scale < 1.0 and isinstance(source, bytes) and image.format == 'JPEG':
+        # draft() elige la reducción DCT (1/2, 1/4, 1/8) más cercana sin bajar de target
+        image.draft('RGB', target)
+    image = image.convert('RGB')
+    if image.size != target and scale != 1.0:
+        image = image.resize(target, PILImage.Resampling.LANCZOS if scale < 1.0 else PILImage.Resampling.BICUBIC)
+    if angle:
+        image = image.rotate(angle, expand=True)
+    return image, scale
+
+
+def normalize_image(image):
+    """
+    Reescala una imagen ya decodificada (ej: un recorte) según la altura del texto
+
+    Args:
+        image: PIL.Image
+
+    Returns:
+        Tupla (PIL.Image RGB, factor de escala aplicado)
+    """
+    import numpy as np
+    from PIL import Image as PILImage
+
+    proxy = image.convert('L')
+    proxy.thumbnail((ESTIMATION_SIDE, ESTIMATION_SIDE))
+    text_height = estimate_text_height(np.asarray(proxy))
+    scale = text_scale_factor(text_height * image.width / proxy.width if text_height else None)
+
+    image = image.convert('RGB')
+    if scale != 1.0:
+        target = (max(1, math.ceil(image.width * scale)), max(1, math.ceil(image.height * scale)))
+        image = image.resize(target, PILImage.Resampling.LANCZOS if scale < 1.0 else PILImage.Resampling.BICUBIC)
+    return image, scale
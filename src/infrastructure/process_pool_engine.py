@@ -0,0 +1,273 @@
+"""
+Motor OCR multiproceso - Cada worker carga su lector una sola vez en el
+inicializador y los hilos de torch se reparten entre los workers. Cada imagen
+pasa por la misma cadena que en el proceso principal (ocr_lines: orientación,
+normalización, mosaicos y refinamiento, más el enrutamiento por escritura con
+'auto'), así que la cantidad de workers no cambia el texto extraído
+"""
+import math
+import os
+import multiprocessing
+import signal
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import contextmanager
+from dataclasses import replace
+from typing import Iterator, NamedTuple, Optional
+
+from ..domain.cancellation import CancellationToken, DeadlineExceeded, OperationCancelled
+from ..domain.entities import PerformanceSettings
+
+# Estado del proceso worker (se inicializa en _init_worker)
+_worker_reader = None
+_worker_router = None
+_worker_config = None
+# Cada cuánto se consulta el token mientras se espera a los workers
+CANCEL_POLL_SECONDS = 0.2
+
+
+def cgroup_cpu_quota() -> Optional[float]:
+    """
+    Cuota de CPU del cgroup (v2 o v1) expresada en CPUs
+
+    Returns:
+        Cantidad de CPUs permitidas, o None si no hay límite
+    """
+    try:
+        # cgroup v2: "<cuota> <periodo>" o "max <periodo>"
+        with open('/sys/fs/cgroup/cpu.max', 'r') as f:
+            quota, period = f.read().split()[:2]
+        if quota != 'max':
+            return int(quota) / int(period)
+        return None
+    except (OSError, ValueError):
+        pass
+
+    try:
+        # cgroup v1
+        with open('/sys/fs/cgroup/cpu/cpu.cfs_quota_us', 'r') as f:
+            quota = int(f.read().strip())
+        with open('/sys/fs/cgroup/cpu/cpu.cfs_period_us', 'r') as f:
+            period = int(f.read().strip())
+        if quota > 0 and period > 0:
+            return quota / period
+    except (OSError, ValueError):
+        pass
+
+    return None
+
+
+def available_cpus() -> int:
+    """Cantidad de CPUs utilizables por este proceso (afinidad y cuota del cgroup)"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    quota = cgroup_cpu_quota()
+    if quota is not None:
+        cpus = min(cpus, max(1, math.ceil(quota)))
+    return cpus
+
+
+class WorkerResult(NamedTuple):
+    """Resultado de una imagen procesada en un worker"""
+    index: int
+    path: str
+    lines: Optional[list]  # párrafos; None si hubo error
+    error: Optional[str]
+    confidence: Optional[float] = None  # confianza media de las líneas reconocidas
+    orientation: int = 0  # rotación aplicada para enderezar el texto
+
+
+def _init_worker(languages: tuple, gpu: bool, model_dir: Optional[str], torch_threads: int,
+                 performance: PerformanceSettings) -> None:
+    """Inicializador del worker: fija los hilos de torch y carga el lector"""
+    global _worker_reader, _worker_router, _worker_config
+
+    # Antes de importar torch para que OpenMP/MKL respeten el límite
+    os.environ['OMP_NUM_THREADS'] = str(torch_threads)
+    os.environ['MKL_NUM_THREADS'] = str(torch_threads)
+
+    import torch
+    torch.set_num_threads(torch_threads)
+
+    from .reader_registry import get_reader_registry
+    from .script_detection import AUTO_LANGUAGES, ScriptRouter
+
+    # Con 'auto' el lector latino es la base y cada imagen se enruta según su escritura
+    if AUTO_LANGUAGES in languages:
+        _worker_router = ScriptRouter(list(languages))
+        languages = tuple(_worker_router.latin_languages)
+    _worker_config = {'gpu': gpu, 'model_dir': model_dir, 'quantize': performance.quantized_recognizer}
+    _worker_reader = get_reader_registry().get_reader(list(languages), **_worker_config)
+
+
+@contextmanager
+def _deadline(seconds: Optional[float]):
+    """
+    Plazo duro en el hilo principal del worker: SIGALRM interrumpe readtext
+    entre operaciones de torch (sin efecto en plataformas sin setitimer)
+    """
+    if not seconds or not hasattr(signal, 'setitimer'):
+        yield
+        return
+
+    def expire(signum, frame):
+        raise DeadlineExceeded(f"Tiempo agotado ({seconds:g} s)")
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _extract_in_worker(index: int, image_path: str, paragraph: bool, performance: PerformanceSettings,
+                       timeout: Optional[float] = None) -> WorkerResult:
+    """
+    Extrae el texto de una imagen en el worker con la misma cadena que el
+    proceso principal (con plazo opcional desde que empieza)
+    """
+    from .ingestion import ingest_image
+    from .ocr_adapter import format_lines, ocr_lines
+    from .reader_registry import get_reader_registry
+    from .refinement import aggregate_confidence
+
+    try:
+        with _deadline(timeout):
+            source = ingest_image(image_path, decode=False).source
+            reader = _worker_reader
+            if _worker_router is not None:
+                languages = _worker_router.languages_for(
+                    reader, source, lambda langs: get_reader_registry().get_reader(langs, **_worker_config))
+                reader = get_reader_registry().get_reader(languages, **_worker_config)
+            lines, angle = ocr_lines(reader, source, performance)
+        paragraphs = [str(text) for text in format_lines(lines, detail=0, paragraph=paragraph) if text]
+        return WorkerResult(index, image_path, paragraphs, None, aggregate_confidence(lines), angle)
+    except Exception as e:
+        return WorkerResult(index, image_path, None, str(e))
+
+
+class ProcessPoolOCREngine:
+    """Motor de extracción en lote sobre un pool de procesos"""
+
+    def __init__(self, languages: list[str] = None, gpu: bool = False,
+                 model_dir: Optional[str] = None, workers: Optional[int] = None,
+                 torch_threads: Optional[int] = None, paragraph: bool = True,
+                 performance: Optional[PerformanceSettings] = None):
+        """
+        Inicializa el motor (los procesos se crean en el primer uso)
+
+        Args:
+            languages: Lista de idiomas (ej: ['en', 'es']); con 'auto' cada
+                imagen se enruta según su escritura, como en el proceso principal
+            gpu: Si usar GPU
+            model_dir: Directorio de modelos de EasyOCR
+            workers: Cantidad de procesos (None = CPUs disponibles)
+            torch_threads: Hilos de torch por worker
+                (None = CPUs disponibles / workers, mínimo 1)
+            paragraph: Si agrupar las líneas en párrafos
+            performance: Parámetros de la cadena de extracción (normalización,
+                orientación, refinamiento, batch_size y workers de readtext,
+                reconocedor int8). None = valores por defecto
+        """
+        cpus = available_cpus()
+        self.languages = tuple(languages or ['en', 'es'])
+        self.gpu = gpu
+        self.model_dir = model_dir
+        self.workers = max(1, workers or cpus)
+        self.torch_threads = max(1, torch_threads or cpus // self.workers)
+        self.paragraph = paragraph
+        self.performance = performance or PerformanceSettings()
+        self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: no heredar el estado de Qt/torch del proceso padre
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(self.languages, self.gpu, self.model_dir, self.torch_threads, self.performance)
+            )
+        return self._executor
+
+    def imap(self, image_paths: list[str], readtext_options: Optional[dict] = None,
+             cancel_token: Optional[CancellationToken] = None,
+             image_timeout: Optional[float] = None) -> Iterator[tuple]:
+        """
+        Procesa las imágenes y entrega cada resultado en cuanto termina.
+        Solo hay unas pocas imágenes en vuelo por worker, así que una pausa
+        retiene la cola enseguida y los procesos conservan su modelo cargado
+
+        Args:
+            image_paths: Rutas de las imágenes
+            readtext_options: Reemplaza batch_size y workers de readtext solo
+                para esta llamada
+            cancel_token: Token del trabajo (pausa y cancelación); al cancelar
+                se terminan los procesos sin esperar a las imágenes en curso
+            image_timeout: Segundos máximos por imagen, contados en el worker
+                desde que empieza a procesarla (None = sin límite)
+
+        Yields:
+            WorkerResult (índice, ruta, párrafos, error, confianza, ángulo);
+            párrafos es None si hubo error (una imagen vencida llega con error
+            "Tiempo agotado")
+
+        Raises:
+            OperationCancelled: Si se cancela el trabajo
+        """
+        executor = self._get_executor()
+        performance = self.performance
+        if readtext_options is not None:
+            performance = replace(performance,
+                                  batch_size=readtext_options.get('batch_size', performance.batch_size),
+                                  recognizer_workers=readtext_options.get('workers', performance.recognizer_workers))
+        queue = list(enumerate(image_paths))[::-1]
+        in_flight = set()
+        try:
+            while queue or in_flight:
+                # En pausa no se envían imágenes nuevas; las que están en vuelo terminan
+                while queue and len(in_flight) < 2 * self.workers and not (cancel_token and cancel_token.paused):
+                    index, path = queue.pop()
+                    in_flight.add(executor.submit(_extract_in_worker, index, path, self.paragraph,
+                                                  performance, image_timeout))
+                if cancel_token is not None:
+                    if not in_flight:
+                        cancel_token.wait_if_paused()
+                        continue
+                    cancel_token.check()
+
+                done, in_flight = wait(in_flight, timeout=CANCEL_POLL_SECONDS if cancel_token else None,
+                                       return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        except OperationCancelled:
+            self.terminate()
+            raise
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+    def close(self) -> None:
+        """Termina los procesos worker"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def terminate(self) -> None:
+        """Termina los procesos de inmediato, sin esperar a las imágenes en curso"""
+        if self._executor is not None:
+            processes = list((self._executor._processes or {}).values())
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            for process in processes:
+                process.terminate()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,16 @@
+"""
+Medición de la cuantización dinámica int8
+EasyOCR ya cuantiza en CPU el detector y el reconocedor (capas LSTM/Linear)
+al crear el lector con quantize=True, su valor por defecto; este módulo solo
+mide el tamaño de los modelos para compararlos contra los float.
+"""
+import io
+
+
+def module_size_bytes(module) -> int:
+    """Tamaño serializado del state_dict (incluye los pesos empaquetados int8)"""
+    import torch
+
+    buffer = io.BytesIO()
+    torch.save(module.state_dict(), buffer)
+    return buffer.tell()
@@ -0,0 +1,236 @@
+"""
+Registro de lectores OCR - Una única instancia de easyocr.Reader por proceso
+para cada combinación (idiomas, gpu, directorio de modelos, cuantización).
+Con un presupuesto de memoria, los lectores menos usados recientemente se
+descargan cuando no caben todos.
+"""
+import gc
+import sys
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+
+def _default_reader_factory(languages: tuple, gpu: bool, model_dir: Optional[str], quantize: bool = True):
+    """
+    Construye un easyocr.Reader (importación diferida de easyocr/torch).
+    En CPU EasyOCR cuantiza por defecto el detector y el reconocedor a int8
+    dinámico; quantize=False carga los modelos float
+    """
+    import easyocr
+
+    kwargs = {'gpu': gpu, 'quantize': quantize}
+    if model_dir:
+        kwargs['model_storage_directory'] = model_dir
+    return easyocr.Reader(list(languages), **kwargs)
+
+
+def _tensor_bytes(value) -> int:
+    """Bytes de un tensor o de una tupla de tensores (pesos int8 empaquetados)"""
+    if isinstance(value, (tuple, list)):
+        return sum(_tensor_bytes(item) for item in value)
+    if hasattr(value, 'numel') and hasattr(value, 'element_size'):
+        return value.numel() * value.element_size()
+    return 0
+
+
+def _module_bytes(module) -> int:
+    """Calcula los bytes ocupados por el state_dict de un módulo torch"""
+    if module is None or not hasattr(module, 'state_dict'):
+        return 0
+
+    return sum(_tensor_bytes(value) for value in module.state_dict().values())
+
+
+def reader_memory(reader) -> int:
+    """Bytes de los modelos (detector y reconocedor) de un lector"""
+    return (
+        _module_bytes(getattr(reader, 'detector', None))
+        + _module_bytes(getattr(reader, 'recognizer', None))
+    )
+
+
+def _free_torch_memory() -> None:
+    """Recolecta los tensores sin referencias y vacía la caché de CUDA si se usa"""
+    gc.collect()
+    torch = sys.modules.get('torch')
+    if torch is not None and torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+
+class ReaderRegistry:
+    """
+    Registro compartido de lectores OCR indexado por configuración, con
+    desalojo LRU cuando se supera el presupuesto de memoria
+    """
+
+    def __init__(self, reader_factory: Callable = None, memory_budget: Optional[int] = None,
+                 size_of: Callable = None):
+        """
+        Inicializa el registro
+
+        Args:
+            reader_factory: Función (languages, gpu, model_dir, quantize) -> reader.
+                Por defecto construye un easyocr.Reader
+            memory_budget: Bytes máximos de modelos residentes (None = sin límite)
+            size_of: Función reader -> bytes usada para el presupuesto
+        """
+        self._reader_factory = reader_factory or _default_reader_factory
+        self._size_of = size_of or reader_memory
+        self._readers = OrderedDict()
+        self._sizes = {}
+        self._key_locks = {}
+        self._lock = threading.Lock()
+        self.memory_budget = memory_budget
+        self.load_count = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(languages: list[str], gpu: bool = False, model_dir: Optional[str] = None,
+                 quantize: bool = True) -> tuple:
+        """Normaliza los parámetros a la clave del registro (el orden de idiomas no importa)"""
+        return (tuple(sorted(set(languages))), bool(gpu), model_dir or None, bool(quantize))
+
+    def get_reader(self, languages: list[str], gpu: bool = False, model_dir: Optional[str] = None,
+                   quantize: bool = True):
+        """
+        Obtiene el lector para la configuración dada, cargándolo una sola vez
+
+        Args:
+            languages: Lista de idiomas (ej: ['en', 'es'])
+            gpu: Si usar GPU
+            model_dir: Directorio de modelos de EasyOCR (None = por defecto)
+            quantize: Cuantización int8 dinámica de EasyOCR (solo CPU; False = float)
+
+        Returns:
+            Instancia de lector compartida
+        """
+        key = self.make_key(languages, gpu, model_dir, quantize)
+
+        with self._lock:
+            reader = self._readers.get(key)
+            if reader is not None:
+                self._readers.move_to_end(key)
+                self.hits += 1
+                return reader
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Solo un hilo carga cada clave; el resto espera y reutiliza el resultado
+        with key_lock:
+            with self._lock:
+                reader = self._readers.get(key)
+                if reader is not None:
+                    self._readers.move_to_end(key)
+                    self.hits += 1
+                    return reader
+
+            reader = self._reader_factory(*key)
+            size = self._size_of(reader)
+            with self._lock:
+                self._readers[key] = reader
+                self._sizes[key] = size
+                self.load_count += 1
+                self.misses += 1
+                evicted = self._evict_over_budget()
+            if evicted:
+                del evicted
+                _free_torch_memory()
+            return reader
+
+    def _evict_over_budget(self) -> list:
+        """
+        Desaloja los lectores menos usados hasta respetar el presupuesto.
+        El más reciente nunca se desaloja. Debe llamarse con el lock tomado
+
+        Returns:
+            Lectores desalojados (se liberan fuera del lock)
+        """
+        evicted = []
+        if self.memory_budget is None:
+            return evicted
+        while len(self._readers) > 1 and sum(self._sizes.values()) > self.memory_budget:
+            key, reader = self._readers.popitem(last=False)
+            self._sizes.pop(key, None)
+            self._key_locks.pop(key, None)
+            self.evictions += 1
+            evicted.append(reader)
+        return evicted
+
+    def set_memory_budget(self, memory_budget: Optional[int]) -> None:
+        """Cambia el presupuesto de memoria (None = sin límite) y desaloja si hace falta"""
+        with self._lock:
+            self.memory_budget = memory_budget
+            evicted = self._evict_over_budget()
+        if evicted:
+            del evicted
+            _free_torch_memory()
+
+    def is_loaded(self, languages: list[str], gpu: bool = False, model_dir: Optional[str] = None,
+                  quantize: bool = True) -> bool:
+        """Indica si el lector para la configuración ya está cargado"""
+        with self._lock:
+            return self.make_key(languages, gpu, model_dir, quantize) in self._readers
+
+    def release(self, languages: list[str], gpu: bool = False, model_dir: Optional[str] = None,
+                quantize: bool = True) -> bool:
+        """Libera el lector de una configuración. Retorna True si existía"""
+        key = self.make_key(languages, gpu, model_dir, quantize)
+        with self._lock:
+            self._key_locks.pop(key, None)
+            self._sizes.pop(key, None)
+            released = self._readers.pop(key, None) is not None
+        if released:
+            _free_torch_memory()
+        return released
+
+    def clear(self) -> None:
+        """Libera todos los lectores registrados"""
+        with self._lock:
+            self._readers.clear()
+            self._sizes.clear()
+            self._key_locks.clear()
+        _free_torch_memory()
+
+    def stats(self) -> dict:
+        """Contadores de la caché: aciertos, fallos, desalojos y memoria"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'loaded': len(self._readers),
+                'resident_bytes': sum(self._sizes.values()),
+                'memory_budget': self.memory_budget,
+            }
+
+    def resident_memory(self) -> dict:
+        """
+        Reporta la memoria residente de los modelos cargados
+
+        Returns:
+            Diccionario {clave: bytes} con la clave 'total' agregada
+        """
+        with self._lock:
+            items = list(self._readers.items())
+
+        report = {}
+        for key, reader in items:
+            report[key] = reader_memory(reader)
+        report['total'] = sum(report.values())
+        return report
+
+
+# Instancia única del registro
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_reader_registry() -> ReaderRegistry:
+    """Obtiene o crea la instancia única del registro de lectores"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ReaderRegistry()
+        return _registry
@@ -0,0 +1,110 @@
+"""
+Segunda pasada selectiva del reconocedor
+Solo las líneas con confianza baja se vuelven a reconocer, recortadas con
+margen del original a resolución completa (no de la copia normalizada, que
+pudo perder detalle al reducirse), ampliadas si hace falta y con el
+contraste estirado. La mejor lectura reemplaza a la original; el resto de la
+imagen no se vuelve a procesar.
+"""
+from typing import Optional
+
+# Confianza por debajo de la cual una línea se vuelve a reconocer
+DEFAULT_REFINE_THRESHOLD = 0.5
+# Ampliación aplicada a los recortes dudosos antes del reconocedor
+REFINE_MAGNIFICATION = 2.0
+# Margen alrededor de la caja, relativo a su altura (recupera trazos cortados)
+REFINE_PADDING = 0.15
+
+
+def aggregate_confidence(lines: list) -> float:
+    """Confianza media de las líneas ponderada por la longitud del texto"""
+    weights = [max(1, len(str(text))) for _, text, _ in lines]
+    if not weights:
+        return 0.0
+    return sum(w * float(conf) for w, (_, _, conf) in zip(weights, lines)) / sum(weights)
+
+
+def _padded_bounds(box, width: int, height: int, scale: float = 1.0) -> tuple[int, int, int, int]:
+    xs = [point[0] / scale for point in box]
+    ys = [point[1] / scale for point in box]
+    pad = (max(ys) - min(ys)) * REFINE_PADDING
+    return (
+        max(0, int(min(xs) - pad)), max(0, int(min(ys) - pad)),
+        min(width, int(max(xs) + pad + 1)), min(height, int(max(ys) + pad + 1)),
+    )
+
+
+def refine_low_confidence(reader, source, lines: list,
+                          threshold: float = DEFAULT_REFINE_THRESHOLD,
+                          magnification: float = REFINE_MAGNIFICATION,
+                          recognize_options: Optional[dict] = None,
+                          scale: float = 1.0) -> tuple[list, int]:
+    """
+    Reconoce de nuevo las líneas dudosas y conserva la mejor lectura
+
+    Args:
+        reader: easyocr.Reader (se usa recognize, sin volver a detectar)
+        source: PIL.Image de la que se recortan las líneas; idealmente el
+            original a resolución completa
+        lines: Lista de (caja, texto, confianza) sin agrupar en párrafos
+        threshold: Confianza mínima para aceptar una línea sin segunda pasada
+        magnification: Ampliación de los recortes respecto de la imagen en
+            la que se detectaron las cajas; si el original ya tiene esa
+            resolución o más, se recorta sin reescalar
+        recognize_options: Argumentos extra de recognize (batch_size, workers)
+        scale: Factor de la imagen de las cajas respecto de source (las
+            cajas se dividen por él); 1.0 si están en coordenadas de source
+
+    Returns:
+        Tupla (líneas con las lecturas mejoradas, cantidad de líneas mejoradas)
+    """
+    low = [i for i, (_, _, conf) in enumerate(lines) if conf < threshold]
+    if not low or threshold <= 0 or not hasattr(reader, 'recognize'):
+        return lines, 0
+
+    import numpy as np
+    from PIL import Image as PILImage, ImageOps
+
+    # Los recortes se apilan en un único lienzo para reconocerlos en una sola llamada
+    # Ampliación pendiente sobre el original: una imagen reducida por la
+    # normalización aporta su resolución completa en lugar de interpolar
+    factor = magnification * scale
+    crops = []
+    for i in low:
+        bounds = _padded_bounds(lines[i][0], *source.size, scale=scale)
+        crop = source.crop(bounds).convert('L')
+        if factor > 1.0:
+            size = (max(1, round(crop.width * factor)), max(1, round(crop.height * factor)))
+            crop = crop.resize(size, PILImage.Resampling.LANCZOS)
+        crops.append(ImageOps.autocontrast(crop, cutoff=1))
+
+    canvas = np.full((sum(c.height for c in crops), max(c.width for c in crops)), 255, dtype=np.uint8)
+    horizontal_list = []
+    offset = 0
+    for crop in crops:
+        canvas[offset:offset + crop.height, :crop.width] = np.asarray(crop)
+        horizontal_list.append([0, crop.width, offset, offset + crop.height])
+        offset += crop.height
+
+    options = dict(recognize_options or {})
+    options.setdefault('batch_size', len(crops))
+    candidates = reader.recognize(canvas, horizontal_list=horizontal_list, free_list=[],
+                                  detail=1, paragraph=False, **options)
+
+    # recognize ordena por posición vertical: se asocia cada lectura a su franja
+    readings = {}
+    for box, text, conf in candidates:
+        top = min(point[1] for point in box)
+        band = max(b for b, entry in enumerate(horizontal_list) if entry[2] <= top + 1)
+        if conf > readings.get(band, (None, -1.0))[1]:
+            readings[band] = (text, conf)
+
+    refined = list(lines)
+    improved = 0
+    for band, i in enumerate(low):
+        text, conf = readings.get(band, (None, -1.0))
+        box, _, original_conf = lines[i]
+        if text and conf > original_conf:
+            refined[i] = (box, text, conf)
+            improved += 1
+    return refined, improved
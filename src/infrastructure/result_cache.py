@@ -0,0 +1,327 @@
+"""
+Caché persistente de resultados OCR direccionada por contenido
+La clave es un hash rápido (BLAKE2b) de los bytes de la imagen más los
+parámetros del motor (idiomas, modo párrafo, receta de preprocesamiento y
+versión del motor): la misma captura con otro nombre acierta y cualquier
+cambio de ajustes invalida sola la entrada. Los digests se memorizan por
+(ruta, tamaño, mtime), así un archivo conocido no se vuelve a leer. Las
+entradas viven en SQLite con un tope de tamaño y desalojo LRU.
+
+Cada valor es {"texts": párrafos, "orientation": grados, "confidence": media
+o None}, compartido por la GUI, los casos de uso y el procesamiento por lotes.
+"""
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from ..domain.entities import PerformanceSettings
+from .ingestion import read_image_bytes
+
+# Archivo por defecto de la caché (por usuario, fuera del proyecto)
+DEFAULT_CACHE_PATH = Path.home() / '.cache' / 'extractor-ocr' / 'resultados.sqlite3'
+# Sube cuando cambia el formato de lo guardado; invalida todo lo anterior
+CACHE_FORMAT = 1
+# Fracción del tope a la que se baja al desalojar (evita desalojar en cada escritura)
+EVICT_TO = 0.9
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS perceptual (
+    digest TEXT PRIMARY KEY,
+    hash TEXT NOT NULL,
+    cells TEXT NOT NULL,
+    thumbnail BLOB
+);
+"""
+
+
+def digest_bytes(data: bytes) -> str:
+    """Hash de contenido de una imagen (BLAKE2b de 128 bits)"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def engine_version(backend: str = 'easyocr') -> str:
+    """Versión instalada del motor (sin importarlo)"""
+    from importlib.metadata import PackageNotFoundError, version
+
+    package = 'onnxruntime' if backend == 'onnx' else 'easyocr'
+    try:
+        return f"{backend}-{version(package)}"
+    except PackageNotFoundError:
+        return f"{backend}-desconocido"
+
+
+def engine_params(performance: PerformanceSettings, languages, backend: str = 'easyocr',
+                  pipeline: str = 'completo', paragraph: bool = True) -> dict:
+    """
+    Parámetros del motor que cambian el texto extraído (parte de la clave)
+
+    Args:
+        performance: Ajustes de rendimiento (receta de preprocesamiento)
+        languages: Idiomas pedidos (incluido 'auto')
+        backend: 'easyocr' u 'onnx'
+        pipeline: Cadena de extracción ('completo': orientación,
+            normalización y refinamiento, en proceso o en el motor multiproceso)
+        paragraph: Si el texto se agrupa en párrafos
+    """
+    return {
+        'format': CACHE_FORMAT,
+        'engine': engine_version(backend),
+        'pipeline': pipeline,
+        'languages': list(languages),
+        'paragraph': paragraph,
+        'normalize_input': performance.normalize_input,
+        'refine_threshold': performance.refine_threshold,
+        'detect_orientation': performance.detect_orientation,
+        'quantized_recognizer': performance.quantized_recognizer,
+    }
+
+
+class ResultCache:
+    """Caché de resultados en disco con tope de tamaño y desalojo LRU"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes: int = 256 * 1024 * 1024):
+        """
+        Args:
+            path: Archivo SQLite (se crea con su carpeta si no existe)
+            max_bytes: Tamaño máximo de los resultados guardados
+        """
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Otro proceso (GUI, CLI, demonio) puede estar escribiendo: se espera el bloqueo
+        self._db = sqlite3.connect(str(self.path), timeout=5, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(perceptual)")}
+        if 'thumbnail' not in columns:
+            # Base anterior a las miniaturas: sus firmas quedan sin verificar y no se reutilizan
+            self._db.execute("ALTER TABLE perceptual ADD COLUMN thumbnail BLOB")
+            self._db.commit()
+        self._digests = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.files_hashed = 0
+        self.digests_memoized = 0
+
+    def _known_digest(self, path: str, signature: tuple[int, int]) -> Optional[str]:
+        """Digest memorizado para la ruta con ese (tamaño, mtime), o None"""
+        with self._lock:
+            known = self._digests.get(path)
+            if known is None:
+                row = self._db.execute("SELECT size, mtime_ns, digest FROM files WHERE path = ?",
+                                       (path,)).fetchone()
+                known = ((row[0], row[1]), row[2]) if row else None
+            if known is not None and known[0] == signature:
+                self._digests[path] = known
+                return known[1]
+        return None
+
+    @staticmethod
+    def _signature(path: str) -> tuple[int, int]:
+        stat = os.stat(path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def read_unless_known(self, path: str) -> Optional[bytes]:
+        """
+        Lee el archivo solo si su digest no está memorizado, para que quien
+        además lo decodifique comparta esa única lectura (ver image_digest)
+
+        Returns:
+            Bytes del archivo, o None si el digest ya se conoce o no se puede leer
+        """
+        try:
+            if self._known_digest(path, self._signature(path)) is not None:
+                return None
+            return read_image_bytes(path)
+        except OSError:
+            return None
+
+    def image_digest(self, path: str, data: Optional[bytes] = None) -> str:
+        """
+        Digest del contenido de un archivo; solo se lee si cambió su tamaño o mtime
+
+        Args:
+            path: Ruta del archivo
+            data: Bytes del archivo si ya se leyeron (se hashean sin volver a leer)
+
+        Raises:
+            OSError: Si el archivo no se puede leer
+        """
+        signature = self._signature(path)
+        known = self._known_digest(path, signature)
+        if known is not None:
+            with self._lock:
+                self.digests_memoized += 1
+            return known
+
+        digest = digest_bytes(read_image_bytes(path) if data is None else data)
+        with self._lock:
+            self._digests[path] = (signature, digest)
+            self.files_hashed += 1
+            self._db.execute("INSERT OR REPLACE INTO files (path, size, mtime_ns, digest) VALUES (?, ?, ?, ?)",
+                             (path, signature[0], signature[1], digest))
+            self._db.commit()
+        return digest
+
+    @staticmethod
+    def key(digest: str, params: dict) -> str:
+        """Clave de una entrada: contenido de la imagen + parámetros del motor"""
+        encoded = json.dumps(params, sort_keys=True, separators=(',', ':'))
+        return hashlib.blake2b(f"{digest}:{encoded}".encode('utf-8'), digest_size=16).hexdigest()
+
+    def lookup(self, path: str, params: dict, data: Optional[bytes] = None) -> tuple[Optional[str], Optional[Any]]:
+        """
+        Clave y valor guardado para un archivo
+
+        Args:
+            path: Ruta del archivo
+            params: Parámetros del motor (ver engine_params)
+            data: Bytes del archivo si ya se leyeron (ver read_unless_known)
+
+        Returns:
+            (clave, valor o None); la clave es None si el archivo no se puede leer
+        """
+        try:
+            key = self.key(self.image_digest(path, data), params)
+        except OSError:
+            return None, None
+        return key, self.get(key)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Valor guardado (marcado como recién usado) o None"""
+        with self._lock:
+            row = self._db.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._db.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+        return json.loads(row[0])
+
+    def put(self, key: str, value: Any) -> None:
+        """Guarda un valor serializable en JSON y desaloja lo menos usado si se supera el tope"""
+        encoded = json.dumps(value, ensure_ascii=False)
+        size = len(encoded.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO entries (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                             (key, encoded, size, time.time()))
+            self._evict()
+            self._db.commit()
+
+    def _evict(self) -> None:
+        """Borra las entradas usadas hace más tiempo hasta bajar al EVICT_TO del tope"""
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = self.max_bytes * EVICT_TO
+        for key, size in self._db.execute("SELECT key, size FROM entries ORDER BY last_access").fetchall():
+            if total <= target:
+                break
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            self.evictions += 1
+
+    def add_perceptual(self, digest: str, value_hash: int, cells: list[int],
+                       thumbnail: Optional[bytes] = None) -> None:
+        """Guarda la firma perceptual de un contenido y su miniatura (ver perceptual_index)"""
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO perceptual (digest, hash, cells, thumbnail) VALUES (?, ?, ?, ?)",
+                             (digest, format(value_hash, 'x'), ','.join(format(cell, 'x') for cell in cells),
+                              thumbnail))
+            self._db.commit()
+
+    def perceptual_thumbnail(self, digest: str) -> Optional[bytes]:
+        """Miniatura guardada con la firma de un contenido, o None"""
+        with self._lock:
+            row = self._db.execute("SELECT thumbnail FROM perceptual WHERE digest = ?", (digest,)).fetchone()
+        return bytes(row[0]) if row and row[0] is not None else None
+
+    def perceptual_rows(self) -> list[tuple[str, int, list[int]]]:
+        """
+        Firmas perceptuales guardadas: (digest, hash, hashes por celda). Las
+        firmas sobreviven al desalojo de su resultado; quien busca lo nota al
+        no encontrar la entrada
+        """
+        with self._lock:
+            rows = self._db.execute("SELECT digest, hash, cells FROM perceptual").fetchall()
+        return [(digest, int(value_hash, 16), [int(cell, 16) for cell in cells.split(',') if cell])
+                for digest, value_hash, cells in rows]
+
+    def clear(self) -> None:
+        """Vacía la caché (resultados, digests memorizados y firmas perceptuales)"""
+        with self._lock:
+            self._db.execute("DELETE FROM entries")
+            self._db.execute("DELETE FROM files")
+            self._db.execute("DELETE FROM perceptual")
+            self._db.commit()
+            self._digests.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict:
+        """Aciertos, fallos, desalojos, archivos leídos para hashear y tamaño actual"""
+        with self._lock:
+            entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hit_rate,
+                'evictions': self.evictions,
+                'files_hashed': self.files_hashed,
+                'digests_memoized': self.digests_memoized,
+                'entries': entries,
+                'bytes': size,
+            }
+
+
+# Instancia única por proceso
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache(performance: Optional[PerformanceSettings] = None) -> Optional[ResultCache]:
+    """
+    Obtiene la caché del proceso, o None si está desactivada (result_cache_mb = 0)
+    o no se pudo abrir
+    """
+    global _cache
+    if performance is None:
+        from .configuration_adapter import PerformanceSettingsAdapter
+        performance = PerformanceSettingsAdapter('config.json').get_settings()
+    if performance.result_cache_mb <= 0:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = ResultCache(max_bytes=performance.result_cache_mb * 1024 * 1024)
+            except (OSError, sqlite3.Error) as e:
+                print(f"Warning: No se pudo abrir la caché de resultados: {e}")
+                return None
+        return _cache
@@ -0,0 +1,154 @@
+"""
+Detección de escritura para elegir el lector más pequeño suficiente
+Se detectan unas pocas líneas en una copia reducida con el lector latino (el
+que ya está cargado para la mayoría de las imágenes) y se reconocen. Si el
+reconocedor latino las lee con confianza, la imagen se queda en ese lector;
+si no, la geometría de los glifos (ancho de los segmentos respecto a la
+altura de línea, línea base continua, complejidad de trazos) distingue
+escritura CJK o árabe y se enruta a un lector con solo esos idiomas. Las
+letras separadas pueden ser latinas (mal escaneadas) o cirílicas: solo se
+enruta al lector cirílico si lee las mismas líneas con más confianza.
+"""
+from typing import Callable, Optional
+
+from .preprocessing import grey_proxy
+
+# Valor de ocr_languages que activa la detección automática
+AUTO_LANGUAGES = 'auto'
+
+# Lector mínimo para cada escritura ('latin' usa los idiomas latinos configurados)
+SCRIPT_LANGUAGES = {
+    'cyrillic': ['ru', 'en'],
+    'cjk': ['ch_sim', 'en'],
+    'arabic': ['ar', 'en'],
+}
+
+# Lado de la copia reducida usada para detectar líneas
+ROUTING_SIDE = 1024
+# Líneas muestreadas por imagen
+SAMPLE_LINES = 5
+# Confianza media del reconocedor latino a partir de la cual la imagen es latina
+LATIN_CONFIDENCE = 0.5
+# Clase geométrica de las escrituras de letras separadas (latina o cirílica)
+ALPHABETIC = 'alphabetic'
+
+
+def _mean_confidence(results: list) -> float:
+    confidences = [float(conf) for _, _, conf in results]
+    return sum(confidences) / len(confidences) if confidences else 0.0
+
+
+def glyph_script(ink) -> str:
+    """
+    Clasifica la escritura de un recorte de línea binarizado por su geometría
+
+    Args:
+        ink: ndarray 2D bool (True = tinta) de una línea de texto
+
+    Returns:
+        'arabic', 'cjk' o ALPHABETIC (letras separadas; la geometría no
+        distingue la escritura latina de la cirílica)
+    """
+    import numpy as np
+
+    height = max(1, ink.shape[0])
+    columns = ink.any(axis=0).astype(np.int8)
+    edges = np.diff(np.concatenate(([0], columns, [0])))
+    widths = np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)
+    if len(widths) == 0:
+        return ALPHABETIC
+    segment_width = float(np.median(widths)) / height
+
+    # Escritura cursiva: segmentos largos unidos por una línea base continua
+    baseline = float(ink.mean(axis=1).max())
+    if segment_width > 1.2 and baseline > 0.45:
+        return 'arabic'
+
+    # Ideogramas: glifos casi cuadrados con muchos trazos internos
+    transitions = np.count_nonzero(np.diff(ink.astype(np.int8), axis=1), axis=1)
+    strokes_per_glyph = transitions.mean() / max(1, len(widths)) / 2
+    if 0.6 <= segment_width <= 1.4 and strokes_per_glyph >= 1.5:
+        return 'cjk'
+    return ALPHABETIC
+
+
+def _binarize(gray):
+    import numpy as np
+
+    gray = np.asarray(gray, dtype=np.float32)
+    ink = gray < gray.mean() - 0.5 * gray.std()
+    if ink.mean() > 0.5:
+        ink = ~ink
+    return ink
+
+
+class ScriptRouter:
+    """Elige los idiomas del lector según la escritura detectada en la imagen"""
+
+    def __init__(self, latin_languages: Optional[list[str]] = None,
+                 sample_lines: int = SAMPLE_LINES, latin_confidence: float = LATIN_CONFIDENCE):
+        """
+        Args:
+            latin_languages: Idiomas del lector latino base (ej: ['en', 'es'])
+            sample_lines: Líneas reconocidas para decidir
+            latin_confidence: Confianza media mínima para quedarse en el lector latino
+        """
+        self.latin_languages = [lang for lang in (latin_languages or ['en']) if lang != AUTO_LANGUAGES] or ['en']
+        self.sample_lines = sample_lines
+        self.latin_confidence = latin_confidence
+
+    def detect_script(self, latin_reader, image,
+                      reader_for: Optional[Callable[[list[str]], object]] = None) -> str:
+        """
+        Detecta la escritura dominante de una imagen
+
+        Args:
+            latin_reader: easyocr.Reader latino (detect y recognize)
+            image: Ruta, ndarray o PIL.Image
+            reader_for: Función idiomas -> lector (ej. la del registro) para
+                confirmar el cirílico; sin ella las letras separadas quedan
+                en el lector latino
+
+        Returns:
+            'latin', 'cyrillic', 'cjk' o 'arabic'
+        """
+        import numpy as np
+        from collections import Counter
+
+        proxy, _ = grey_proxy(image, ROUTING_SIDE)
+        gray = np.asarray(proxy)
+
+        horizontal_list, _ = latin_reader.detect(gray, canvas_size=ROUTING_SIDE)
+        boxes = [box for box in horizontal_list[0] if box[3] - box[2] >= 8]
+        if not boxes:
+            return 'latin'
+        # Las líneas más anchas tienen más glifos para decidir
+        boxes = sorted(boxes, key=lambda box: box[1] - box[0], reverse=True)[:self.sample_lines]
+
+        results = latin_reader.recognize(gray, horizontal_list=boxes, free_list=[],
+                                         detail=1, paragraph=False, batch_size=len(boxes))
+        latin_confidence = _mean_confidence(results)
+        if results and latin_confidence >= self.latin_confidence:
+            return 'latin'
+
+        votes = Counter()
+        for x_min, x_max, y_min, y_max in boxes:
+            crop = gray[max(0, y_min):max(0, y_max), max(0, x_min):max(0, x_max)]
+            if crop.size:
+                votes[glyph_script(_binarize(crop))] += 1
+        script = votes.most_common(1)[0][0] if votes else 'latin'
+        if script != ALPHABETIC:
+            return script
+        if reader_for is None:
+            return 'latin'
+
+        # Evidencia positiva: el lector cirílico lee las mismas líneas mejor que el latino
+        cyrillic = reader_for(SCRIPT_LANGUAGES['cyrillic']).recognize(
+            gray, horizontal_list=boxes, free_list=[], detail=1, paragraph=False, batch_size=len(boxes))
+        return 'cyrillic' if _mean_confidence(cyrillic) > latin_confidence else 'latin'
+
+    def languages_for(self, latin_reader, image,
+                      reader_for: Optional[Callable[[list[str]], object]] = None) -> list[str]:
+        """Idiomas del lector más pequeño que cubre la escritura de la imagen (ver detect_script)"""
+        script = self.detect_script(latin_reader, image, reader_for)
+        return SCRIPT_LANGUAGES.get(script, self.latin_languages)
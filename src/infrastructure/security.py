@@ -181,6 +181,13 @@ class SecurityValidator:
         if 'language' in config and not isinstance(config['language'], str):
             return False, "Idioma inválido"
         
+        # Validar idiomas OCR
+        if 'ocr_languages' in config:
+            languages = config['ocr_languages']
+            if not isinstance(languages, list) or not languages or \
+                    not all(isinstance(lang, str) and lang.replace('_', '').isalnum() for lang in languages):
+                return False, "Idiomas OCR inválidos"
+        
         # Validar nivel OCR
         if 'ocr_detail_level' in config:
             if config['ocr_detail_level'] not in [0, 1]:
@@ -0,0 +1,113 @@
+"""
+Pre-filtro de presencia de texto
+Clasifica una imagen como "sin texto" a partir de estadísticas vectorizadas
+sobre una copia reducida (contraste, densidad de bordes y ancho de trazo por
+fila), para evitar el OCR completo en páginas en blanco, separadores o fotos.
+"""
+from typing import Optional
+
+from .preprocessing import grey_proxy
+
+# Lado de la copia reducida analizada
+PRESENCE_SIDE = 1024
+# Fracción mínima de filas con trazos de texto para considerar que hay texto
+DEFAULT_PRESENCE_THRESHOLD = 0.01
+# Desviación estándar de gris por debajo de la cual la imagen es uniforme
+MIN_CONTRAST = 6.0
+# Diferencia de gris entre píxeles vecinos que cuenta como borde
+EDGE_STEP = 40
+# Ancho medio máximo (px en la copia) de un trazo de texto
+MAX_STROKE_WIDTH = 12
+
+
+def _otsu_threshold(gray) -> float:
+    """Umbral de Otsu calculado sobre el histograma"""
+    import numpy as np
+
+    histogram = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    levels = np.arange(256)
+    weight_bg = np.cumsum(histogram)
+    weight_fg = weight_bg[-1] - weight_bg
+    sum_bg = np.cumsum(histogram * levels)
+    mean_bg = sum_bg / np.maximum(weight_bg, 1)
+    mean_fg = (sum_bg[-1] - sum_bg) / np.maximum(weight_fg, 1)
+    variance = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+    return float(np.argmax(variance))
+
+
+def text_presence_score(gray) -> tuple[float, Optional[str]]:
+    """
+    Puntúa la probabilidad de que una imagen contenga texto
+
+    Args:
+        gray: ndarray 2D uint8 (copia reducida en gris)
+
+    Returns:
+        Tupla (fracción de filas con trazos de texto, motivo si es evidente
+        que no hay texto o None)
+    """
+    import numpy as np
+
+    gray = np.asarray(gray, dtype=np.uint8)
+    if gray.size == 0 or gray.std() < MIN_CONTRAST:
+        return 0.0, "imagen uniforme (en blanco)"
+
+    signed = gray.astype(np.int16)
+    edges = (np.abs(np.diff(signed, axis=1)) > EDGE_STEP).mean()
+    if edges < 0.001:
+        return 0.0, "sin bordes nítidos"
+
+    ink = gray < _otsu_threshold(gray)
+    # La tinta es la clase minoritaria (texto claro sobre fondo oscuro)
+    if ink.mean() > 0.5:
+        ink = ~ink
+
+    # Por fila: transiciones tinta/fondo y ancho medio de los tramos de tinta
+    transitions = np.count_nonzero(np.diff(ink.astype(np.int8), axis=1), axis=1)
+    ink_pixels = ink.sum(axis=1)
+    runs = np.maximum(transitions / 2.0, 1.0)
+    stroke_width = ink_pixels / runs
+    coverage = ink_pixels / ink.shape[1]
+
+    text_rows = (
+        (transitions >= 4)
+        & (stroke_width <= MAX_STROKE_WIDTH)
+        & (coverage > 0.005) & (coverage < 0.6)
+    )
+    score = float(text_rows.mean())
+    return score, None if score > 0 else "sin trazos de texto"
+
+
+class TextPresenceFilter:
+    """Decide si vale la pena ejecutar el OCR sobre una imagen"""
+
+    def __init__(self, threshold: float = DEFAULT_PRESENCE_THRESHOLD, side: int = PRESENCE_SIDE):
+        """
+        Args:
+            threshold: Fracción mínima de filas con trazos de texto (0 = no filtrar)
+            side: Lado de la copia reducida analizada
+        """
+        self.threshold = threshold
+        self.side = side
+
+    def analyze(self, source) -> tuple[bool, float, str]:
+        """
+        Analiza una imagen
+
+        Args:
+            source: Ruta, bytes del archivo ya leídos (los JPEG se decodifican
+                reducidos), ndarray o PIL.Image
+
+        Returns:
+            Tupla (tiene_texto, puntuación, motivo del descarte o cadena vacía)
+        """
+        import numpy as np
+
+        if self.threshold <= 0:
+            return True, 1.0, ""
+
+        proxy, _ = grey_proxy(source, self.side)
+        score, reason = text_presence_score(np.asarray(proxy))
+        if score >= self.threshold:
+            return True, score, ""
+        return False, score, reason or f"poca estructura de texto ({score:.3f} < {self.threshold})"
@@ -0,0 +1,216 @@
+"""
+OCR por mosaicos para escaneos muy grandes
+La imagen se corta en mosaicos solapados que se procesan en paralelo; las
+cajas de texto se fusionan en las costuras y se descartan los duplicados.
+El trabajo del detector queda acotado por el tamaño del mosaico y no por el
+de la imagen (tampoco se reduce la imagen completa al canvas de CRAFT).
+La imagen completa sí se decodifica una vez (la ingesta la comparten la
+vista previa, la orientación y la normalización, y PIL no decodifica JPEG
+por zonas): lo acotado por mosaico es la memoria de trabajo del detector y
+del reconocedor, no el buffer de la imagen.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Optional
+
+from ..domain.cancellation import CancellationToken, check_cancelled
+from .ingestion import as_pil
+
+# Lado máximo que CRAFT procesa sin reducir la imagen (canvas_size de readtext)
+DETECTOR_CANVAS_SIZE = 2560
+DEFAULT_TILE_SIZE = 2048
+DEFAULT_OVERLAP = 256
+
+
+def needs_tiling(width: int, height: int, canvas_size: int = DETECTOR_CANVAS_SIZE) -> bool:
+    """Indica si la imagen se reduciría en el detector y conviene procesarla por mosaicos"""
+    return max(width, height) > canvas_size
+
+
+def iter_tiles(width: int, height: int, tile_size: int = DEFAULT_TILE_SIZE,
+               overlap: int = DEFAULT_OVERLAP) -> list[tuple[int, int, int, int]]:
+    """
+    Calcula los mosaicos solapados que cubren la imagen
+
+    Returns:
+        Lista de (izquierda, arriba, derecha, abajo)
+    """
+    step = max(1, tile_size - overlap)
+
+    def starts(length):
+        positions = list(range(0, max(1, length - overlap), step))
+        # El último mosaico se alinea al borde para no dejar franjas pequeñas
+        if positions[-1] + tile_size < length:
+            positions.append(length - tile_size)
+        return [max(0, p) for p in positions]
+
+    return [
+        (x, y, min(x + tile_size, width), min(y + tile_size, height))
+        for y in starts(height)
+        for x in starts(width)
+    ]
+
+
+def _bounds(box) -> tuple[float, float, float, float]:
+    xs = [point[0] for point in box]
+    ys = [point[1] for point in box]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _area(bounds) -> float:
+    return max(0.0, bounds[2] - bounds[0]) * max(0.0, bounds[3] - bounds[1])
+
+
+def _intersection(a, b) -> float:
+    return _area((max(a[0], b[0]), max(a[1], b[1]), min(a[2], b[2]), min(a[3], b[3])))
+
+
+def _merge_text(left: str, right: str) -> str:
+    """Une dos lecturas parciales eliminando el fragmento repetido en la costura"""
+    for size in range(min(len(left), len(right)), 1, -1):
+        if left[-size:] == right[:size]:
+            return left + right[size:]
+    return f"{left} {right}"
+
+
+class TiledOCREngine:
+    """Ejecuta readtext por mosaicos y fusiona los resultados"""
+
+    def __init__(self, reader, tile_size: int = DEFAULT_TILE_SIZE, overlap: int = DEFAULT_OVERLAP,
+                 workers: int = 2, readtext_options: Optional[dict] = None):
+        """
+        Args:
+            reader: Lector con readtext (easyocr.Reader u OnnxOCRAdapter)
+            tile_size: Lado de cada mosaico en píxeles
+            overlap: Solapamiento entre mosaicos (mayor que la altura de una línea)
+            workers: Mosaicos procesados en paralelo (acota la memoria de trabajo
+                del detector, que se suma al buffer de la imagen completa)
+            readtext_options: Argumentos extra de readtext
+        """
+        self.reader = reader
+        self.tile_size = tile_size
+        self.overlap = min(overlap, tile_size // 2)
+        self.workers = max(1, workers)
+        self.readtext_options = dict(readtext_options or {})
+
+    def _read_tile(self, source, tile: tuple, cancel_token: Optional[CancellationToken] = None) -> list:
+        """Lee un mosaico y traslada sus cajas a coordenadas de la imagen"""
+        import numpy as np
+
+        check_cancelled(cancel_token)
+        left, top, right, bottom = tile
+        # Solo el mosaico se copia a un ndarray
+        array = np.asarray(source.crop(tile))
+        results = self.reader.readtext(array, detail=1, paragraph=False, **self.readtext_options)
+
+        lines = []
+        for box, text, confidence in results:
+            box = [[float(x) + left, float(y) + top] for x, y in box]
+            bounds = _bounds(box)
+            # Una caja que toca un borde interior del mosaico puede estar cortada
+            cut = (
+                (left > 0 and bounds[0] - left <= 2)
+                or (top > 0 and bounds[1] - top <= 2)
+                or (right < source.width and right - bounds[2] <= 2)
+                or (bottom < source.height and bottom - bounds[3] <= 2)
+            )
+            lines.append({'box': box, 'bounds': bounds, 'text': text,
+                          'confidence': confidence, 'cut': cut})
+        return lines
+
+    def _deduplicate(self, lines: list) -> list:
+        """Elimina duplicados de las zonas solapadas y une líneas cortadas en la costura"""
+        # Preferir lecturas completas, luego las más largas y con más confianza
+        lines.sort(key=lambda l: (not l['cut'], _area(l['bounds']), l['confidence']), reverse=True)
+        kept = []
+        for line in lines:
+            duplicate = False
+            for other in kept:
+                inter = _intersection(line['bounds'], other['bounds'])
+                smaller = min(_area(line['bounds']), _area(other['bounds'])) or 1.0
+                if inter / smaller > 0.5:
+                    duplicate = True
+                    break
+                if inter > 0 and (line['cut'] or other['cut']) and self._same_row(line, other):
+                    self._join(other, line)
+                    duplicate = True
+                    break
+            if not duplicate:
+                kept.append(line)
+        return kept
+
+    @staticmethod
+    def _same_row(a: dict, b: dict) -> bool:
+        overlap = min(a['bounds'][3], b['bounds'][3]) - max(a['bounds'][1], b['bounds'][1])
+        height = min(a['bounds'][3] - a['bounds'][1], b['bounds'][3] - b['bounds'][1]) or 1.0
+        return overlap / height > 0.5
+
+    @staticmethod
+    def _join(target: dict, piece: dict) -> None:
+        """Fusiona piece en target (misma fila, solapadas horizontalmente)"""
+        first, second = (target, piece) if target['bounds'][0] <= piece['bounds'][0] else (piece, target)
+        text = _merge_text(first['text'], second['text'])
+        bounds = (
+            min(target['bounds'][0], piece['bounds'][0]), min(target['bounds'][1], piece['bounds'][1]),
+            max(target['bounds'][2], piece['bounds'][2]), max(target['bounds'][3], piece['bounds'][3]),
+        )
+        target.update({
+            'text': text,
+            'bounds': bounds,
+            'box': [[bounds[0], bounds[1]], [bounds[2], bounds[1]], [bounds[2], bounds[3]], [bounds[0], bounds[3]]],
+            'confidence': min(target['confidence'], piece['confidence']),
+            'cut': target['cut'] and piece['cut'],
+        })
+
+    def iter_tile_lines(self, image, cancel_token: Optional[CancellationToken] = None) -> Iterator[tuple]:
+        """
+        Lee los mosaicos en paralelo y entrega cada uno en cuanto termina (en orden)
+
+        Args:
+            image: Ruta, ndarray o PIL.Image
+            cancel_token: Token consultado antes de cada mosaico
+
+        Yields:
+            Tuplas (líneas del mosaico sin fusionar, mosaicos leídos, total)
+        """
+        # Sobre el buffer ya decodificado: solo cada mosaico se copia a un ndarray
+        source = as_pil(image)
+        if source.mode != 'RGB':
+            source = source.convert('RGB')
+
+        tiles = iter_tiles(source.width, source.height, self.tile_size, self.overlap)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results = executor.map(lambda tile: self._read_tile(source, tile, cancel_token), tiles)
+            for done, tile_lines in enumerate(results, 1):
+                yield tile_lines, done, len(tiles)
+
+    def merge(self, lines: list, detail: int = 0, paragraph: bool = True) -> list:
+        """Fusiona las líneas de todos los mosaicos con la salida de readtext"""
+        lines = self._deduplicate(lines)
+        lines.sort(key=lambda l: (l['bounds'][1], l['bounds'][0]))
+        result = [(l['box'], l['text'], l['confidence']) for l in lines]
+
+        if paragraph:
+            from easyocr.utils import get_paragraph
+            result = get_paragraph(result, x_ths=1.0, y_ths=0.5)
+        if detail == 0:
+            return [item[1] for item in result]
+        return result
+
+    def readtext(self, image, detail: int = 0, paragraph: bool = True,
+                 cancel_token: Optional[CancellationToken] = None) -> list:
+        """
+        Extrae el texto de una imagen grande por mosaicos
+
+        Args:
+            image: Ruta, ndarray o PIL.Image
+            detail: 0 = solo textos, 1 = (caja, texto, confianza)
+            paragraph: Si agrupar las líneas en párrafos
+            cancel_token: Token consultado antes de cada mosaico
+
+        Returns:
+            Salida equivalente a readtext
+        """
+        lines = []
+        for tile_lines, _, _ in self.iter_tile_lines(image, cancel_token):
+            lines.extend(tile_lines)
+        return self.merge(lines, detail, paragraph)
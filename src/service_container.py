@@ -1,7 +1,14 @@
 """
 Inyección de dependencias - Contenedor de servicios
-Centraliza la creación de instancias de los casos de uso
+Centraliza la creación de instancias de los casos de uso.
+Cada servicio se registra con una fábrica que se ejecuta solo la primera
+vez que se solicita (construcción diferida y segura entre hilos).
 """
+import importlib.util
+import threading
+from functools import partial
+from typing import Callable, Iterable, Optional
+
 from .domain.repositories import (
     TextExtractionRepository,
     ConfigurationRepository,
@@ -10,6 +17,7 @@ from .domain.repositories import (
 )
 from .application.extraction_usecase import ExtractTextUseCase, ExtractBatchUseCase
 from .application.export_usecase import ExportTextUseCase
+from .application.async_usecase import AsyncExtractionService
 from .application.image_usecase import (
     RotateImageUseCase,
     AdjustBrightnessUseCase,
@@ -22,19 +30,26 @@ from .application.configuration_usecase import (
     UpdateThemeUseCase
 )
 
+# EasyOCR (y torch) solo se importan cuando se construye el adaptador OCR
+EASYOCR_AVAILABLE = importlib.util.find_spec('easyocr') is not None
+ONNXRUNTIME_AVAILABLE = importlib.util.find_spec('onnxruntime') is not None
+
 # Importaciones condicionales con manejo de errores
 try:
-    from .infrastructure.ocr_adapter import EasyOCRAdapter
-    EASYOCR_AVAILABLE = True
+    from .infrastructure.configuration_adapter import (
+        FileConfigurationAdapter,
+        ExtractionHistoryAdapter,
+        PerformanceSettingsAdapter
+    )
 except ImportError:
-    EASYOCR_AVAILABLE = False
-    EasyOCRAdapter = None
+    FileConfigurationAdapter = None
+    ExtractionHistoryAdapter = None
+    PerformanceSettingsAdapter = None
 
 try:
-    from .infrastructure.configuration_adapter import FileConfigurationAdapter, ExtractionHistoryAdapter
+    from .infrastructure.ingestion import ingest_image
 except ImportError:
-    FileConfigurationAdapter = None
-    ExtractionHistoryAdapter = None
+    ingest_image = None
 
 try:
     from .infrastructure.image_processor import PillowImageProcessor
@@ -49,114 +64,225 @@ except ImportError:
 
 class ServiceContainer:
     """Contenedor centralizado de inyección de dependencias"""
-    
+
     def __init__(self):
-        """Inicializa el contenedor de servicios"""
+        """Inicializa el contenedor de servicios (sin construir ninguno)"""
+        self._factories = {}
         self._instances = {}
+        self._locks = {}
+        self._lock = threading.Lock()
         self._register_repositories()
         self._register_usecases()
-    
+
+    def register(self, service_name: str, factory: Callable[[], object]) -> None:
+        """
+        Registra la fábrica de un servicio
+
+        Args:
+            service_name: Nombre del servicio
+            factory: Función sin argumentos que construye la instancia
+                (puede retornar None si las dependencias no están disponibles)
+        """
+        with self._lock:
+            self._factories[service_name] = factory
+            self._instances.pop(service_name, None)
+            self._locks.setdefault(service_name, threading.Lock())
+
     def _register_repositories(self):
         """Registra las implementaciones de repositorios"""
-        # Registrar OCR adapter solo si está disponible
-        if EASYOCR_AVAILABLE and EasyOCRAdapter:
-            try:
-                self._instances['ocr_repository'] = EasyOCRAdapter(
-                    languages=['en', 'es'],
-                    gpu=False,
-                    detail=0
-                )
-            except Exception as e:
-                print(f"Warning: No se pudo inicializar EasyOCRAdapter: {e}")
-                self._instances['ocr_repository'] = None
-        else:
-            print("Warning: EasyOCR no está disponible, OCR deshabilitado")
-            self._instances['ocr_repository'] = None
-        
+        self.register('ocr_repository', self._create_ocr_repository)
+
         # Registrar otros adapters
         if FileConfigurationAdapter:
-            self._instances['config_repository'] = FileConfigurationAdapter('config.json')
-        
+            self.register('config_repository', lambda: FileConfigurationAdapter('config.json'))
+
         if PillowImageProcessor:
-            self._instances['image_processor'] = PillowImageProcessor()
-        
+            self.register('image_processor', PillowImageProcessor)
+
         if MultiFormatExporter:
-            self._instances['export_repository'] = MultiFormatExporter()
-        
+            self.register('export_repository', MultiFormatExporter)
+
         if ExtractionHistoryAdapter:
-            self._instances['history_adapter'] = ExtractionHistoryAdapter('extraction_history.json')
-    
+            self.register('history_adapter', lambda: ExtractionHistoryAdapter('extraction_history.json'))
+
+    def _create_ocr_repository(self) -> Optional[TextExtractionRepository]:
+        """Construye el adaptador OCR según el motor configurado (carga el modelo)"""
+        if not EASYOCR_AVAILABLE:
+            print("Warning: EasyOCR no está disponible, OCR deshabilitado")
+            return None
+
+        performance = PerformanceSettingsAdapter('config.json').get_settings() if PerformanceSettingsAdapter else None
+        backend = 'easyocr'
+        languages = ['en', 'es']
+        if FileConfigurationAdapter:
+            configuration = FileConfigurationAdapter('config.json').get_configuration()
+            backend = configuration.ocr_backend
+            languages = configuration.ocr_languages or languages
+
+        if backend == 'onnx':
+            if ONNXRUNTIME_AVAILABLE:
+                try:
+                    from .infrastructure.onnx_ocr_adapter import OnnxOCRAdapter
+                    # Los modelos ONNX se exportan para un conjunto fijo de idiomas
+                    return OnnxOCRAdapter(
+                        languages=[lang for lang in languages if lang != 'auto'] or ['en', 'es'],
+                        detail=0,
+                        performance=performance
+                    )
+                except Exception as e:
+                    print(f"Warning: No se pudo inicializar OnnxOCRAdapter, se usa EasyOCR: {e}")
+            else:
+                print("Warning: onnxruntime no está disponible, se usa EasyOCR")
+
+        try:
+            from .infrastructure.ocr_adapter import EasyOCRAdapter
+            return EasyOCRAdapter(
+                languages=languages,
+                gpu=False,
+                detail=0,
+                performance=performance
+            )
+        except Exception as e:
+            print(f"Warning: No se pudo inicializar EasyOCRAdapter: {e}")
+            return None
+
     def _register_usecases(self):
         """Registra los casos de uso"""
-        ocr_repo = self._instances.get('ocr_repository')
-        export_repo = self._instances.get('export_repository')
-        image_proc = self._instances.get('image_processor')
-        
         # Casos de extracción (solo si OCR está disponible)
-        if ocr_repo:
-            self._instances['extract_text_usecase'] = ExtractTextUseCase(ocr_repo)
-            self._instances['extract_batch_usecase'] = ExtractBatchUseCase(ocr_repo)
-        else:
-            print("Warning: Casos de extracción OCR no disponibles")
-            self._instances['extract_text_usecase'] = None
-            self._instances['extract_batch_usecase'] = None
-        
+        # La ingesta valida y decodifica una sola vez; el buffer llega hasta readtext
+        self.register('extract_text_usecase', self._create_extract_text_usecase)
+        self.register('extract_batch_usecase', self._usecase(ExtractBatchUseCase, 'ocr_repository'))
+
         # Caso de exportación
-        if export_repo:
-            self._instances['export_text_usecase'] = ExportTextUseCase(export_repo)
-        else:
-            print("Warning: Caso de exportación no disponible")
-            self._instances['export_text_usecase'] = None
-        
+        self.register('export_text_usecase', self._usecase(ExportTextUseCase, 'export_repository'))
+
+        # Fachada asyncio (la exportación es opcional)
+        self.register('async_extraction_service', self._create_async_service)
+
         # Casos de procesamiento de imagen
-        if image_proc:
-            self._instances['rotate_image_usecase'] = RotateImageUseCase(image_proc)
-            self._instances['adjust_brightness_usecase'] = AdjustBrightnessUseCase(image_proc)
-            self._instances['adjust_contrast_usecase'] = AdjustContrastUseCase(image_proc)
-            self._instances['crop_image_usecase'] = CropImageUseCase(image_proc)
-        else:
-            print("Warning: Casos de procesamiento de imagen no disponibles")
-            self._instances['rotate_image_usecase'] = None
-            self._instances['adjust_brightness_usecase'] = None
-            self._instances['adjust_contrast_usecase'] = None
-            self._instances['crop_image_usecase'] = None
-        
-        config_repo = self._instances.get('config_repository')
-        
+        self.register('rotate_image_usecase', self._usecase(RotateImageUseCase, 'image_processor'))
+        self.register('adjust_brightness_usecase', self._usecase(AdjustBrightnessUseCase, 'image_processor'))
+        self.register('adjust_contrast_usecase', self._usecase(AdjustContrastUseCase, 'image_processor'))
+        self.register('crop_image_usecase', self._usecase(CropImageUseCase, 'image_processor'))
+
         # Casos de configuración
-        if config_repo:
-            self._instances['get_config_usecase'] = GetConfigurationUseCase(config_repo)
-            self._instances['save_config_usecase'] = SaveConfigurationUseCase(config_repo)
-            self._instances['update_theme_usecase'] = UpdateThemeUseCase(config_repo)
-        else:
-            print("Warning: Casos de configuración no disponibles")
-            self._instances['get_config_usecase'] = None
-            self._instances['save_config_usecase'] = None
-            self._instances['update_theme_usecase'] = None
-    
+        self.register('get_config_usecase', self._usecase(GetConfigurationUseCase, 'config_repository'))
+        self.register('save_config_usecase', self._usecase(SaveConfigurationUseCase, 'config_repository'))
+        self.register('update_theme_usecase', self._usecase(UpdateThemeUseCase, 'config_repository'))
+
+    def _create_extract_text_usecase(self) -> Optional[ExtractTextUseCase]:
+        """Caso de extracción con ingesta única, caché por contenido y casi duplicados"""
+        repository = self._get_optional('ocr_repository')
+        if repository is None:
+            print("Warning: ExtractTextUseCase no disponible (falta ocr_repository)")
+            return None
+
+        result_cache = cache_params = near_duplicates = None
+        if PerformanceSettingsAdapter and FileConfigurationAdapter:
+            from .infrastructure.result_cache import engine_params, get_result_cache
+            from .infrastructure.perceptual_index import get_near_duplicate_index
+
+            performance = PerformanceSettingsAdapter('config.json').get_settings()
+            configuration = FileConfigurationAdapter('config.json').get_configuration()
+            result_cache = get_result_cache(performance)
+            cache_params = engine_params(performance, configuration.ocr_languages or ['en', 'es'],
+                                         backend=configuration.ocr_backend)
+            near_duplicates = get_near_duplicate_index(result_cache, performance)
+        # Sin decodificar al cargar: el adaptador decodifica una vez a la escala del OCR
+        image_loader = partial(ingest_image, decode=False) if ingest_image else None
+        return ExtractTextUseCase(repository, image_loader=image_loader, result_cache=result_cache,
+                                  cache_params=cache_params, near_duplicates=near_duplicates)
+
+    def _create_async_service(self) -> Optional[AsyncExtractionService]:
+        """Construye la fachada asyncio sobre los casos de extracción y exportación"""
+        extract_use_case = self._get_optional('extract_text_usecase')
+        if extract_use_case is None:
+            print("Warning: AsyncExtractionService no disponible (falta extract_text_usecase)")
+            return None
+        return AsyncExtractionService(extract_use_case, self._get_optional('export_text_usecase'))
+
+    def _usecase(self, usecase_class, dependency: str, **options) -> Callable[[], object]:
+        """Crea la fábrica de un caso de uso que depende de un repositorio (options: argumentos extra)"""
+        def factory():
+            repository = self._get_optional(dependency)
+            if repository is None:
+                print(f"Warning: {usecase_class.__name__} no disponible (falta {dependency})")
+                return None
+            return usecase_class(repository, **options)
+        return factory
+
+    def _get_optional(self, service_name: str):
+        """Obtiene un servicio o None si no está registrado o disponible"""
+        try:
+            return self.get(service_name)
+        except ValueError:
+            return None
+
     def get(self, service_name: str):
-        """Obtiene una instancia de servicio por nombre"""
-        if service_name not in self._instances:
-            raise ValueError(f"Servicio no encontrado: {service_name}")
-        
-        service = self._instances[service_name]
+        """Obtiene una instancia de servicio por nombre, construyéndola si es necesario"""
+        with self._lock:
+            if service_name not in self._factories:
+                raise ValueError(f"Servicio no encontrado: {service_name}")
+            if service_name in self._instances:
+                service = self._instances[service_name]
+                if service is None:
+                    raise ValueError(f"Servicio no disponible (dependencias faltantes): {service_name}")
+                return service
+            service_lock = self._locks[service_name]
+            factory = self._factories[service_name]
+
+        # Inicialización única: los demás hilos esperan a la primera construcción
+        with service_lock:
+            with self._lock:
+                built = service_name in self._instances
+                service = self._instances.get(service_name)
+            if not built:
+                service = factory()
+                with self._lock:
+                    self._instances[service_name] = service
+
         if service is None:
             raise ValueError(f"Servicio no disponible (dependencias faltantes): {service_name}")
-        
+
         return service
-    
+
+    def is_initialized(self, service_name: str) -> bool:
+        """Indica si el servicio ya fue construido"""
+        with self._lock:
+            return self._instances.get(service_name) is not None
+
+    def warm(self, service_names: Optional[Iterable[str]] = None) -> dict:
+        """
+        Precarga servicios para que la primera solicitud no pague su construcción
+
+        Args:
+            service_names: Nombres a precargar (None = todos los registrados)
+
+        Returns:
+            Diccionario {nombre: True si quedó disponible}
+        """
+        if service_names is None:
+            with self._lock:
+                service_names = list(self._factories)
+
+        return {name: self._get_optional(name) is not None for name in service_names}
+
     def get_all(self) -> dict:
-        """Obtiene todos los servicios registrados"""
-        return self._instances.copy()
+        """Obtiene todos los servicios registrados (construye los pendientes)"""
+        self.warm()
+        with self._lock:
+            return self._instances.copy()
 
 
 # Instancia única del contenedor
 _container = None
+_container_lock = threading.Lock()
 
 
 def get_service_container() -> ServiceContainer:
     """Obtiene o crea la instancia única del contenedor"""
     global _container
-    if _container is None:
-        _container = ServiceContainer()
-    return _container
+    with _container_lock:
+        if _container is None:
+            _container = ServiceContainer()
+        return _container
@@ -0,0 +1,283 @@
+"""
+Carpeta vigilada: extracción incremental sin interfaz gráfica
+Vigila una carpeta (inotify en Linux, sondeo en el resto o con --sondeo) y
+extrae solo las imágenes nuevas o modificadas, una vez que dejaron de
+cambiar durante --espera segundos. Un manifiesto (ruta, tamaño, mtime, hash)
+→ salida en <salida>/.manifiesto.sqlite3 evita volver a leer lo ya
+procesado al reiniciar, y una salida cuyo texto no cambió no se reescribe.
+
+Uso:
+    python -m src.watch escaneos/ --salida textos/ --formato txt
+    python -m src.watch //servidor/escaneos --sondeo --recursivo
+    python -m src.watch escaneos/ --una-vez   # procesa lo pendiente y sale
+
+Códigos de salida: los de src.cli (con --una-vez, EXIT_FAILURES si alguna
+imagen falló); Ctrl+C detiene la vigilancia con 0
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Optional
+
+from .application.export_usecase import ExportFormat
+from .cli import EXIT_FAILURES, EXIT_OK, EXIT_UNAVAILABLE, EXIT_USAGE, export_text, output_path_for
+from .domain.cancellation import CancellationToken
+from .infrastructure.folder_watcher import (SettleTracker, WatchManifest, create_watcher,
+                                            file_signature, scan_folder)
+from .infrastructure.ingestion import read_image_bytes
+from .infrastructure.result_cache import digest_bytes
+from .infrastructure.security import SecurityValidator
+
+# Nombre del manifiesto dentro de la carpeta de salida
+MANIFEST_NAME = '.manifiesto.sqlite3'
+
+
+class _TakenOutputs:
+    """Salidas de otras imágenes con la interfaz de conjunto que espera output_path_for"""
+
+    def __init__(self, manifest: WatchManifest, exclude: str):
+        self.manifest = manifest
+        self.exclude = exclude
+
+    def __contains__(self, output: str) -> bool:
+        return self.manifest.output_taken(output, self.exclude)
+
+    def add(self, output: str) -> None:
+        # La salida elegida queda registrada al guardar la entrada del manifiesto
+        pass
+
+
+class HotFolder:
+    """Extrae y exporta las imágenes nuevas o modificadas de una carpeta"""
+
+    def __init__(self, container, root: str, format: ExportFormat, output_dir: str,
+                 manifest: WatchManifest, recursive: bool = False, settle: float = 2.0,
+                 poll_interval: float = 2.0, polling: bool = False,
+                 image_timeout: Optional[float] = None, result_cache=None):
+        """
+        Args:
+            container: ServiceContainer con los casos de uso
+            root: Carpeta vigilada
+            format: Formato de exportación
+            output_dir: Carpeta de salida (se crea si no existe)
+            manifest: Manifiesto de lo ya procesado
+            recursive: Si incluir subcarpetas
+            settle: Segundos sin cambios de tamaño ni mtime antes de procesar un archivo
+            poll_interval: Segundos entre sondeos cuando no hay inotify
+            polling: Forzar el sondeo (recursos de red que no notifican cambios)
+            image_timeout: Segundos máximos por imagen (None = sin límite)
+            result_cache: ResultCache opcional; reutiliza sus digests memorizados
+        """
+        self.container = container
+        self.root = os.path.abspath(root)
+        self.format = format
+        self.output_dir = output_dir
+        self.manifest = manifest
+        self.recursive = recursive
+        self.poll_interval = poll_interval
+        self.polling = polling
+        self.image_timeout = image_timeout
+        self.result_cache = result_cache
+        self.tracker = SettleTracker(settle)
+        self.cancel_token = CancellationToken()
+
+    def _digest(self, image_path: str) -> str:
+        if self.result_cache is not None:
+            return self.result_cache.image_digest(image_path)
+        return digest_bytes(read_image_bytes(image_path))
+
+    def pending_paths(self) -> list[str]:
+        """Imágenes de la carpeta que no están en el manifiesto con su tamaño y mtime actuales"""
+        return [path for path in scan_folder(self.root, self.recursive) if not self.manifest.is_current(path)]
+
+    def process(self, image_path: str) -> Optional[dict]:
+        """
+        Extrae y exporta una imagen estable, actualizando el manifiesto
+
+        Returns:
+            Registro con image, status (completed, unchanged o failed), output,
+            characters, seconds y error; None si la imagen ya estaba al día o
+            desapareció
+        """
+        signature = file_signature(image_path)
+        if signature is None:
+            return None
+        entry = self.manifest.get(image_path)
+        if entry is not None and (entry['size'], entry['mtime_ns']) == signature:
+            return None
+
+        record = {'image': image_path, 'status': 'pending', 'output': None,
+                  'characters': 0, 'seconds': 0.0, 'error': None}
+        start = time.perf_counter()
+        digest = None
+        try:
+            digest = self._digest(image_path)
+            output = entry['output'] if entry else None
+            if output and not output.endswith(f".{self.format.value}"):
+                # Se cambió de formato: la salida anterior no sirve
+                output = None
+            if (entry is not None and entry['status'] != 'failed' and entry['digest'] == digest
+                    and (entry['output'] is None or (output is not None and os.path.exists(output)))):
+                # Solo cambió el mtime (copia, touch): el contenido ya se procesó
+                record.update(status='unchanged', output=output)
+                self.manifest.record(image_path, signature, 'unchanged', digest, entry['text_digest'], output)
+                return record
+
+            result = self.container.get('extract_text_usecase').execute(
+                image_path, cancel_token=self.cancel_token.with_timeout(self.image_timeout))
+            text = result.text
+            is_valid, error = SecurityValidator.validate_text_input(text)
+            if not is_valid:
+                raise ValueError(f"Texto extraído inválido: {error}")
+            record['characters'] = len(text)
+            text_digest = digest_bytes(text.encode('utf-8'))
+
+            if not text.strip():
+                # Sin texto no hay archivo que escribir (la imagen igual se procesó)
+                output = None
+                record['status'] = 'completed'
+            elif entry is not None and entry['text_digest'] == text_digest and output and os.path.exists(output):
+                # El texto no cambió: la salida existente se conserva sin reescribirla
+                record['status'] = 'unchanged'
+            else:
+                if not output:
+                    output = output_path_for(image_path, self.output_dir, self.format,
+                                             _TakenOutputs(self.manifest, image_path))
+                export_text(self.container, text, output, self.format)
+                record['status'] = 'completed'
+            record['output'] = output
+            self.manifest.record(image_path, signature, record['status'], digest, text_digest, output)
+        except Exception as e:
+            # Incluye archivos truncados y DeadlineExceeded: se reintenta cuando el archivo cambie
+            record['status'] = 'failed'
+            record['error'] = str(e)
+            self.manifest.record(image_path, signature, 'failed', digest,
+                                 entry['text_digest'] if entry else None,
+                                 entry['output'] if entry else None, str(e))
+        record['seconds'] = round(time.perf_counter() - start, 3)
+        return record
+
+    def run(self, once: bool = False):
+        """
+        Procesa lo pendiente y luego vigila la carpeta hasta cancel_token.cancel()
+
+        Args:
+            once: Procesar solo lo pendiente al arrancar y terminar
+
+        Yields:
+            Un registro por imagen procesada (ver process)
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        # El vigilante se crea antes de listar: lo que llegue mientras tanto no se pierde
+        watcher = None if once else create_watcher(self.root, self.recursive, self.poll_interval, self.polling)
+        try:
+            for image_path in self.pending_paths():
+                self.tracker.touch(image_path)
+            while not self.cancel_token.cancelled:
+                for image_path in self.tracker.ready():
+                    record = self.process(image_path)
+                    if record is not None:
+                        yield record
+                    if self.cancel_token.cancelled:
+                        return
+                deadline = self.tracker.next_deadline()
+                if watcher is None:
+                    if deadline is None:
+                        return
+                    time.sleep(deadline)
+                    continue
+                timeout = self.poll_interval if deadline is None else min(deadline, self.poll_interval)
+                for image_path in watcher.changes(timeout):
+                    self.tracker.touch(image_path)
+                if getattr(watcher, 'overflowed', False):
+                    # Se perdieron eventos: se vuelve a listar (sin leer lo que está al día)
+                    watcher.overflowed = False
+                    for image_path in self.pending_paths():
+                        self.tracker.touch(image_path)
+        finally:
+            if watcher is not None:
+                watcher.close()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m src.watch',
+                                     description="Extrae el texto de las imágenes que llegan a una carpeta")
+    parser.add_argument("carpeta", help="Carpeta vigilada")
+    parser.add_argument("--recursivo", action="store_true", help="Incluir subcarpetas")
+    parser.add_argument("--formato", choices=[format.value for format in ExportFormat], default="txt")
+    parser.add_argument("--salida", default="textos", help="Carpeta de salida (por defecto ./textos)")
+    parser.add_argument("--manifiesto", default=None,
+                        help=f"Manifiesto de lo procesado (por defecto <salida>/{MANIFEST_NAME})")
+    parser.add_argument("--espera", type=float, default=None,
+                        help="Segundos sin cambios antes de procesar un archivo (por defecto watch_settle_seconds)")
+    parser.add_argument("--sondeo", action="store_true",
+                        help="Vigilar por sondeo en lugar de inotify (recursos de red)")
+    parser.add_argument("--intervalo", type=float, default=None,
+                        help="Segundos entre sondeos (por defecto watch_poll_seconds)")
+    parser.add_argument("--plazo", type=float, default=None,
+                        help="Segundos máximos por imagen (por defecto image_timeout_seconds)")
+    parser.add_argument("--una-vez", action="store_true", help="Procesar lo pendiente y salir")
+    parser.add_argument("--resumen", default=None,
+                        help="Registro JSONL que se amplía (por defecto <salida>/vigilancia.jsonl; '-' = stdout)")
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Punto de entrada; retorna el código de salida"""
+    args = build_parser().parse_args(argv)
+    if not os.path.isdir(args.carpeta):
+        print(f"No existe la carpeta {args.carpeta}", file=sys.stderr)
+        return EXIT_USAGE
+
+    from .infrastructure.configuration_adapter import PerformanceSettingsAdapter
+    from .infrastructure.result_cache import get_result_cache
+    from .service_container import get_service_container
+
+    performance = PerformanceSettingsAdapter('config.json').get_settings()
+    container = get_service_container()
+    if not all(container.warm(['extract_text_usecase', 'export_text_usecase']).values()):
+        return EXIT_UNAVAILABLE
+
+    os.makedirs(args.salida, exist_ok=True)
+    manifest = WatchManifest(args.manifiesto or os.path.join(args.salida, MANIFEST_NAME))
+    timeout = args.plazo if args.plazo is not None else performance.image_timeout_seconds
+    hot_folder = HotFolder(
+        container, args.carpeta, ExportFormat(args.formato), args.salida, manifest,
+        recursive=args.recursivo,
+        settle=args.espera if args.espera is not None else performance.watch_settle_seconds,
+        poll_interval=args.intervalo or performance.watch_poll_seconds,
+        polling=args.sondeo,
+        image_timeout=timeout or None,
+        result_cache=get_result_cache(performance)
+    )
+
+    summary_path = args.resumen or os.path.join(args.salida, 'vigilancia.jsonl')
+    summary = sys.stdout if summary_path == '-' else open(summary_path, 'a', encoding='utf-8')
+    counts = {'completed': 0, 'unchanged': 0, 'failed': 0}
+    if not args.una_vez:
+        print(f"Vigilando {hot_folder.root} (Ctrl+C para terminar)", file=sys.stderr)
+    try:
+        for record in hot_folder.run(once=args.una_vez):
+            counts[record['status']] += 1
+            summary.write(json.dumps(record, ensure_ascii=False) + '\n')
+            summary.flush()
+            if record['status'] == 'failed':
+                print(f"Error procesando {record['image']}: {record['error']}", file=sys.stderr)
+    except KeyboardInterrupt:
+        hot_folder.cancel_token.cancel()
+    finally:
+        if summary is not sys.stdout:
+            summary.close()
+        manifest.close()
+
+    print(f"{counts['completed']} exportadas, {counts['unchanged']} sin cambios, "
+          f"{counts['failed']} con error", file=sys.stderr)
+    if args.una_vez and counts['failed']:
+        return EXIT_FAILURES
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
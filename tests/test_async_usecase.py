@@ -0,0 +1,106 @@
+"""
+Fachada asyncio sobre ExtractTextUseCase con un repositorio de prueba:
+límite de extracciones en curso, cancelación cooperativa y uso desde varios
+bucles de eventos
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.application.async_usecase import AsyncExtractionService
+from src.application.extraction_usecase import ExtractTextUseCase
+from src.domain.entities import ExtractionResult, Image
+from src.domain.repositories import TextExtractionRepository
+
+
+class SlowRepository(TextExtractionRepository):
+    """Repositorio bloqueante que cuenta cuántas extracciones corren a la vez"""
+
+    def __init__(self, seconds=0.05):
+        self.seconds = seconds
+        self.running = 0
+        self.peak = 0
+        self.cancelled = []
+        self._lock = threading.Lock()
+
+    def extract_text(self, image, cancel_token=None):
+        image_path = image.path
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        try:
+            deadline = time.monotonic() + self.seconds
+            while time.monotonic() < deadline:
+                if cancel_token is not None and cancel_token.cancelled:
+                    self.cancelled.append(image_path)
+                    cancel_token.check()
+                time.sleep(0.005)
+            return ExtractionResult(text=image_path, confidence=1.0, image_path=image_path)
+        finally:
+            with self._lock:
+                self.running -= 1
+
+    def extract_text_batch(self, images, cancel_token=None):
+        return [self.extract_text(image, cancel_token) for image in images]
+
+
+def service_for(repository, max_extractions):
+    """Fachada sobre el caso de uso real; la carga no abre archivos"""
+    use_case = ExtractTextUseCase(
+        repository, image_loader=lambda path, data=None: Image(path=path, width=1, height=1, format='PNG'))
+    return AsyncExtractionService(use_case, max_extractions=max_extractions)
+
+
+async def collect(service, paths):
+    return [task async for task in service.extract_many(paths)]
+
+
+def test_extract_many_respects_concurrency_limit():
+    repository = SlowRepository()
+    service = service_for(repository, 2)
+    try:
+        tasks = asyncio.run(collect(service, [f"img{i}.png" for i in range(6)]))
+    finally:
+        service.close()
+    assert sorted(task.result.text for task in tasks) == [f"img{i}.png" for i in range(6)]
+    assert all(task.status == "completed" for task in tasks)
+    assert repository.peak == 2
+
+
+def test_service_works_across_event_loops():
+    repository = SlowRepository(seconds=0.01)
+    service = service_for(repository, 1)
+    try:
+        # Con cupos en disputa: un semáforo creado en otro bucle fallaría aquí
+        for _ in range(2):
+            tasks = asyncio.run(collect(service, ['a.png', 'b.png', 'c.png']))
+            assert [task.status for task in tasks] == ["completed"] * 3
+    finally:
+        service.close()
+    assert repository.peak == 1
+
+
+def test_cancelling_the_task_cancels_the_token_and_frees_the_slot():
+    repository = SlowRepository(seconds=5.0)
+    service = service_for(repository, 1)
+
+    async def scenario():
+        task = asyncio.ensure_future(service.extract('lenta.png'))
+        while not repository.running:
+            await asyncio.sleep(0.005)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # El hilo ya soltó el motor: el cupo está libre para la siguiente
+        assert repository.running == 0
+        repository.seconds = 0.0
+        return await asyncio.wait_for(service.extract('rapida.png'), timeout=2)
+
+    try:
+        result = asyncio.run(scenario())
+    finally:
+        service.close()
+    assert repository.cancelled == ['lenta.png']
+    assert result.text == 'rapida.png'
@@ -0,0 +1,52 @@
+"""
+Extracción por regiones: implementación por defecto del repositorio y
+ExtractTextUseCase.execute_regions
+"""
+import pytest
+
+from src.application.extraction_usecase import ExtractTextUseCase
+from src.domain.cancellation import CancellationToken, OperationCancelled
+from src.domain.entities import ExtractionResult, Image
+from src.domain.repositories import TextExtractionRepository
+
+np = pytest.importorskip('numpy')
+
+
+class ShapeRepository(TextExtractionRepository):
+    """Repositorio que solo implementa lo obligatorio y devuelve el tamaño recibido"""
+
+    def extract_text(self, image, cancel_token=None):
+        height, width = image.pixels.shape[:2]
+        return ExtractionResult(text=f"{width}x{height}", confidence=1.0, image_path=image.path)
+
+    def extract_text_batch(self, images, cancel_token=None):
+        return [self.extract_text(image, cancel_token) for image in images]
+
+
+def decoded(width=40, height=30):
+    return Image(path='pagina.png', width=width, height=height, format='PNG',
+                 pixels=np.zeros((height, width, 3), dtype=np.uint8))
+
+
+def test_default_regions_crop_and_call_extract_text():
+    results = ShapeRepository().extract_text_regions(decoded(), [(0, 0, 10, 5), (30, 20, 100, 100)])
+    assert [result.text for result in results] == ['10x5', '10x10']
+
+
+def test_default_regions_reject_empty_region():
+    with pytest.raises(ValueError):
+        ShapeRepository().extract_text_regions(decoded(), [(50, 50, 60, 60)])
+
+
+def test_default_regions_honour_cancel_token():
+    token = CancellationToken()
+    token.cancel()
+    with pytest.raises(OperationCancelled):
+        ShapeRepository().extract_text_regions(decoded(), [(0, 0, 10, 10)], token)
+
+
+def test_execute_regions_returns_one_result_per_region():
+    use_case = ExtractTextUseCase(ShapeRepository(), image_loader=lambda path, data=None: decoded())
+    results = use_case.execute_regions('otra.png', [(0, 0, 4, 4), (0, 0, 8, 6)])
+    assert [(result.text, result.image_path) for result in results] == [('4x4', 'otra.png'), ('8x6', 'otra.png')]
+    assert isinstance(use_case.execute('otra.png'), ExtractionResult)
@@ -0,0 +1,64 @@
+"""
+Ingesta sin decodificar y lote de EasyOCRAdapter: cada archivo se lee una
+sola vez y los bytes leídos llegan al motor
+"""
+import pytest
+
+from src.domain.entities import Image, PerformanceSettings
+from src.infrastructure import ocr_adapter, reader_registry
+from src.infrastructure.ingestion import file_reads, ingest_image, reset_file_reads
+from src.infrastructure.reader_registry import ReaderRegistry
+
+PILImage = pytest.importorskip('PIL.Image')
+
+
+class LoaderEngine:
+    """PooledRecognitionEngine que solo decodifica con el loader y devuelve una línea"""
+
+    def __init__(self, reader, loader=None, **options):
+        self.loader = loader
+        self.decoded = []
+
+    def readtext_batch(self, images, detail=0, cancel_token=None):
+        outputs = []
+        for image in images:
+            pixels = self.loader(image)
+            outputs.append([([[0, 0], [8, 0], [8, 8], [0, 8]], f"{pixels.shape[1]}x{pixels.shape[0]}", 0.9)])
+        return outputs
+
+
+@pytest.fixture
+def photos(tmp_path):
+    reset_file_reads()
+    paths = []
+    for index in range(3):
+        path = str(tmp_path / f"foto{index}.jpg")
+        PILImage.new('RGB', (64 + index, 48), 'white').save(path, 'JPEG')
+        paths.append(path)
+    yield paths
+    reset_file_reads()
+
+
+def test_ingest_without_decode_keeps_bytes_and_reads_once(photos):
+    image = ingest_image(photos[0], validate=False, decode=False)
+    assert (image.width, image.height, image.format) == (64, 48, 'JPEG')
+    assert image.pixels is None and image.source is image.data
+    assert file_reads[photos[0]] == 1
+
+
+def test_batch_reads_each_file_once(photos, monkeypatch):
+    pytest.importorskip('numpy')
+    pytest.importorskip('easyocr')
+    monkeypatch.setattr(reader_registry, '_registry', ReaderRegistry(reader_factory=lambda *key: object(),
+                                                                     size_of=lambda reader: 1))
+    monkeypatch.setattr(ocr_adapter, 'PooledRecognitionEngine', LoaderEngine)
+    adapter = ocr_adapter.EasyOCRAdapter(performance=PerformanceSettings(detect_orientation=False,
+                                                                         refine_threshold=0.0))
+
+    # Solo cabecera (como ExtractBatchUseCase) y bytes de la ingesta
+    images = [Image(path=photos[0], width=64, height=48, format='JPEG')]
+    images += [ingest_image(path, validate=False, decode=False) for path in photos[1:]]
+    results = adapter.extract_text_batch(images)
+
+    assert [result.text for result in results] == ['64x48', '65x48', '66x48']
+    assert all(file_reads[path] == 1 for path in photos)
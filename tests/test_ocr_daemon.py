@@ -0,0 +1,77 @@
+"""
+Demonio OCR por TCP: los POST solo se aceptan como JSON dirigido a localhost
+"""
+import http.client
+import json
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from src.infrastructure.ocr_daemon import _Handler, is_local_host
+
+
+class FakeDaemon:
+    """Demonio listo que responde sin motor OCR"""
+    ready = True
+    overloaded = False
+
+    def __init__(self):
+        self.exports = []
+
+    def extract(self, payload):
+        return {'text': 'hola'}
+
+    def export(self, payload):
+        self.exports.append(payload)
+        return {'ok': True}
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    server.ocr_daemon = FakeDaemon()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def post(server, path, body, headers):
+    connection = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=5)
+    try:
+        connection.putrequest('POST', path, skip_host=True)
+        for name, value in headers.items():
+            connection.putheader(name, value)
+        connection.putheader('Content-Length', str(len(body)))
+        connection.endheaders(body)
+        return connection.getresponse().status
+    finally:
+        connection.close()
+
+
+def test_local_json_post_is_accepted(server):
+    body = json.dumps({'text': 'x', 'path': 'a.txt', 'format': 'txt'}).encode()
+    port = server.server_address[1]
+    assert post(server, '/export', body, {'Host': f'127.0.0.1:{port}', 'Content-Type': 'application/json'}) == 200
+    assert post(server, '/extract', body, {'Host': 'localhost', 'Content-Type': 'application/json; charset=utf-8'}) == 200
+
+
+def test_form_post_from_a_web_page_is_rejected(server):
+    body = b'{"text": "x", "path": "/home/usuario/.bashrc", "format": "txt"}'
+    port = server.server_address[1]
+    assert post(server, '/export', body, {'Host': f'127.0.0.1:{port}', 'Content-Type': 'text/plain'}) == 415
+    assert post(server, '/export', body, {'Host': f'127.0.0.1:{port}'}) == 415
+    assert server.ocr_daemon.exports == []
+
+
+def test_rebound_host_is_rejected(server):
+    body = b'{}'
+    assert post(server, '/extract', body, {'Host': 'atacante.example:8765', 'Content-Type': 'application/json'}) == 403
+    assert post(server, '/extract', body, {'Content-Type': 'application/json'}) == 403
+
+
+def test_is_local_host():
+    assert is_local_host('localhost') and is_local_host('127.0.0.1:8765') and is_local_host('LOCALHOST:1')
+    assert not is_local_host(None) and not is_local_host('') and not is_local_host('127.0.0.1.example')
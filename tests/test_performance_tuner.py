@@ -0,0 +1,29 @@
+"""
+Ajuste automático: guardar el resultado no reinicia los parámetros que no
+se midieron
+"""
+import json
+
+from src.domain.entities import PerformanceSettings
+from src.infrastructure.configuration_adapter import PerformanceSettingsAdapter
+from src.infrastructure.performance_tuner import save_tuned_settings
+
+
+def test_tuner_save_keeps_untuned_fields(tmp_path):
+    config = tmp_path / 'config.json'
+    config.write_text(json.dumps({'theme': 'oscuro'}), encoding='utf-8')
+    adapter = PerformanceSettingsAdapter(str(config))
+    adapter.save_settings(PerformanceSettings(quantized_recognizer=False, refine_threshold=0.3,
+                                              result_cache_mb=64, watch_settle_seconds=7.5))
+
+    best = PerformanceSettings(process_workers=3, torch_threads=2, batch_size=8, recognizer_workers=1)
+    save_tuned_settings(str(config), best, extra={'images_per_second': 4.2})
+
+    saved = adapter.get_settings()
+    assert (saved.process_workers, saved.torch_threads, saved.batch_size, saved.recognizer_workers) == (3, 2, 8, 1)
+    assert not saved.quantized_recognizer
+    assert (saved.refine_threshold, saved.result_cache_mb, saved.watch_settle_seconds) == (0.3, 64, 7.5)
+
+    data = json.loads(config.read_text(encoding='utf-8'))
+    assert data['theme'] == 'oscuro'
+    assert data['ocr_performance']['images_per_second'] == 4.2
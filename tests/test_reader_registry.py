@@ -0,0 +1,127 @@
+"""
+Registro de lectores: una sola carga de modelo por clave
+(idiomas, gpu, directorio de modelos, cuantización)
+"""
+import pytest
+
+from src.domain.entities import PerformanceSettings
+from src.infrastructure import reader_registry
+from src.infrastructure.reader_registry import ReaderRegistry
+
+
+class CountingFactory:
+    """reader_factory que cuenta las cargas por clave en lugar de construir easyocr.Reader"""
+
+    def __init__(self):
+        self.loads = []
+
+    def __call__(self, languages, gpu, model_dir, quantize):
+        key = (languages, gpu, model_dir, quantize)
+        self.loads.append(key)
+        return object()
+
+    def count(self, key):
+        return self.loads.count(key)
+
+
+@pytest.fixture
+def factory(monkeypatch):
+    """Registro del proceso reemplazado por uno con la fábrica que cuenta"""
+    factory = CountingFactory()
+    monkeypatch.setattr(reader_registry, '_registry', ReaderRegistry(reader_factory=factory, size_of=lambda reader: 1))
+    return factory
+
+
+def test_same_key_loads_once_regardless_of_language_order(factory):
+    registry = reader_registry.get_reader_registry()
+    first = registry.get_reader(['en', 'es'])
+    second = registry.get_reader(['es', 'en'])
+
+    assert first is second
+    assert factory.loads == [(('en', 'es'), False, None, True)]
+    assert registry.stats()['hits'] == 1
+
+
+def test_each_key_component_gets_its_own_load(factory):
+    registry = reader_registry.get_reader_registry()
+    keys = [
+        (['en', 'es'], False, None, False),
+        (['en', 'es'], True, None, False),
+        (['en', 'es'], False, '/modelos', False),
+        (['en', 'es'], False, None, True),
+    ]
+    for _ in range(3):
+        for languages, gpu, model_dir, quantize in keys:
+            registry.get_reader(languages, gpu=gpu, model_dir=model_dir, quantize=quantize)
+
+    assert len(factory.loads) == len(keys)
+    assert len(set(factory.loads)) == len(keys)
+
+
+def test_adapters_share_one_load(factory):
+    from src.infrastructure.ocr_adapter import EasyOCRAdapter
+
+    performance = PerformanceSettings(reader_memory_budget_mb=0)
+    key = (('en', 'es'), False, None, performance.quantized_recognizer)
+    adapter = EasyOCRAdapter(['en', 'es'], performance=performance)
+    adapter.reader
+    second_adapter = EasyOCRAdapter(['es', 'en'], performance=performance)
+
+    assert second_adapter.reader is adapter.reader
+    assert factory.count(key) == 1
+
+
+def test_app_reuses_adapter_reader(factory, monkeypatch, tmp_path):
+    # La aplicación de escritorio necesita python-docx y PyQt6 (utils)
+    pytest.importorskip('docx')
+    pytest.importorskip('PyQt6')
+    import imagen_texto
+    from src.infrastructure.ocr_adapter import EasyOCRAdapter
+
+    performance = PerformanceSettings(reader_memory_budget_mb=0)
+    key = (('en', 'es'), False, None, performance.quantized_recognizer)
+    adapter = EasyOCRAdapter(['en', 'es'], performance=performance)
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(imagen_texto, 'get_result_cache', lambda performance: None)
+    app = imagen_texto.TextExtractorApp()
+    app.performance = performance
+    app.languages = ['en', 'es']
+
+    assert app._ensure_reader() is adapter.reader
+    assert factory.count(key) == 1
+
+
+def test_reload_after_eviction(factory):
+    registry = reader_registry.get_reader_registry()
+    registry.set_memory_budget(1)
+
+    registry.get_reader(['en'])
+    registry.get_reader(['ru', 'en'])
+    assert registry.stats()['evictions'] == 1
+    assert not registry.is_loaded(['en'])
+
+    registry.get_reader(['en'])
+    assert factory.count((('en',), False, None, True)) == 2
+    assert factory.count((('en', 'ru'), False, None, True)) == 1
+
+
+def test_concurrent_requests_load_once(factory):
+    import threading
+
+    registry = reader_registry.get_reader_registry()
+    barrier = threading.Barrier(8)
+    readers = []
+
+    def request():
+        barrier.wait()
+        readers.append(registry.get_reader(['en', 'es']))
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(factory.loads) == 1
+    assert all(reader is readers[0] for reader in readers)
@@ -0,0 +1,111 @@
+"""
+Caché de resultados: un archivo nuevo se lee una sola vez entre el hash y
+la decodificación
+"""
+import pytest
+
+from src.application.extraction_usecase import ExtractTextUseCase
+from src.domain.entities import ExtractionResult
+from src.domain.repositories import TextExtractionRepository
+from src.infrastructure.ingestion import file_reads, reset_file_reads
+from src.infrastructure.result_cache import ResultCache
+
+PARAMS = {'languages': ['en'], 'paragraph': True}
+
+
+class FixedRepository(TextExtractionRepository):
+    """Repositorio que no lee archivos: siempre el mismo texto"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def extract_text(self, image, cancel_token=None):
+        self.calls += 1
+        return ExtractionResult(text='hola', confidence=0.9)
+
+    def extract_text_batch(self, images, cancel_token=None):
+        return [self.extract_text(image, cancel_token) for image in images]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    reset_file_reads()
+    cache = ResultCache(tmp_path / 'cache.sqlite3')
+    yield cache
+    reset_file_reads()
+
+
+def test_digest_from_shared_bytes_reads_once(cache, tmp_path):
+    path = str(tmp_path / 'captura.png')
+    with open(path, 'wb') as f:
+        f.write(b'\x89PNG contenido de prueba')
+
+    data = cache.read_unless_known(path)
+    assert data is not None
+    key, cached = cache.lookup(path, PARAMS, data)
+    assert key is not None and cached is None
+
+    # Ya memorizado: ni read_unless_known ni lookup vuelven a leer
+    assert cache.read_unless_known(path) is None
+    assert cache.lookup(path, PARAMS)[0] == key
+    assert file_reads[path] == 1
+
+
+def test_use_case_miss_reads_file_once(cache, tmp_path):
+    pytest.importorskip('numpy')
+    PILImage = pytest.importorskip('PIL.Image')
+    from src.infrastructure.ingestion import ingest_image
+
+    path = str(tmp_path / 'pagina.png')
+    PILImage.new('RGB', (32, 16), 'white').save(path)
+
+    repository = FixedRepository()
+    use_case = ExtractTextUseCase(repository, image_loader=ingest_image,
+                                  result_cache=cache, cache_params=PARAMS)
+    assert use_case.execute(path).text == 'hola'
+    assert file_reads[path] == 1
+
+    # Acierto: se responde desde la caché sin leer ni extraer
+    assert use_case.execute(path).text == 'hola'
+    assert repository.calls == 1
+    assert file_reads[path] == 1
+
+
+def test_perceptual_thumbnail_roundtrip_and_old_schema(tmp_path):
+    import sqlite3
+
+    path = tmp_path / 'anterior.sqlite3'
+    db = sqlite3.connect(str(path))
+    db.execute("CREATE TABLE perceptual (digest TEXT PRIMARY KEY, hash TEXT NOT NULL, cells TEXT NOT NULL)")
+    db.execute("INSERT INTO perceptual VALUES ('viejo', 'ff', '1,2')")
+    db.commit()
+    db.close()
+
+    cache = ResultCache(path)
+    # Firma anterior a las miniaturas: no se puede confirmar
+    assert cache.perceptual_thumbnail('viejo') is None
+    cache.add_perceptual('nuevo', 0xff, [1, 2, 3, 4], b'miniatura')
+    assert cache.perceptual_thumbnail('nuevo') == b'miniatura'
+    assert sorted(digest for digest, _, _ in cache.perceptual_rows()) == ['nuevo', 'viejo']
+
+
+def test_same_content_tolerates_a_cursor_but_not_a_block_of_text():
+    np = pytest.importorskip('numpy')
+    import struct
+    import zlib
+    from src.infrastructure.perceptual_index import same_content
+
+    def thumbnail(pixels):
+        height, width = pixels.shape
+        return struct.pack('>HH', width, height) + zlib.compress(pixels.tobytes())
+
+    page = np.full((288, 512), 255, dtype=np.uint8)
+    page[40:52, 20:400:6] = 0
+    cursor = page.copy()
+    cursor[100:108, 200:205] = 0
+    edited = page.copy()
+    edited[150:162, 20:300] = 0
+
+    assert same_content(thumbnail(page), thumbnail(cursor))
+    assert not same_content(thumbnail(page), thumbnail(edited))
+    assert not same_content(thumbnail(page), thumbnail(page[:, :500].copy()))
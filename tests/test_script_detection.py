@@ -0,0 +1,52 @@
+"""
+Enrutamiento por escritura: las letras separadas solo van al lector
+cirílico con evidencia positiva
+"""
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('PIL')
+
+from src.infrastructure.script_detection import ScriptRouter
+
+
+class StubReader:
+    """Lector que detecta una línea de letras separadas y la lee con una confianza fija"""
+
+    def __init__(self, confidence):
+        self.confidence = confidence
+
+    def detect(self, gray, canvas_size=None):
+        return [[[10, 190, 10, 40]]], [[]]
+
+    def recognize(self, gray, horizontal_list, free_list, **options):
+        return [([[0, 0], [1, 0], [1, 1], [0, 1]], 'texto', self.confidence) for _ in horizontal_list]
+
+
+def letters():
+    """Línea de glifos separados, más altos que anchos"""
+    image = np.full((50, 200), 255, dtype=np.uint8)
+    for x in range(15, 185, 20):
+        image[12:38, x:x + 8] = 0
+    return image
+
+
+def test_alphabetic_line_stays_latin_without_cyrillic_reader():
+    assert ScriptRouter(['en']).detect_script(StubReader(0.2), letters()) == 'latin'
+
+
+def test_alphabetic_line_stays_latin_when_cyrillic_reads_worse():
+    router = ScriptRouter(['en'])
+    assert router.detect_script(StubReader(0.3), letters(), lambda languages: StubReader(0.1)) == 'latin'
+
+
+def test_alphabetic_line_routes_to_cyrillic_on_better_confidence():
+    router = ScriptRouter(['en', 'es'])
+    loaded = []
+
+    def reader_for(languages):
+        loaded.append(languages)
+        return StubReader(0.9)
+
+    assert router.languages_for(StubReader(0.3), letters(), reader_for) == ['ru', 'en']
+    assert loaded == [['ru', 'en']]
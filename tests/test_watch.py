@@ -0,0 +1,69 @@
+"""
+Carpeta vigilada: código de salida con --una-vez y nombres de salida
+repetidos resueltos contra el manifiesto
+"""
+import pytest
+
+from src import watch
+from src.application.export_usecase import ExportFormat
+from src.cli import EXIT_FAILURES, EXIT_OK
+from src.domain.entities import ExtractionResult
+from src.infrastructure.folder_watcher import WatchManifest
+
+
+class StubExtract:
+    """Extracción sin motor: falla con las imágenes cuyo nombre empieza con 'mala'"""
+
+    def execute(self, image_path, cancel_token=None):
+        if 'mala' in image_path:
+            raise RuntimeError("imagen ilegible")
+        return ExtractionResult(text='', confidence=1.0, image_path=image_path)
+
+
+class StubContainer:
+    def get(self, name):
+        return StubExtract()
+
+    def warm(self, names):
+        return {name: True for name in names}
+
+
+@pytest.fixture
+def folder(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr('src.service_container.get_service_container', lambda: StubContainer())
+    monkeypatch.setattr('src.infrastructure.result_cache.get_result_cache', lambda performance=None: None)
+    images = tmp_path / 'escaneos'
+    images.mkdir()
+    (images / 'buena.png').write_bytes(b'png')
+    return images
+
+
+def run_once(folder, tmp_path):
+    return watch.main([str(folder), '--una-vez', '--espera', '0', '--salida', str(tmp_path / 'textos'),
+                       '--resumen', str(tmp_path / 'resumen.jsonl')])
+
+
+def test_once_without_failures_exits_ok(folder, tmp_path):
+    assert run_once(folder, tmp_path) == EXIT_OK
+
+
+def test_once_with_failures_exits_with_failures(folder, tmp_path):
+    (folder / 'mala.png').write_bytes(b'png')
+    assert run_once(folder, tmp_path) == EXIT_FAILURES
+
+
+def test_repeated_names_do_not_overwrite_other_outputs(tmp_path):
+    manifest = WatchManifest(str(tmp_path / 'manifiesto.sqlite3'))
+    try:
+        first = watch.output_path_for('/a/pagina.png', 'textos', ExportFormat.TXT,
+                                      watch._TakenOutputs(manifest, '/a/pagina.png'))
+        manifest.record('/a/pagina.png', (1, 1), 'completed', output=first)
+        # La misma imagen conserva su nombre; otra con el mismo nombre recibe sufijo
+        assert manifest.output_taken(first, exclude='/b/pagina.png')
+        assert not manifest.output_taken(first, exclude='/a/pagina.png')
+        second = watch.output_path_for('/b/pagina.png', 'textos', ExportFormat.TXT,
+                                       watch._TakenOutputs(manifest, '/b/pagina.png'))
+        assert (first, second) == ('textos/pagina.txt', 'textos/pagina_1.txt')
+    finally:
+        manifest.close()